@@ -1,37 +1,53 @@
 """Module to define Activity_interface which interacts with the django backend."""
-from typing import Dict, List, Union
+from typing import Dict
 import uuid
 import json
 import requests
 import nltk
-import spacy
 from tools.error_handler import handle_request_error
+from tools.nlp_resources import LEMMA_DISABLE, resources
+from tools.tracing import trace_headers
 from nltk.tokenize import RegexpTokenizer
 from configuration.indicators import termination_indicators
 from activity_model.node import Node, NodeChange, NodeType
 from activity_model.connection import Connection, ConnectionChange
 from activity_model.activity import Activity
-
-nlp_spacy = spacy.load("en_core_web_sm")
+from activity_model.change_log import ChangeLog
 
 
 class ActivityInterface:
-    """ActivityInterface to organise all activity related methods."""
+    """ActivityInterface to organise all activity related methods.
+
+    Next to the nodes and connections the interface keeps the outgoing and incoming
+    connections per node and the nodes per NodeType, updated on every create and
+    delete. They are dicts used as ordered sets, such that lookups return the keys
+    in the order of creation and removal takes constant time. The verb lemmas of an
+    action node can be given from the annotated text in verb_lemmas, the termination
+    check then uses them instead of tagging the name of the node again.
+    """
 
     nodes: Dict[str, Node]
     connections: Dict[str, Connection]
-    changes: List[Union[Activity, NodeChange, ConnectionChange]]
+    changes: ChangeLog
+    outgoing: Dict[str, Dict[str, None]]
+    incoming: Dict[str, Dict[str, None]]
+    nodes_by_type: Dict[NodeType, Dict[str, None]]
+    verb_lemmas: Dict[str, list]
 
     def __init__(self) -> None:
         self.nodes = {}
         self.connections = {}
-        self.changes = []
+        self.changes = ChangeLog()
+        self.outgoing = {}
+        self.incoming = {}
+        self.nodes_by_type = {}
+        self.verb_lemmas = {}
         self.post_url = "http://django:8000/model/data?uml-type=activity"
 
     def service_online(self, url: str) -> bool:
         """Check if a url is returning some value."""
         try:
-            get = requests.get(url)
+            get = requests.get(url, headers=trace_headers())
             if get.status_code == 200:
                 # print(f"{self.url}: is reachable")
                 return True
@@ -54,7 +70,7 @@ class ActivityInterface:
         url = self.post_url + "&request-type=activities"
         if not self.service_online(url):
             return {}
-        result = requests.get(url)
+        result = requests.get(url, headers=trace_headers())
         if result.status_code != 200:
             return {}
         response = json.loads(result.content)
@@ -133,6 +149,7 @@ class ActivityInterface:
         node = self.create_new_node(activity_id, node_type, args)
         change = self.create_node_change(activity_id, node_type, args)
         self.nodes[change.node_key] = node
+        self.nodes_by_type.setdefault(node_type, {})[change.node_key] = None
         self.changes.append(change)
         return change.node_key
 
@@ -146,15 +163,14 @@ class ActivityInterface:
         for outgoing_conn_id in outgoing_connections:
             self.delete_connection(outgoing_conn_id)
         # Delete node
-        node_changes = [
-            change
-            for change in self.changes
-            if isinstance(change, NodeChange) and change.node_key == node_id
-        ]
+        node_changes = self.changes.get_node_changes(node_id)
         if len(node_changes) > 1:
             print("More node changes than one. We only delete the first.")
         node_change = node_changes[0]
         self.changes.remove(node_change)
+        self.nodes_by_type[self.nodes[node_id].type].pop(node_id, None)
+        self.outgoing.pop(node_id, None)
+        self.incoming.pop(node_id, None)
         del self.nodes[node_id]
         return
 
@@ -180,6 +196,8 @@ class ActivityInterface:
             id=len(self.connections) + 1,
         )
         self.connections[key] = conn
+        self.outgoing.setdefault(from_id, {})[key] = None
+        self.incoming.setdefault(to_id, {})[key] = None
 
         conn_change = ConnectionChange(
             type="new-connection",
@@ -195,11 +213,7 @@ class ActivityInterface:
 
     def delete_connection(self, connection_id: str) -> None:
         """Delete a connection from connections and connection_changes."""
-        connection_changes = [
-            change
-            for change in self.changes
-            if change.type == "new-connection" and change.key == connection_id
-        ]
+        connection_changes = self.changes.get_connection_changes(connection_id)
         if not connection_changes:
             print(
                 "Could not delete connection {}, it does not exist.".format(
@@ -209,7 +223,9 @@ class ActivityInterface:
             return
         connection_change = connection_changes[0]
         self.changes.remove(connection_change)
-        del self.connections[connection_id]
+        connection = self.connections.pop(connection_id)
+        self.outgoing.get(connection.from_node_key, {}).pop(connection_id, None)
+        self.incoming.get(connection.to_node_key, {}).pop(connection_id, None)
         return
 
     def create_post_data_dict(self):
@@ -245,7 +261,7 @@ class ActivityInterface:
         data["changes"].append(activity.create_backend_dict())
         if not self.service_online(self.post_url):
             return -1
-        result = requests.post(self.post_url, json=data)
+        result = requests.post(self.post_url, json=data, headers=trace_headers())
         if result.status_code != 200:
             print("Something wrent wrong with posting the create_activity_server.")
             print("status_code: {}".format(result.status_code))
@@ -270,7 +286,11 @@ class ActivityInterface:
         """Clear the class data variables."""
         self.nodes = {}
         self.connections = {}
-        self.changes = []
+        self.changes = ChangeLog()
+        self.outgoing = {}
+        self.incoming = {}
+        self.nodes_by_type = {}
+        self.verb_lemmas = {}
 
     def create_node_post_data(self):
         """Create the node dictionary to post to the backend."""
@@ -315,7 +335,7 @@ class ActivityInterface:
         """
         if not self.service_online(url):
             return []
-        result = requests.post(url, json=data)
+        result = requests.post(url, json=data, headers=trace_headers())
         return result
 
     def get_all_node_keys_by_type(self, node_type: NodeType) -> list:
@@ -326,7 +346,7 @@ class ActivityInterface:
 
         Returns:
            - node_keys (list): a list of keys of conditional nodes."""
-        return [key for key, node in self.nodes.items() if node.type == node_type]
+        return list(self.nodes_by_type.get(node_type, {}))
 
     def get_connections_using_node_id(self, node_id: str, from_node: bool) -> str:
         """Get the connections with the from node id.
@@ -339,17 +359,9 @@ class ActivityInterface:
               with each as a string
         """
         if from_node:
-            return [
-                connection_id
-                for connection_id, connection in self.connections.items()
-                if connection.from_node_key == node_id
-            ]
+            return list(self.outgoing.get(node_id, {}))
         else:
-            return [
-                connection_id
-                for connection_id, connection in self.connections.items()
-                if connection.to_node_key == node_id
-            ]
+            return list(self.incoming.get(node_id, {}))
 
     def get_connections_using_from_node_id(self, from_node_id: str) -> list:
         """Get the connections with the from node id.
@@ -513,11 +525,12 @@ class ActivityInterface:
             - (bool): True if a termination verb is found, False if no termination verb is found.
         """
         tokenised_text = words_only_tokenizer.tokenize(text)
+        resources.require_nltk("averaged_perceptron_tagger")
         pos_tagged = nltk.pos_tag(tokenised_text)
         verbs = list(filter(lambda x: x[1].startswith("VB"), pos_tagged))
         if verbs:
             verb_words = [verb_result[0] for verb_result in verbs]
-            verb_doc = nlp_spacy(" ".join(verb_words))
+            verb_doc = resources.spacy(LEMMA_DISABLE)(" ".join(verb_words))
             lemmatized_verbs = [token.lemma_ for token in verb_doc]
             print(lemmatized_verbs)
             found_termination = [
@@ -555,9 +568,15 @@ class ActivityInterface:
             node = self.nodes[node_id]
             action = node.name
             print(action)
-            termination_action_id = self.find_termination_verb_from_text(
-                action, words_only_tokenizer, termination_lemmas
-            )
+            verb_lemmas = self.verb_lemmas.get(node_id)
+            if verb_lemmas is not None:
+                termination_action_id = any(
+                    lemma in termination_lemmas for lemma in verb_lemmas
+                )
+            else:
+                termination_action_id = self.find_termination_verb_from_text(
+                    action, words_only_tokenizer, termination_lemmas
+                )
             if termination_action_id:
                 print("termination_action_id")
                 print(termination_action_id)
@@ -583,7 +602,9 @@ class ActivityInterface:
         termination_action_per_condition = {}
         # use Regexp tokenizer to remove characters other then letters.
         words_only_tokenizer = RegexpTokenizer(r"\w+")
-        term_indicator_doc = nlp_spacy(" ".join(termination_indicators))
+        term_indicator_doc = resources.spacy(LEMMA_DISABLE)(
+            " ".join(termination_indicators)
+        )
         termination_lemmas = [token.lemma_ for token in term_indicator_doc]
         for conditional_id, merge_ids in conditional_structures.items():
             last_actions = self.get_last_action_in_condition_path(merge_ids)
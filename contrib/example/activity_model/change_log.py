@@ -0,0 +1,70 @@
+"""Module to define the change log of the Activity_interface."""
+import itertools
+from activity_model.connection import ConnectionChange
+from activity_model.node import NodeChange
+
+
+def get_change_key(change) -> tuple:
+    """Return the key of a change: the node key, the connection key or the change itself."""
+    if isinstance(change, NodeChange):
+        return ("node", change.node_key)
+    if isinstance(change, ConnectionChange):
+        return ("connection", change.key)
+    return ("change", id(change))
+
+
+class ChangeLog:
+    """Changes in the order they are made, indexed by node and connection key.
+
+    Works like the list it replaces: changes are appended, removed and iterated in
+    insertion order. Finding and removing the changes of a node or connection takes
+    constant time instead of a scan over all changes.
+    """
+
+    def __init__(self, changes: list = None) -> None:
+        self.entries = {}
+        self.keys = {}
+        self.counter = itertools.count()
+        for change in changes or []:
+            self.append(change)
+
+    def __iter__(self):
+        return iter(list(self.entries.values()))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def append(self, change) -> None:
+        """Add a change at the end of the log."""
+        entry = next(self.counter)
+        self.entries[entry] = change
+        self.keys.setdefault(get_change_key(change), []).append(entry)
+
+    def get_changes(self, key: tuple) -> list:
+        """Return the changes with the key, in insertion order."""
+        return [self.entries[entry] for entry in self.keys.get(key, [])]
+
+    def get_node_changes(self, node_key: str) -> list:
+        """Return the changes of a node."""
+        return self.get_changes(("node", node_key))
+
+    def get_connection_changes(self, connection_key: str) -> list:
+        """Return the changes of a connection."""
+        return self.get_changes(("connection", connection_key))
+
+    def remove(self, change) -> None:
+        """Remove the first occurrence of the change.
+
+        Raises:
+           - ValueError: if the change is not in the log, like list.remove.
+        """
+        key = get_change_key(change)
+        entries = self.keys.get(key, [])
+        for index, entry in enumerate(entries):
+            if self.entries[entry] == change:
+                del entries[index]
+                if not entries:
+                    del self.keys[key]
+                del self.entries[entry]
+                return
+        raise ValueError("The change is not in the change log.")
@@ -1,78 +1,59 @@
 """Module to connect to the allen nlp api."""
-import json
-import requests
-import nltk
+import asyncio
+from allen_nlp.async_interface import AsyncAllenNLPinterface
 from tools.error_handler import handle_request_error
 
 
 class AllenNLPinterface:
-    """Main class to enable reuse between classes."""
+    """Main class to enable reuse between classes.
 
-    def __init__(self, url) -> None:
+    A sync wrapper around AsyncAllenNLPinterface (allen_nlp/async_interface.py),
+    every call runs in its own event loop. All instances share one transport
+    (tools/transport.py) by default: a keep-alive session pool with a cached health
+    state and a circuit breaker per service.
+    """
+
+    def __init__(self, url, compress=True, transport=None) -> None:
         self.result = []
         self.url = url
+        self.client = AsyncAllenNLPinterface(compress=compress, transport=transport)
+
+    @property
+    def transport(self):
+        """The transport of the async client."""
+        return self.client.transport
+
+    def create_request_body(self, data) -> list:
+        """Create the body and headers to post data, see AsyncAllenNLPinterface."""
+        return self.client.create_request_body(data)
 
     def service_online(self):
-        """Check if the service on the self.url is online."""
-        try:
-            get = requests.get(self.url)
-            if get.status_code == 200:
-                # print(f"{self.url}: is reachable")
-                return True
-            else:
-                handle_request_error(
-                    404,
-                    (
-                        f"{self.url}: is Not reachable, status_code: {get.status_code}. "
-                        + "Is the AllenNLP service running?"
-                    ),
-                )
-                return False
-        except requests.exceptions.RequestException as exception:
-            handle_request_error(
-                404,
-                f"{self.url}: is Not reachable \nErr:{exception}. Is the AllenNLP service running?",
-            )
-            return False
+        """Check if the service on the self.url is online, the result is cached shortly."""
+        if self.transport.is_online(self.url):
+            return True
+        handle_request_error(
+            404,
+            f"{self.url}: is Not reachable. Is the AllenNLP service running?",
+        )
+        return False
 
-    def connect(self, sentences):
-        """Connects to the AllenNLP Container and performs a prediction on the document.
+    def connect(self, data):
+        """Connects to the AllenNLP Container and performs a prediction on the data.
 
         Args:
-           - sentences (list(dict)): list of sentences. [{"sentence": "Pete went to the shop."},
-                {"sentence": "..."}]
+           - data (list(dict) | dict): the input of the endpoint, e.g. a list of sentences.
+                [{"sentence": "Pete went to the shop."}, {"sentence": "..."}]
 
         Returns:
            - False: if the service is not online
            - True: if the service is online and the data is loaded.
         """
-        if not self.service_online():
+        result = asyncio.run(self.client.post(self.url, data))
+        if result is None:
             return False
-        res = requests.post(self.url, json=sentences)
-        print(
-            "Doing another call, to free up memory. service is {} online".format(
-                self.service_online()
-            )
-        )
-        self.result = json.loads(res.text)
+        self.result = result
         return True
 
     def create_input_object(self, input_text):
-        """Create input object from text.
-
-        Description:
-           Split the text into sentences and add them to a list in the format necessary to
-           process them simultanuously.
-
-        Args:
-           - input_text (str): string of text needed to parse with semantic role labelling.
-
-        Returns:
-           - input_object (list(dict_items)): List of dict items. Each dict item specifies
-                a sentence.
-        """
-        sen_list = nltk.tokenize.sent_tokenize(input_text)
-        input_object = []
-        for sentence in sen_list:
-            input_object.append({"sentence": sentence})
-        return input_object
+        """Create input object from text, see AsyncAllenNLPinterface."""
+        return self.client.create_input_object(input_text)
@@ -0,0 +1,138 @@
+"""Asyncio client for the AllenNLP endpoints.
+
+The calls of AsyncAllenNLPinterface can be awaited together, e.g. for SRL and
+coreference of the same text:
+
+    client = AsyncAllenNLPinterface()
+    srl_result, coref_result = await asyncio.gather(
+        client.semrol_text(text), client.coreference(text)
+    )
+
+The requests run in a thread pool over the shared transport (tools/transport.py),
+so they use the same keep-alive connections, health cache and circuit breakers as
+the sync classes. max_concurrency bounds the number of calls of a client that are
+in flight at the same time. The sync AllenNLPinterface is a thin wrapper around it.
+"""
+import asyncio
+import contextvars
+import functools
+import gzip
+import json
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from tools.document import get_document
+from tools.error_handler import handle_request_error
+from tools.tracing import trace_headers
+from tools.transport import POOL_SIZE, ServiceUnavailable, transport as shared_transport
+
+BASE_URL = "http://allen_nlp:5000/predict"
+MAX_CONCURRENCY = 4
+
+# shared by all clients, sized like the connection pool of the transport.
+_executor = ThreadPoolExecutor(max_workers=POOL_SIZE)
+
+
+class AsyncAllenNLPinterface:
+    """Async client for the SRL, coreference and entailment endpoints."""
+
+    def __init__(
+        self,
+        base_url=BASE_URL,
+        max_concurrency=MAX_CONCURRENCY,
+        compress=True,
+        transport=None,
+    ) -> None:
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.compress = compress
+        self.transport = transport or shared_transport
+        self._semaphore = None
+        self._semaphore_loop = None
+
+    def get_semaphore(self) -> asyncio.Semaphore:
+        """Return the semaphore of the running event loop.
+
+        A semaphore belongs to one event loop and the sync wrappers run every call
+        in a new loop, so a new semaphore is created when the loop changes.
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def create_request_body(self, data) -> list:
+        """Create the body and headers to post data as json, gzip compressed if compress is set.
+
+        The responses are decompressed by requests, which accepts gzip by default.
+        """
+        body = json.dumps(data).encode("utf-8")
+        headers = {"Content-Type": "application/json", **trace_headers()}
+        if self.compress:
+            body = gzip.compress(body, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+        return [body, headers]
+
+    def create_input_object(self, input_text):
+        """Create input object from text.
+
+        Description:
+           Split the text into sentences and add them to a list in the format necessary to
+           process them simultanuously. The sentences of a Document are used as they are.
+
+        Args:
+           - input_text (str | Document): text needed to parse with semantic role labelling.
+
+        Returns:
+           - input_object (list(dict_items)): List of dict items. Each dict item specifies
+                a sentence.
+        """
+        return get_document(input_text).input_object()
+
+    def post_blocking(self, url, data):
+        """Post data to the url and return the decoded result, None if the service is down."""
+        if not self.transport.is_online(url):
+            handle_request_error(
+                404,
+                f"{url}: is Not reachable. Is the AllenNLP service running?",
+            )
+            return None
+        body, headers = self.create_request_body(data)
+        try:
+            res = self.transport.post(url, data=body, headers=headers)
+        except (ServiceUnavailable, requests.exceptions.RequestException) as exception:
+            handle_request_error(
+                404,
+                f"{url}: is Not reachable \nErr:{exception}. Is the AllenNLP service running?",
+            )
+            return None
+        return json.loads(res.text)
+
+    async def post(self, url, data):
+        """Post data to the url, see post_blocking.
+
+        The request runs in the thread pool with a copy of the context, such that
+        the request id of the pipeline run is sent along.
+        """
+        async with self.get_semaphore():
+            context = contextvars.copy_context()
+            return await asyncio.get_running_loop().run_in_executor(
+                _executor, functools.partial(context.run, self.post_blocking, url, data)
+            )
+
+    async def semrol_text(self, text) -> list:
+        """Semantic Role Labelling for a text or Document, the output per sentence."""
+        result = await self.post(
+            f"{self.base_url}/srl", self.create_input_object(text)
+        )
+        return result["output"] if result else []
+
+    async def coreference(self, document) -> dict:
+        """Coreference of a text or Document, the output of the coref endpoint."""
+        result = await self.post(f"{self.base_url}/coref", {"document": str(document)})
+        return result["output"] if result else {}
+
+    async def entailment(self, document: list) -> list:
+        """Entailment for a list of dictionary elements with a premise and hypothesis."""
+        result = await self.post(f"{self.base_url}/entail", document)
+        return result["output"] if result else []
@@ -1,16 +1,17 @@
 """Module to connect to AllenNLP library and use Coreference implementation"""
-import json
-import requests
 import numpy as np
 from nltk.tokenize import word_tokenize
 import tools.common_methods as cm
+from tools.nlp_resources import resources
+from allen_nlp.allen_nlp_interface import AllenNLPinterface
 
 
-class Coreference:
+class Coreference(AllenNLPinterface):
     """Class to do coreference based on a document."""
 
     def __init__(self) -> None:
         """Initialize the different variables."""
+        AllenNLPinterface.__init__(self, "http://allen_nlp:5000/predict/coref")
         self.result = {}
         self.output = {}
         self.antecedents = []
@@ -18,10 +19,7 @@ class Coreference:
 
     def connect(self, document):
         """Connects to the AllenNLP Container and performs a prediction on the document."""
-        url = "http://allen_nlp:5000/predict/coref"
-        input_obj = {"document": document}
-        res = requests.post(url, json=input_obj)
-        self.result = json.loads(res.text)
+        return AllenNLPinterface.connect(self, {"document": document})
 
     def parse_data(self):
         """Parse the data into the different variables."""
@@ -43,6 +41,17 @@ class Coreference:
                 self.antecedents.append([ant_word, ant_span])
                 self.pronouns.append([curr_word, curr_span])
 
+    def get_sentence_lengths(self) -> list:
+        """Return the number of words in the document up to and including each sentence.
+
+        Uses the sentence boundaries returned by the service, older versions of the
+        service do not return them and then the document is split again.
+        """
+        if "sentences" in self.output:
+            return [end + 1 for _, end in self.output["sentences"]]
+        com_method = cm.CommonFunctions()
+        return com_method.get_list_sent_lengths(" ".join(self.output["document"]))
+
     def find_main_antecedents(self):
         """Finds the antecedents that do not exist in the pronouns.
 
@@ -140,6 +149,7 @@ class Coreference:
                 ]
                 for res in coref_result
             ]
+            resources.require_nltk("punkt")
             for replacement in replacements:
                 begin = replacement[2] + length_difference
                 end = replacement[3] + length_difference + 1
@@ -157,12 +167,17 @@ class Coreference:
         return action_copy
 
     def order_coref_on_avo_index(
-        self, avo_sents: list, coref_results: list, coref_text: list
+        self,
+        avo_sents: list,
+        coref_results: list,
+        coref_text: list,
+        sentence_lengths: list = None,
     ) -> dict:
         """Order the coreference result per avo_sentence index and add begin and end index."""
         result_per_avo_index = {}
         com_method = cm.CommonFunctions()
-        sentence_lengths = com_method.get_list_sent_lengths(" ".join(coref_text))
+        if sentence_lengths is None:
+            sentence_lengths = com_method.get_list_sent_lengths(" ".join(coref_text))
         avo_sents_ordered = com_method.order_avo_on_sent_index(avo_sents)
         for reference_result in coref_results:
             sent_index = reference_result[2]
@@ -197,11 +212,15 @@ class Coreference:
         return result_per_avo_index
 
     def fill_swimming_lanes_and_coref_sents(
-        self, avo_sents: list, coref_results: list, coref_text: list
+        self,
+        avo_sents: list,
+        coref_results: list,
+        coref_text: list,
+        sentence_lengths: list = None,
     ) -> list:
         """Fill swimming lanes and add coreference to sentences"""
         result_per_avo_sent = self.order_coref_on_avo_index(
-            avo_sents, coref_results, coref_text
+            avo_sents, coref_results, coref_text, sentence_lengths
         )
         for avo_index, avo_sent in enumerate(avo_sents):
             action_text = avo_sent["action_text"][:]
@@ -285,7 +304,11 @@ class Coreference:
         return cluster_per_sent
 
     def tag_clusters_avo_sents(
-        self, avo_sents: list, coref_document: list, clusters: list
+        self,
+        avo_sents: list,
+        coref_document: list,
+        clusters: list,
+        sentence_lengths: list = None,
     ) -> None:
         """Tag all the coref clusters in avo_sents.
 
@@ -293,12 +316,17 @@ class Coreference:
            - avo_sents(list): list of all sentences we are considering.
            - coref_document(list): list of all words in the document as a result from the Coreference.
            - clusters (list): List of clusters with spans representing the clusters.
+           - sentence_lengths (list): number of words up to and including each sentence,
+               from Coreference.get_sentence_lengths. Computed from coref_document if None.
 
         Returns:
            - None, but we change the values in avo_sents.
         """
-        com_method = cm.CommonFunctions()
-        sentence_lengths = com_method.get_list_sent_lengths(" ".join(coref_document))
+        if sentence_lengths is None:
+            com_method = cm.CommonFunctions()
+            sentence_lengths = com_method.get_list_sent_lengths(
+                " ".join(coref_document)
+            )
         # Step one organise all clusters into a dict per sent
         cluster_per_sent = self.organise_cluster_per_sentence_span(
             clusters, sentence_lengths
@@ -1,6 +1,4 @@
 """Module to connect to AllenNLP library and use entailment implementation"""
-import json
-import requests
 from allen_nlp.allen_nlp_interface import AllenNLPinterface
 
 
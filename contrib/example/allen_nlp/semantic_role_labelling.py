@@ -1,10 +1,8 @@
 """Module to connect to api with AllenNLP running and transform the outcomes."""
-import nltk
-from configuration.indicators import conditional_indicators as cond_ind
 from allen_nlp.allen_nlp_interface import AllenNLPinterface
+from tools.srl_columns import SrlColumns, roles_of
 
-
-nltk.download("punkt")
+AVO_ROLES = ("agent", "verb", "object", "ADV")
 
 
 class SemanticRoleLabelling(AllenNLPinterface):
@@ -46,13 +44,14 @@ class SemanticRoleLabelling(AllenNLPinterface):
         # verbs = out['verbs']
         res = []
         for index, tag in enumerate(verb_tags):
-            if "ARG0" in tag:
+            roles = roles_of(tag)
+            if "agent" in roles:
                 arg0[0] += sent[index] + " "
                 arg0[1].append(index)
-            if "B-V" in tag:
+            if "verb_begin" in roles:
                 verb[0] += sent[index] + " "
                 verb[1].append(index)
-            if "ARG1" in tag:
+            if "object" in roles:
                 arg1[0] += sent[index] + " "
                 arg1[1].append(index)
         arg0[0] = arg0[0].strip()
@@ -187,41 +186,49 @@ class SemanticRoleLabelling(AllenNLPinterface):
             "ADV": [],
         }
 
-        begin_index = -1
-        end_index = -1
-        agent = [-1, -1]
-        verb = [-1, -1]
-        object = [-1, -1]
-        adv = [-1, -1]
+        spans = {role: [-1, -1] for role in ("tagged",) + AVO_ROLES}
         for index, tag in enumerate(srl_sentence_result["tags"]):
-            if tag != "O":
-                if begin_index == -1:
-                    begin_index = index
-                end_index = index
-                if "ARG0" in tag:
-                    if agent[0] == -1:
-                        agent[0] = index
-                    agent[1] = index
-                if "B-V" in tag or "I-V" in tag:
-                    if verb[0] == -1:
-                        verb[0] = index
-                    verb[1] = index
-                if "ARG1" in tag:
-                    if object[0] == -1:
-                        object[0] = index
-                    object[1] = index
-                if "ARGM-ADV" in tag:
-                    if adv[0] == -1:
-                        adv[0] = index
-                    adv[1] = index
-        result["agent"] = agent
-        result["verb"] = verb
-        result["object"] = object
-        result["begin_index"] = begin_index
-        result["end_index"] = end_index
-        result["ADV"] = adv
+            for role in roles_of(tag):
+                if role in spans:
+                    if spans[role][0] == -1:
+                        spans[role][0] = index
+                    spans[role][1] = index
+        result["agent"] = spans["agent"]
+        result["verb"] = spans["verb"]
+        result["object"] = spans["object"]
+        result["begin_index"] = spans["tagged"][0]
+        result["end_index"] = spans["tagged"][1]
+        result["ADV"] = spans["ADV"]
         return result
 
+    def get_agent_verb_object_data_for_columns(self, columns: SrlColumns) -> list:
+        """Get the agent, verb, object and adverbial data for all verb frames at once.
+
+        Description:
+           The same as get_agent_verb_object_data for every frame, the spans are
+           extracted from the columnar form of the SRL results in one pass per role.
+
+        Args:
+           - columns (SrlColumns): the SRL results in columnar form.
+
+        Returns:
+           - results (list(dict)): the result of get_agent_verb_object_data per frame, in
+                the order of the frames.
+        """
+        spans = {role: columns.spans(role).tolist() for role in AVO_ROLES}
+        tagged = columns.spans("tagged").tolist()
+        return [
+            {
+                "agent": spans["agent"][frame],
+                "verb": spans["verb"][frame],
+                "object": spans["object"][frame],
+                "begin_index": tagged[frame][0],
+                "end_index": tagged[frame][1],
+                "ADV": spans["ADV"][frame],
+            }
+            for frame in range(len(columns))
+        ]
+
     def process_adverbial(self, avo_data: dict) -> dict:
         """Remove the adverbial data from the avo_data, by setting the begin or end index based on the agent,verb,object."""
         if avo_data["begin_index"] == avo_data["ADV"][0]:
@@ -265,7 +272,7 @@ class SemanticRoleLabelling(AllenNLPinterface):
             intersects = []
             ranges = [y["range"] for y in found_ranges]
             for range_index, possible_range in enumerate(ranges):
-                if set(possible_range).intersection(check_range):
+                if ranges_intersect(possible_range, check_range):
                     if len(check_range) > len(possible_range):
                         found_ranges[range_index]["range"] = range(
                             res["begin_index"], res["end_index"] + 1
@@ -297,13 +304,17 @@ class SemanticRoleLabelling(AllenNLPinterface):
         Returns:
            - agent_verb_object (list): a list for all the agent_verb_objects for the given input.
         """
-        agent_verb_object_results = []
-        verbs = srl_result["verbs"]
-        for srl_verbs_result in verbs:
-            res = self.get_agent_verb_object_data(srl_verbs_result)
+        agent_verb_object_results = [
+            self.get_agent_verb_object_data(srl_verbs_result)
+            for srl_verbs_result in srl_result["verbs"]
+        ]
+        return self.combine_avo_sentence(agent_verb_object_results)
+
+    def combine_avo_sentence(self, agent_verb_object_results: list) -> list:
+        """Process the adverbials and combine the agent, verb, object results of a sentence."""
+        for index, res in enumerate(agent_verb_object_results):
             if res["ADV"][0] != -1:
-                res = self.process_adverbial(res)
-            agent_verb_object_results.append(res)
+                agent_verb_object_results[index] = self.process_adverbial(res)
         foundRanges = self.combine_agent_verb_objects_in_sentence(
             agent_verb_object_results
         )
@@ -317,7 +328,11 @@ class SemanticRoleLabelling(AllenNLPinterface):
             print(" ".join(srl_result["words"][begin : end + 1]))
 
     def get_avo_for_sentences(self, srl_results: list) -> list:
-        """
+        """Get the agent, verb, object combinations for all sentences.
+
+        Description:
+           The SRL results are converted to SrlColumns once, the spans of all verb
+           frames are extracted at once and then combined per sentence.
 
         Args:
            - srl_results (list): semantic role labelling result for a text.
@@ -326,8 +341,16 @@ class SemanticRoleLabelling(AllenNLPinterface):
            - avo_result (list): with elements for each result that contains agent, verb and object combinations with extra data.
         """
         avo_results = []
+        frame_results = self.get_agent_verb_object_data_for_columns(
+            SrlColumns(srl_results)
+        )
+        frame = 0
         for sent_index, srl_result in enumerate(srl_results):
-            avo_res = self.get_avo_sentence(srl_result)
+            frame_count = len(srl_result["verbs"])
+            avo_res = self.combine_avo_sentence(
+                frame_results[frame : frame + frame_count]
+            )
+            frame += frame_count
             for avo_range in avo_res[1]:
                 avo_data = {
                     "action_text": "",
@@ -350,3 +373,13 @@ class SemanticRoleLabelling(AllenNLPinterface):
                 ]
                 avo_results.append(avo_data)
         return avo_results
+
+
+def ranges_intersect(first: range, second: range) -> bool:
+    """Check if two ranges with step 1 have a number in common."""
+    return (
+        len(first) > 0
+        and len(second) > 0
+        and first.start < second.stop
+        and second.start < first.stop
+    )
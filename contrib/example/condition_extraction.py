@@ -1,11 +1,12 @@
 """Module to extract conditions and actions from text."""
-import nltk
 from tqdm import tqdm
 from configuration.indicators import (
-    conditional_indicators as cond_ind,
+    conditional_matcher,
     empty_conditional_indicators,
 )
 import tools.text_support as txt_sup
+from tools.document import get_document
+from tools.srl_index import get_srl_index
 import allen_nlp.semantic_role_labelling as sem_rol
 
 
@@ -26,40 +27,40 @@ class ConditionExtraction:
             - result (list(string)): List of all sentences found in output that have the given tag.
 
         """
-        result = []
-        for sen in output:
-            for res in sen["verbs"]:
-                if tag in res["tags"]:
-                    result.append(res["description"])
-        return result
+        srl_tags = get_srl_index(output)
+        return [
+            srl_tags[sentence].descriptions[verb]
+            for sentence, verb in srl_tags.frames_with_tag(tag)
+        ]
 
     def get_sentences_from_srl_tags(self, tags, output):
         """Get all sentences from SRL output that contain a specific tag in them.
 
         Args:
             - tags (list(str)): list of tags we are looking for. For example ['B-ARGM-ADV','B-V']
-            - output (list(dict)): containing all the results from the SRL for a text
+            - output (list(dict) | SrlTagIndex): containing all the results from the SRL for a text
 
         Returns:
             - result (list(string)): List of all sentences found in output that have the given tag.
         """
+        srl_tags = get_srl_index(output)
+        found_tags = {}
+        for tag in tags:
+            for frame in srl_tags.frames_with_tag(tag):
+                found_tags.setdefault(frame, []).append(tag)
         result = []
-        for s_index, sen in enumerate(output):
-            sent_res = {}
-            sent_res["words"] = sen["words"]
-            sent_res["verbs"] = []
-            for res in sen["verbs"]:
-                tags_in_sentence = [tag for tag in tags if tag in res["tags"]]
-                if tags_in_sentence:
-                    item = {}
-                    item["description"] = res["description"]
-                    item["tags"] = res["tags"]
-                    item["foundTags"] = tags_in_sentence
-                    item["s_index_text"] = s_index
-                    sent_res["verbs"].append(item)
-            # check if sen_res['verbs'] not an empty list.
-            if sent_res["verbs"]:
+        sent_res = None
+        for s_index, verb in sorted(found_tags):
+            sentence = srl_tags[s_index]
+            if sent_res is None or sent_res["verbs"][0]["s_index_text"] != s_index:
+                sent_res = {"words": sentence.words, "verbs": []}
                 result.append(sent_res)
+            item = {}
+            item["description"] = sentence.descriptions[verb]
+            item["tags"] = sentence.frames[verb]
+            item["foundTags"] = found_tags[(s_index, verb)]
+            item["s_index_text"] = s_index
+            sent_res["verbs"].append(item)
         return result
 
     def get_sents_with_tag_for_texts(self, tag, outputs):
@@ -198,17 +199,15 @@ class ConditionExtraction:
         """Select the sentence wich have conditional keywords in them.
 
         Args:
-            - text (str): the text which is processed.
+            - text (str | Document): the text which is processed.
 
         Returns:
             - sentences_data (dict): indexes and found key per sentence, e.g. {sentence_ids: [0,1],
                 sen_id_data: {'0': [tag0,tag1]}}
         """
         output = {"sen_ids": [], "sen_id_data": {}}
-        sentence_list = nltk.tokenize.sent_tokenize(text)
-        sentence_list = [sen.lower() for sen in sentence_list]
-        for index, sen in enumerate(sentence_list):
-            discovered_indicators = [word for word in cond_ind if word in sen]
+        for index, sen in enumerate(get_document(text).lower_sentences):
+            discovered_indicators = conditional_matcher.find(sen)
             if discovered_indicators:
                 output["sen_ids"].append(index)
                 output["sen_id_data"][index] = discovered_indicators
@@ -228,7 +227,7 @@ class ConditionExtraction:
             for item in sent_data:
                 found_tag = " ".join(item["senFoundTag"])
                 found_tag = found_tag.strip().lower()
-                discovered_tags = [tag for tag in cond_ind if tag in found_tag]
+                discovered_tags = conditional_matcher.find(found_tag)
                 if discovered_tags:
                     item["cond_key"] = True
                     item["condTag"] = discovered_tags
@@ -381,7 +380,7 @@ class ConditionExtractionInterface:
             - folder (str): a folder with the text files that need to be loaded.
 
         Returns:
-            - texts list(str): a list of all the texts (str) presented in the folder.
+            - texts list(Document): a list of all the texts presented in the folder.
         """
         txt_s = txt_sup.TextSupport()
         print("Get all texts from the examples folder.")
@@ -489,13 +488,12 @@ def print_sent_and_tags_analysis(condition_results, results):
 
 
 def check_for_adverbial(cond_index_list, sent_index, result):
-    """Check if there is an adverbial in the sentence on the condition index."""
+    """Check if there is an adverbial in the sentence on the condition index.
+
+    The result is an SrlTagIndex or the SRL result of the text.
+    """
     cond_index = cond_index_list[1]
-    cond_tags = [x["tags"][cond_index] for x in result[sent_index]["verbs"]]
-    cond_adv_sents_index = [i for i, x in enumerate(cond_tags) if x == "B-ARGM-ADV"]
-    if not cond_adv_sents_index:
-        return []
-    return cond_adv_sents_index
+    return get_srl_index(result)[sent_index].frames_at(cond_index, "B-ARGM-ADV")
 
 
 def get_adverbial(cond_index_list, sent_index, result):
@@ -505,34 +503,27 @@ def get_adverbial(cond_index_list, sent_index, result):
         - cond_index_list [(int),(int)]: index of the condition in the sentence, where
             the first is the begin and second is the end.
         - sent_index (int): index of the sentence in the text.
-        - result (list(dict(list(dict)))): a list of the SRL result, that will be searched.
+        - result (SrlTagIndex | list(dict(list(dict)))): the SRL result, that will be searched.
 
     Returns:
         - condition [(int),(int),(int),(int),(int),(int)]: list of integers: sentence
             index, adverbial sentence index, conditional index, index of the end of condition,
             conditional indicator index begin and conditional indicator end.
     """
-    cond_adv_sents_index = check_for_adverbial(cond_index_list, sent_index, result)
+    srl_tags = get_srl_index(result)
+    cond_adv_sents_index = check_for_adverbial(cond_index_list, sent_index, srl_tags)
     cond_index = cond_index_list[1]
     if cond_adv_sents_index:
-        # search further
-        tags = [
-            [t for t in result[sent_index]["verbs"][i]["tags"] if t == "I-ARGM-ADV"]
-            for i in cond_adv_sents_index
-        ]
-        best_tags_list = max(tags)
-        adv_sent_index = cond_adv_sents_index[tags.index(best_tags_list)]
-        condition_sent = " ".join(
-            result[sent_index]["words"][
-                cond_index : cond_index + len(best_tags_list) + 1
-            ]
-        )
-        description = result[sent_index]["verbs"][adv_sent_index]["description"]
+        # search further, the adverbial with the most I-ARGM-ADV tags is the longest.
+        sentence = srl_tags[sent_index]
+        lengths = [sentence.count(i, "I-ARGM-ADV") for i in cond_adv_sents_index]
+        best_length = max(lengths)
+        adv_sent_index = cond_adv_sents_index[lengths.index(best_length)]
         condition = [
             sent_index,
             adv_sent_index,
             cond_index + 1,
-            cond_index + len(best_tags_list),
+            cond_index + best_length,
             cond_index_list[0],
             cond_index_list[1],
         ]
@@ -548,23 +539,19 @@ def get_condition_SRL_after_indicator(cond_index_list, sent_index, result):
         - cond_index_list [(int),(int)]: index of the condition in the sentence,
             where the first is the begin and second is the end.
         - sent_index (int): index of the sentence in the text.
-        - result (list(dict(list(dict)))): a list of the SRL result, that will be searched.
+        - result (SrlTagIndex | list(dict(list(dict)))): the SRL result, that will be searched.
 
     Returns:
         - condition [(int),(int),(int),(int),(int),(int)]: list of integers: sentence index,
             condition sentence index, conditional index and the index of the end of condition,
             conditional indicator index begin and conditional indicator end.
     """
+    sentence = get_srl_index(result)[sent_index]
     cond_index = cond_index_list[1]
-    if cond_index + 1 <= len(result[sent_index]["verbs"][0]["tags"]):
+    if cond_index + 1 < len(sentence):
         # not going out of bounds
-        tags_next_cond = [
-            x["tags"][cond_index + 1] for x in result[sent_index]["verbs"]
-        ]
         # Get the ones with a B-ARG
-        cond_next_sents_index = [
-            i for i, x in enumerate(tags_next_cond) if "B-ARG" in x
-        ]
+        cond_next_sents_index = sentence.frames_containing_at(cond_index + 1, "B-ARG")
         if not cond_next_sents_index:
             print(
                 (
@@ -572,18 +559,13 @@ def get_condition_SRL_after_indicator(cond_index_list, sent_index, result):
                     + "sen: {}, cond_ix: {}"
                 ).format(sent_index, cond_index)
             )
-            print("Sent: {}".format(result[sent_index]["verbs"][0]["description"]))
+            print("Sent: {}".format(sentence.descriptions[0]))
             # return []
         # Find the longest and the last index of the SRL
-        end_index = []
-        for next_sen_index in cond_next_sents_index:
-            counter = 0
-            for index, item in enumerate(
-                result[sent_index]["verbs"][next_sen_index]["tags"]
-            ):
-                if item != "O":
-                    counter = index
-            end_index.append(counter)
+        end_index = [
+            sentence.last_tagged(next_sen_index)
+            for next_sen_index in cond_next_sents_index
+        ]
         longest_index = max(end_index)
         srl_res_index = cond_next_sents_index[end_index.index(longest_index)]
         return [
@@ -602,7 +584,7 @@ def get_condition_SRL_after_indicator(cond_index_list, sent_index, result):
 # test = get_condition_SRL_after_indicator(0,6,result)
 
 
-def get_srl_within_range(srl_index, search_index, after, srl_result_verbs):
+def get_srl_within_range(srl_index, search_index, after, sentence_tags):
     """Get SRL tags from a specified range and return the range from where it starts and ends.
 
     Args:
@@ -610,43 +592,28 @@ def get_srl_within_range(srl_index, search_index, after, srl_result_verbs):
         - search_index (int): index of where the search should begin or end.
         - after (bool): states of the search should start after the search_index if True,
             else it will start before.
-        - srl_result_verbs (list(dict)): srl result starting with the verbs: e.g.
-            result[10]['verbs']
+        - sentence_tags (SentenceTags): the tags of the sentence, e.g. srl_tags[10]
 
     Returns:
         - [first_index,end_index] (list(int,int)): first_index indicates the start of a SRL
             set and end_index the end.
     """
-    # advSent = adverbial_data[1]
-    # endCond = adverbial_data[3]
-    # Check for action from point
-    first_index = -1
-    end_index = -1
-    search_item = []
+    tokens = range(len(sentence_tags))
     if after:
-        search_item = srl_result_verbs[srl_index]["tags"][search_index + 1 :]
+        tokens = tokens[search_index + 1 :]
     else:
-        search_item = srl_result_verbs[srl_index]["tags"][:search_index]
-    # result[sent_index]['verbs'][srl_index]['tags'][endCond+1:]
-    for index, item in enumerate(search_item):
-        if item != "O":
-            if first_index == -1:
-                first_index = index + search_index + 1 if after else index
-            end_index = index
-    if end_index != -1:
-        end_index = end_index + search_index + 1 if after else end_index
-    return [first_index, end_index]
-
-
-def get_action_srl_results(begin_arg_sents, end_condition, result_verbs):
+        tokens = tokens[:search_index]
+    return sentence_tags.tagged_range(srl_index, tokens)
+
+
+def get_action_srl_results(begin_arg_sents, end_condition, sentence_tags):
     """Get the actions, using SRL and the last index of a condition.
 
     Args:
         - begin_arg_sents (list(list(int,int)): sentences with B-ARG in them, it contains
             the sentence index and SRL tag: [index, SRLTag]
         - end_condition (int): index of the end of the condition.
-        - result_verbs (list(dict(list)): result for this specific sentence with the verbs.
-            result[sent_index]['verbs']
+        - sentence_tags (SentenceTags): the tags of this specific sentence, srl_tags[sent_index]
 
     Returns:
         - action (list(int,int)): a list with two integers, begin index and end index of
@@ -655,7 +622,7 @@ def get_action_srl_results(begin_arg_sents, end_condition, result_verbs):
     action_results = []
     for item in begin_arg_sents:
         action_results.append(
-            get_srl_within_range(item[0], end_condition, True, result_verbs)
+            get_srl_within_range(item[0], end_condition, True, sentence_tags)
         )
     compare_lengths = [sum(x) for x in action_results]
     item_index = compare_lengths.index(max(compare_lengths))
@@ -671,7 +638,8 @@ def orchestration_condition_sentence(
     Args:
         - sent_index (int): The index of the sentence we are considering as part of the text.
         - sen_cond_data (list): element containing the found condition indicators for the sentence.
-        - result (list(dict(list(dict)))): a list of the SRL result, that will be searched.
+        - result (SrlTagIndex | list(dict(list(dict)))): the SRL result, that will be
+            searched. Pass the SrlTagIndex of the text to build it only once.
 
     Returns:
         - [condition,action] (list):
@@ -687,16 +655,17 @@ def orchestration_condition_sentence(
         - We assume that the condition with an action following is the most important
     """
     condition_action_results = []
+    srl_tags = get_srl_index(result)
+    sentence = srl_tags[sent_index]
     # loop through the cond index
     for conditional_indicator in sen_cond_data:
         # If we have a conditional indicator with multiple words.
         cond_list = conditional_indicator.split(" ")
         cond_end_index = len(cond_list) - 1
 
-        sent_words = [x.lower() for x in result[sent_index]["words"]]
         try:
-            sen_begin_index = sent_words.index(cond_list[0])
-            sen_end_index = sent_words.index(cond_list[cond_end_index])
+            sen_begin_index = sentence.word_index(cond_list[0])
+            sen_end_index = sentence.word_index(cond_list[cond_end_index])
         except:
             print(
                 (
@@ -710,16 +679,14 @@ def orchestration_condition_sentence(
             return condition_action_results
         cond_index_list = [sen_begin_index, sen_end_index]
         # Check for adverbial
-        adverbial_data = get_adverbial(cond_index_list, sent_index, result)
+        adverbial_data = get_adverbial(cond_index_list, sent_index, srl_tags)
         action_in_front = False
         if adverbial_data:
             adv_sent = adverbial_data[1]
             begin_cond = adverbial_data[2]
             end_cond = adverbial_data[3]
             # Check for action from point
-            adv_action_data = get_srl_within_range(
-                adv_sent, end_cond, True, result[sent_index]["verbs"]
-            )
+            adv_action_data = get_srl_within_range(adv_sent, end_cond, True, sentence)
             if adv_action_data[0] == -1:
                 # Check for action in front of index
                 cond_length = cond_index_list[1] - cond_index_list[0] + 1
@@ -727,7 +694,7 @@ def orchestration_condition_sentence(
                     adv_sent,
                     begin_cond - cond_length,
                     False,
-                    result[sent_index]["verbs"],
+                    sentence,
                 )
                 if adv_action_data:
                     action_in_front = True
@@ -750,7 +717,7 @@ def orchestration_condition_sentence(
         # If not adverbial check for SRL condition
         else:
             srl_data = get_condition_SRL_after_indicator(
-                cond_index_list, sent_index, result
+                cond_index_list, sent_index, srl_tags
             )
             if srl_data:
                 # Check for action from end of condition
@@ -759,7 +726,7 @@ def orchestration_condition_sentence(
                 end_cond = srl_data[3]
                 # select possible sentences
                 conditional_keyword = " ".join(
-                    result[sent_index]["words"][srl_data[4] : srl_data[5] + 1]
+                    sentence.words[srl_data[4] : srl_data[5] + 1]
                 )
                 if conditional_keyword in empty_conditional_indicators:
                     # We have an empty conditional indicator, so we move the found
@@ -775,15 +742,15 @@ def orchestration_condition_sentence(
 
                 else:
                     # consider the one after the end and + 1 if there is a srl result
-                    next_cond = [
-                        x["tags"][end_cond + 1] for x in result[sent_index]["verbs"]
-                    ]
                     begin_arg = [
-                        [index, x] for index, x in enumerate(next_cond) if "B-ARG" in x
+                        [index, sentence.tags_at(end_cond + 1)[index]]
+                        for index in sentence.frames_containing_at(
+                            end_cond + 1, "B-ARG"
+                        )
                     ]
                     if begin_arg:
                         action_result = get_action_srl_results(
-                            begin_arg, end_cond, result[sent_index]["verbs"]
+                            begin_arg, end_cond, sentence
                         )
                         action = [
                             sent_index,
@@ -792,20 +759,17 @@ def orchestration_condition_sentence(
                             action_result[1],
                         ]
                     else:
-                        if end_cond + 2 < len(result[sent_index]["words"]):
+                        if end_cond + 2 < len(sentence):
                             # make sure we don't go further than the index of the sentence
-                            next_cond = [
-                                x["tags"][end_cond + 2]
-                                for x in result[sent_index]["verbs"]
-                            ]
                             begin_arg = [
-                                [index, x]
-                                for index, x in enumerate(next_cond)
-                                if "B-ARG" in x
+                                [index, sentence.tags_at(end_cond + 2)[index]]
+                                for index in sentence.frames_containing_at(
+                                    end_cond + 2, "B-ARG"
+                                )
                             ]
                             if begin_arg:
                                 action_result = get_action_srl_results(
-                                    begin_arg, end_cond, result[sent_index]["verbs"]
+                                    begin_arg, end_cond, sentence
                                 )
                                 action = [
                                     sent_index,
@@ -831,29 +795,39 @@ def orchestration_condition_sentence(
     return condition_action_results
 
 
-def extract_condition_action_data(texts: list, results: list) -> list:
+def extract_condition_action_data(
+    texts: list, results: list, sentences_with_condition_keywords: list = None
+) -> list:
     """Extract condition data for all the existing texts.
 
     Args:
         - texts (list(str)): list of texts to process.
         - results (list): list of all srl_results
+        - sentences_with_condition_keywords (list): optional, the result of
+            select_sentences_with_condition_keywords_for_texts for the texts, if the
+            keyword scan has already run (e.g. at the same time as the SRL).
 
     Returns:
         - condition_action_result (list): for each text a dictionary with
                 sen_index as key and a condition, action pair
     """
     condition_action_result = []
-    cond_extract_interface = ConditionExtractionInterface()
-    sentences_with_condition_keywords = (
-        cond_extract_interface.select_sentences_with_condition_keywords_for_texts(texts)
-    )
+    if sentences_with_condition_keywords is None:
+        cond_extract_interface = ConditionExtractionInterface()
+        sentences_with_condition_keywords = (
+            cond_extract_interface.select_sentences_with_condition_keywords_for_texts(
+                texts
+            )
+        )
     for index, text_condition_data in enumerate(sentences_with_condition_keywords):
         sentence_ids = text_condition_data["sen_ids"]
         keywords_per_sentence = text_condition_data["sen_id_data"]
         condition_action_per_sentence = {}
+        # built once per text, instead of scanning the SRL result for every indicator.
+        srl_tags = get_srl_index(results[index])
         for sent_id in sentence_ids:
             conditional_result = orchestration_condition_sentence(
-                sent_id, keywords_per_sentence[sent_id], results[index]
+                sent_id, keywords_per_sentence[sent_id], srl_tags
             )
             condition_action_per_sentence[sent_id] = conditional_result
         condition_action_result.append(condition_action_per_sentence)
@@ -1,3 +1,5 @@
+from tools.indicator_matcher import IndicatorMatcher
+
 friedrich_conditional_indicators = [
     "if",
     "whether",
@@ -83,3 +85,8 @@ sequence_indicators = (
     + ferreira_sequence_indicators
     + self_sequence_indicators
 )
+
+# compiled once, see tools/indicator_matcher.py
+conditional_matcher = IndicatorMatcher(conditional_indicators)
+parallel_matcher = IndicatorMatcher(parallel_indicators)
+sequence_matcher = IndicatorMatcher(sequence_indicators)
@@ -1,10 +1,7 @@
 """The pipeline script to combine all the different NLP modules."""
 import itertools
 import time
-import nltk
-import spacy
 from nltk import pos_tag
-from nltk.tokenize import word_tokenize, sent_tokenize
 import activity_model.activity_interface as act_int
 import condition_extraction as cond_extr
 from configuration.indicators import empty_conditional_indicators
@@ -12,10 +9,10 @@ from activity_model.node import NodeType
 import allen_nlp.semantic_role_labelling as sem_rol
 import allen_nlp.coreference as corefer
 import allen_nlp.entailment as entail
-
-
-nltk.download("averaged_perceptron_tagger")
-spacy_nlp = spacy.load("en_core_web_sm")
+from tools.document import get_document
+from tools.nlp_resources import resources
+from tools.stage_graph import StageGraph
+from tools.tracing import start_run
 
 
 class Pipeline:
@@ -78,26 +75,18 @@ class Pipeline:
 
     def get_list_of_text(self):
         """Create list of words for each sentence."""
-        sents = sent_tokenize(self.text)
-        words = [word_tokenize(sen) for sen in sents]
-        return words
+        return get_document(self.text).tokens
 
     def get_list_sent_lengths(self, text: str) -> list:
         """Create list of lengths of words per sentence."""
-        doc = spacy_nlp(text)
-        sents = [str(sent) for sent in doc.sents]
-        sent_words = [word_tokenize(sen) for sen in sents]
-        last = 0
-        sen_lens = []
-        for words in sent_words:
-            length = last + len(words)
-            sen_lens.append(length)
-            last = length
-        return sen_lens
-
-    def add_sent_index_coref(self, coref_output: list, text: str) -> list:
+        return get_document(text).sentence_lengths
+
+    def add_sent_index_coref(
+        self, coref_output: list, text: str, sentence_lengths: list = None
+    ) -> list:
         """Add the index of the sentence to the coref_output"""
-        sentence_lengths = self.get_list_sent_lengths(text)
+        if sentence_lengths is None:
+            sentence_lengths = self.get_list_sent_lengths(text)
         for index, coref in enumerate(coref_output):
             antecedent_index = coref_output[index][0][1][0]
             possible_sent_indices = [
@@ -110,16 +99,25 @@ class Pipeline:
         return coref_output
 
     def coreference_text(self, text: str) -> list:
-        """Use coreference for a text and select all personal antecedents."""
+        """Use coreference for a text and select all personal antecedents.
+
+        Without the coreference service the text is used uncorrected: no
+        antecedents and clusters, the words and sentences of the Document.
+        """
         coref = corefer.Coreference()
-        coref.connect(document=text)
+        if not coref.connect(document=str(text)):
+            document = get_document(text)
+            words = [word for tokens in document.tokens for word in tokens]
+            sentence_lengths = list(itertools.accumulate(map(len, document.tokens)))
+            return [[], words, [], sentence_lengths]
         coref.parse_data()
         output = coref.find_all_personal_ant()
         coref_text_list = coref.output["document"]
         coref_text = " ".join(coref_text_list)
-        output = self.add_sent_index_coref(output, coref_text)
+        sentence_lengths = coref.get_sentence_lengths()
+        output = self.add_sent_index_coref(output, coref_text, sentence_lengths)
         clusters = coref.output["clusters"]
-        return [output, coref_text_list, clusters]
+        return [output, coref_text_list, clusters, sentence_lengths]
 
     def tag_conditions_actions_in_avo_results(
         self, agent_verb_object_results: list, condition_actions_list: dict
@@ -218,6 +216,8 @@ class Pipeline:
         action = self.act_interface.create_add_node(
             activity_id, NodeType.ACTION, {"name": node_name}
         )
+        if avo.get("verb_lemmas") is not None:
+            self.act_interface.verb_lemmas[action] = avo["verb_lemmas"]
         self.act_interface.create_connection(
             activity_id, previous_node, action, {"guard": guard}
         )
@@ -234,6 +234,8 @@ class Pipeline:
         action = self.act_interface.create_add_node(
             activity_id, NodeType.ACTION, {"name": node_name}
         )
+        if avo.get("verb_lemmas") is not None:
+            self.act_interface.verb_lemmas[action] = avo["verb_lemmas"]
         self.act_interface.create_connection(activity_id, previous_node, action, {})
         previous_node = action
         return [previous_node]
@@ -1008,18 +1010,47 @@ class Pipeline:
             self.act_interface.post_url, data
         )
 
-    def get_noun_chunk(self, text_array: list) -> list:
-        """Gets the nounchunk for a particular text."""
+    def get_noun_chunk(self, text_array: list, annotations: list = None) -> list:
+        """Gets the nounchunk for a particular text.
+
+        The POS tags are taken from the annotations of Document.annotated_span when
+        given, else the words are tagged with nltk.
+        """
         noun_pos = ["NN", "NNS", "NNPS", "NNP"]
-        text_pos = pos_tag(text_array)
+        if annotations is not None:
+            text_pos = [(word, tag) for word, tag, _ in annotations]
+        else:
+            resources.require_nltk("averaged_perceptron_tagger")
+            text_pos = pos_tag(text_array)
         noun_text = [result[0] for result in text_pos if result[1] in noun_pos]
         return noun_text
 
+    def add_verb_lemmas_avo_sents(self, agent_verb_object_sentences: list, document):
+        """Add the lemmas of the verbs in the action text of each avo_sentence.
+
+        The lemmas come from the Document of the text, None when its tokens differ
+        from the SRL words, then the termination check tags the node name itself.
+        """
+        for avo_sentence in agent_verb_object_sentences:
+            annotations = document.annotated_span(
+                avo_sentence["sent_index"],
+                avo_sentence["begin_index"],
+                avo_sentence["end_index"],
+                avo_sentence["action_text"],
+            )
+            avo_sentence["verb_lemmas"] = None
+            if annotations is not None:
+                avo_sentence["verb_lemmas"] = [
+                    lemma for _, tag, lemma in annotations if tag.startswith("VB")
+                ]
+        return agent_verb_object_sentences
+
     def get_agents_and_tag_swimlanes_avo_sents(
-        self, agent_verb_object_sentences: list
+        self, agent_verb_object_sentences: list, document=None
     ) -> list:
         """Gets all the agents from the agent_verb_object_sentences and addes the
-        swimminglane keys and words."""
+        swimminglane keys and words. The POS tags of the agents are taken from the
+        Document of the text when it is given."""
         agents = []
         for avo_sentence_index, avo_sentence in enumerate(agent_verb_object_sentences):
             for avo_result_index, avo_result in enumerate(avo_sentence["avo_results"]):
@@ -1030,8 +1061,17 @@ class Pipeline:
                     avo_sentence["sw_lane"] = [begin_index, end_index]
                     # here we select the swim lane text. based on the first found agent
                     #  TODO there might be better actors.
+                    annotations = None
+                    if document is not None:
+                        annotations = document.annotated_span(
+                            avo_sentence["sent_index"],
+                            avo_result["agent"][0],
+                            avo_result["agent"][1],
+                            avo_sentence["action_text"][begin_index : end_index + 1],
+                        )
                     avo_sentence["sw_lane_text"] = self.get_noun_chunk(
-                        avo_sentence["action_text"][begin_index : end_index + 1]
+                        avo_sentence["action_text"][begin_index : end_index + 1],
+                        annotations,
                     )
                     # print("avo_sen{}: {}".format(avo_sentence_index,
                     # " ".join(avo_sentence['action_text'][begin_index:end_index + 1])))
@@ -1048,21 +1088,92 @@ class Pipeline:
                     )
         return agents
 
-    def run_demo_for_text(self, text: str, post_data: bool, model_name: str) -> list:
-        """Run demo for a given text."""
+    def create_stage_graph(self, text: str, model_name: str = None) -> StageGraph:
+        """Declare the stages of the pipeline for a text.
+
+        Description:
+           The text is split into sentences and tokens once, the "document" stage passes
+           this Document to the stages that need it; avo and agents read the POS tags
+           and lemmas of its spaCy parse. SRL, the condition keyword scan and
+           coreference only need the text and run at the same time. The stages
+           after them change the avo_sents in place, so every stage takes the output
+           of the previous one as input. Running the graph only computes the stages
+           needed for the requested outputs.
+
+        Args:
+           - text (str | Document): the text to process.
+           - model_name (str): the name of the model created by the "model" stage.
+
+        Returns:
+           - graph (StageGraph): with the stages document, srl, keywords, coref,
+                conditions, avo, agents, swimlanes, entailment and model.
+        """
+        document = get_document(text)
         srl = sem_rol.SemanticRoleLabelling()
-        srl_result = srl.semrol_text(text)
-        condition_res = cond_extr.extract_condition_action_data([text], [srl_result])
-        avo_sents = srl.get_avo_for_sentences(srl_result)
-        avo_sents = self.tag_conditions_actions_in_avo_results(
-            avo_sents, condition_res[0]
+        cor = corefer.Coreference()
+        cond_interface = cond_extr.ConditionExtractionInterface()
+
+        def keywords(document):
+            return cond_interface.select_sentences_with_condition_keywords_for_texts(
+                [document]
+            )
+
+        def conditions(document, srl_result, keywords):
+            return cond_extr.extract_condition_action_data(
+                [document], [srl_result], keywords
+            )[0]
+
+        def avo(document, srl_result, condition_res):
+            avo_sents = srl.get_avo_for_sentences(srl_result)
+            avo_sents = self.add_verb_lemmas_avo_sents(avo_sents, document)
+            return self.tag_conditions_actions_in_avo_results(avo_sents, condition_res)
+
+        def agents(document, avo_sents):
+            return self.get_agents_and_tag_swimlanes_avo_sents(avo_sents, document)
+
+        def swimlanes(avo_sents, _, coref):
+            cor.fill_swimming_lanes_and_coref_sents(
+                avo_sents, coref[0], coref[1], coref[3]
+            )
+            cor.tag_clusters_avo_sents(avo_sents, coref[1], coref[2], coref[3])
+            return avo_sents
+
+        def entailment(avo_sents):
+            self.conditional_entailment(avo_sents)
+            return avo_sents
+
+        graph = StageGraph()
+        graph.add("document", lambda: document)
+        graph.add("srl", srl.semrol_text, ("document",))
+        graph.add("keywords", keywords, ("document",))
+        graph.add("coref", self.coreference_text, ("document",))
+        graph.add("conditions", conditions, ("document", "srl", "keywords"))
+        graph.add("avo", avo, ("document", "srl", "conditions"))
+        graph.add("agents", agents, ("document", "avo"))
+        graph.add("swimlanes", swimlanes, ("avo", "agents", "coref"))
+        graph.add("entailment", entailment, ("swimlanes",))
+        graph.add(
+            "model",
+            lambda avo_sents: self.create_model_using_avo(model_name, avo_sents),
+            ("entailment",),
         )
-        coref = self.coreference_text(text)
-        # avo_sents = self.replace_action_text_with_coref(avo_sents,coref[0],coref[1])
-        agents = self.get_agents_and_tag_swimlanes_avo_sents(avo_sents)
+        return graph
+
+    def run_demo_for_text(self, text: str, post_data: bool, model_name: str) -> list:
+        """Run demo for a given text."""
+        print("pipeline run {}".format(start_run()))
+        graph = self.create_stage_graph(text, model_name)
+        results = graph.run(["srl", "conditions", "avo", "agents", "coref"])
+        avo_sents = results["avo"]
         if post_data:
             print(self.create_model_using_avo(model_name, avo_sents))
-        return [srl_result, condition_res[0], avo_sents, agents, coref]
+        return [
+            results["srl"],
+            results["conditions"],
+            avo_sents,
+            results["agents"],
+            results["coref"],
+        ]
 
 
 TEST_TEXT = (
@@ -1080,10 +1191,12 @@ TEST_TEXT = (
 
 def test_condition_extraction(test_text: str) -> list:
     """Method to test the condition extraction process."""
+    print("pipeline run {}".format(start_run()))
     ppl = Pipeline()
+    document = get_document(test_text)
     srl = sem_rol.SemanticRoleLabelling()
-    srl_result = srl.semrol_text(test_text)
-    condition_res = cond_extr.extract_condition_action_data([test_text], [srl_result])
+    srl_result = srl.semrol_text(document)
+    condition_res = cond_extr.extract_condition_action_data([document], [srl_result])
     avo_sents = srl.get_avo_for_sentences(srl_result)
     avo_sents = ppl.tag_conditions_actions_in_avo_results(avo_sents, condition_res[0])
     return [condition_res, avo_sents]
@@ -1091,6 +1204,7 @@ def test_condition_extraction(test_text: str) -> list:
 
 def test_model_building(model_name: str, avo_sents: list) -> None:
     """Test the model building process."""
+    print("pipeline run {}".format(start_run()))
     start = time.time()
     ppl = Pipeline()
     ppl.create_model_using_avo(model_name, avo_sents)
@@ -1101,23 +1215,12 @@ def test_model_building(model_name: str, avo_sents: list) -> None:
 
 def run_latest_demo(name: str, test_text: str, post_model: bool) -> list:
     """Method to run the latest demo"""
+    print("pipeline run {}".format(start_run()))
     start = time.time()
     ppl = Pipeline()
-    srl = sem_rol.SemanticRoleLabelling()
-    srl_result = srl.semrol_text(test_text)
-    condition_res = cond_extr.extract_condition_action_data([test_text], [srl_result])
-    avo_sents = srl.get_avo_for_sentences(srl_result)
-    avo_sents = ppl.tag_conditions_actions_in_avo_results(avo_sents, condition_res[0])
-    coref = ppl.coreference_text(test_text)
-    ppl.get_agents_and_tag_swimlanes_avo_sents(avo_sents)
-    cor = corefer.Coreference()
-    cor.fill_swimming_lanes_and_coref_sents(avo_sents, coref[0], coref[1])
-    cor.tag_clusters_avo_sents(avo_sents, coref[1], coref[2])
-    before_entail = time.time()
-    print("time elapsed before entail {}".format(before_entail - start))
-    ppl.conditional_entailment(avo_sents)
+    graph = ppl.create_stage_graph(test_text, name)
+    results = graph.run(["model"] if post_model else ["entailment"])
+    graph.print_durations()
     end = time.time()
     print("time elapsed {}".format(end - start))
-    if post_model:
-        ppl.create_model_using_avo(name, avo_sents)
-    return avo_sents
+    return results["entailment"]
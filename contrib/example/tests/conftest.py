@@ -0,0 +1,17 @@
+import json
+import os
+import pytest
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+
+@pytest.fixture
+def srl_output():
+    """SRL output of a text in the format of /predict/srl, hand-tagged.
+
+    It has sentences with several verb frames whose spans overlap, an adverbial at
+    the start, repeated and discontinuous ARG tags (R-ARG0, C-ARG1), a sentence
+    without verbs and a frame without any tag.
+    """
+    with open(os.path.join(DATA, "srl_output.json")) as file:
+        return json.load(file)
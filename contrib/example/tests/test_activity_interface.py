@@ -0,0 +1,96 @@
+import random
+from nltk.tokenize import RegexpTokenizer
+from activity_model.activity_interface import ActivityInterface
+from activity_model.node import NodeType
+
+NODE_TYPES = [NodeType.ACTION, NodeType.MERGE, NodeType.DECISION]
+
+
+def scan_connections(interface, node_id, from_node):
+    """The connections of a node found by a scan over all connections."""
+    return [
+        key
+        for key, connection in interface.connections.items()
+        if (connection.from_node_key if from_node else connection.to_node_key)
+        == node_id
+    ]
+
+
+def scan_node_keys(interface, node_type):
+    """The node keys of a type found by a scan over all nodes."""
+    return [key for key, node in interface.nodes.items() if node.type == node_type]
+
+
+def random_edits(interface, rand, steps):
+    """Create and delete random nodes and connections, yield after each edit."""
+    for _ in range(steps):
+        operation = rand.random()
+        node_keys = list(interface.nodes)
+        if operation < 0.4 or len(node_keys) < 2:
+            interface.create_add_node(1, rand.choice(NODE_TYPES), {"name": "node"})
+        elif operation < 0.8:
+            # self loops included, delete_node then meets the connection twice.
+            interface.create_connection(
+                1, rand.choice(node_keys), rand.choice(node_keys), {}
+            )
+        elif operation < 0.9:
+            interface.delete_node(rand.choice(node_keys))
+        elif interface.connections:
+            interface.delete_connection(rand.choice(list(interface.connections)))
+        yield
+
+
+def test_adjacency_matches_scans():
+    """Test if the connection and type lookups equal the scans after every edit."""
+    rand = random.Random(49)
+    for _ in range(50):
+        interface = ActivityInterface()
+        for _ in random_edits(interface, rand, 60):
+            for node_id in interface.nodes:
+                assert interface.get_connections_using_from_node_id(
+                    node_id
+                ) == scan_connections(interface, node_id, True)
+                assert interface.get_connections_to_node_id(
+                    node_id
+                ) == scan_connections(interface, node_id, False)
+            for node_type in NODE_TYPES:
+                assert interface.get_all_node_keys_by_type(
+                    node_type
+                ) == scan_node_keys(interface, node_type)
+
+
+def test_delete_node_drops_adjacency():
+    """Test if deleting a node removes its connections from the other nodes."""
+    interface = ActivityInterface()
+    first, second, third = (
+        interface.create_add_node(1, NodeType.ACTION, {"name": name})
+        for name in ("a", "b", "c")
+    )
+    for from_id, to_id in ((first, second), (first, third), (second, third)):
+        interface.create_connection(1, from_id, to_id, {})
+    to_second, to_third, _ = interface.connections
+    assert interface.get_connections_using_from_node_id(first) == [
+        to_second,
+        to_third,
+    ]
+    interface.delete_node(second)
+    assert interface.get_connections_using_from_node_id(first) == [to_third]
+    assert interface.get_connections_to_node_id(third) == [to_third]
+    assert interface.get_connections_to_node_id(second) == []
+    assert interface.get_all_node_keys_by_type(NodeType.ACTION) == [first, third]
+    interface.clear_data()
+    assert interface.outgoing == interface.incoming == interface.nodes_by_type == {}
+
+
+def test_termination_uses_verb_lemmas():
+    """Test if the termination check uses the verb lemmas of the annotated text."""
+    interface = ActivityInterface()
+    action = interface.create_add_node(
+        1, NodeType.ACTION, {"name": "stops the process"}
+    )
+    interface.verb_lemmas[action] = ["stop"]
+    tokenizer = RegexpTokenizer(r"\w+")
+    assert interface.get_termination_actions([action], tokenizer, ["stop"]) == [action]
+    assert interface.get_termination_actions([action], tokenizer, ["end"]) == []
+    interface.clear_data()
+    assert interface.verb_lemmas == {}
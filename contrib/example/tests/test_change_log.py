@@ -0,0 +1,89 @@
+import random
+import uuid
+import pytest
+from activity_model.activity_interface import ActivityInterface
+from activity_model.change_log import ChangeLog
+from activity_model.connection import ConnectionChange
+from activity_model.node import NodeChange, NodeType
+from tests.test_activity_interface import random_edits
+
+
+class ListLog(list):
+    """The plain list of changes the ChangeLog replaced, with scans for the lookups."""
+
+    def get_node_changes(self, node_key):
+        return [
+            change
+            for change in self
+            if isinstance(change, NodeChange) and change.node_key == node_key
+        ]
+
+    def get_connection_changes(self, connection_key):
+        return [
+            change
+            for change in self
+            if isinstance(change, ConnectionChange) and change.key == connection_key
+        ]
+
+
+def node_change(node_key):
+    return NodeChange("new-action", NodeType.ACTION, 1, None, node_key, 0, 0, "", "")
+
+
+def connection_change(key):
+    return ConnectionChange("new-connection", "", "", "a", "b", 1, key)
+
+
+def test_log_matches_list():
+    """Test if appends and removes, also of equal changes, keep the list order."""
+    rand = random.Random(50)
+    makers = [node_change, connection_change]
+    for _ in range(100):
+        log, reference = ChangeLog(), ListLog()
+        for _ in range(80):
+            if reference and rand.random() < 0.4:
+                change = rand.choice(reference)
+                log.remove(change)
+                reference.remove(change)
+            else:
+                # few keys, such that the same change is appended more than once.
+                change = rand.choice(makers)(str(rand.randrange(5)))
+                log.append(change)
+                reference.append(change)
+            assert list(log) == reference
+            assert len(log) == len(reference)
+            for key in map(str, range(5)):
+                assert log.get_node_changes(key) == reference.get_node_changes(key)
+                assert log.get_connection_changes(
+                    key
+                ) == reference.get_connection_changes(key)
+
+
+def test_remove_missing_change():
+    """Test if removing a change that is not in the log raises like list.remove."""
+    log = ChangeLog([node_change("a"), object()])
+    with pytest.raises(ValueError):
+        log.remove(node_change("b"))
+    with pytest.raises(ValueError):
+        log.remove(object())
+    assert len(log) == 2
+
+
+def test_post_data_matches_list(monkeypatch):
+    """Test if the posted changes keep their order after creating and deleting."""
+    rand = random.Random(50)
+    for _ in range(50):
+        seed = rand.random()
+        posts = []
+        for changes in (ChangeLog(), ListLog()):
+            keys = random.Random(seed)
+            monkeypatch.setattr(
+                uuid, "uuid4", lambda: uuid.UUID(int=keys.getrandbits(128))
+            )
+            interface = ActivityInterface()
+            interface.changes = changes
+            interface.changes.append(interface.create_activity("activity", {}))
+            for _ in random_edits(interface, random.Random(seed), 80):
+                pass
+            posts.append(interface.create_post_data())
+        assert posts[0] == posts[1]
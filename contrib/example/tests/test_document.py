@@ -0,0 +1,112 @@
+import re
+import pytest
+import allen_nlp.coreference as corefer
+from pipeline import Pipeline
+from tools import document as document_module
+from tools.document import Document
+
+TAGS = {"customer": ("NN", "customer"), "pays": ("VBZ", "pay"), "bill": ("NN", "bill")}
+
+
+class FakeToken:
+    def __init__(self, text, idx):
+        self.text = text
+        self.idx = idx
+        self.is_space = False
+        self.tag_, self.lemma_ = TAGS.get(text, ("DT", text.lower()))
+
+
+class FakeDoc(list):
+    """Tokens on white space, sentences only end at "!", unlike the nltk sentences."""
+
+    @property
+    def sents(self):
+        sentence = []
+        for token in self:
+            sentence.append(token.text)
+            if token.text.endswith("!"):
+                yield " ".join(sentence)
+                sentence = []
+        if sentence:
+            yield " ".join(sentence)
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """Count the spaCy parses, with a fake model instead of en_core_web_sm."""
+    parses = []
+
+    def nlp(text):
+        parses.append(text)
+        return FakeDoc(
+            FakeToken(match.group(), match.start())
+            for match in re.finditer(r"\S+", text)
+        )
+
+    monkeypatch.setattr(document_module.resources, "spacy", lambda disable=(): nlp)
+    monkeypatch.setattr(document_module.resources, "require_nltk", lambda name: None)
+    monkeypatch.setattr(document_module, "word_tokenize", str.split)
+    return parses
+
+
+def test_annotations_from_one_parse(parses):
+    """Test if the POS tags and lemmas per sentence come from one parse of the text."""
+    sentences = ["The customer pays the bill .", "The bill !"]
+    document = Document(" ".join(sentences), sentences)
+    assert document.pos_tags == [
+        ["DT", "NN", "VBZ", "DT", "NN", "DT"],
+        ["DT", "NN", "DT"],
+    ]
+    assert document.lemmas[0][2] == "pay"
+    assert document.annotated_span(0, 1, 2, ["customer", "pays"]) == [
+        ("customer", "NN", "customer"),
+        ("pays", "VBZ", "pay"),
+    ]
+    assert len(parses) == 1
+
+
+def test_annotated_span_other_words(parses):
+    """Test if a span whose tokens are not the SRL words has no annotations."""
+    document = Document("The customer pays .", ["The customer pays ."])
+    assert document.annotated_span(0, 1, 2, ["customers", "pay"]) is None
+    assert document.annotated_span(1, 0, 0, ["The"]) is None
+
+
+def test_sentence_lengths_use_spacy_sentences(parses):
+    """Test if the sentence lengths of the coreference follow the spaCy sentences."""
+    document = Document("A b . c d ! e", ["A b .", "c d !", "e"])
+    assert document.sentence_lengths == [6, 7]
+
+
+def test_pipeline_reads_annotations(parses):
+    """Test if the swim lane nouns and the verb lemmas are taken from the Document."""
+    words = ["The", "customer", "pays", "the", "bill", "."]
+    document = Document(" ".join(words), [" ".join(words)])
+    avo_sents = [
+        {
+            "sent_index": 0,
+            "begin_index": 0,
+            "end_index": 5,
+            "action_text": words,
+            "avo_results": [{"agent": [0, 1]}],
+        }
+    ]
+    pipeline = Pipeline()
+    pipeline.add_verb_lemmas_avo_sents(avo_sents, document)
+    assert avo_sents[0]["verb_lemmas"] == ["pay"]
+    pipeline.get_agents_and_tag_swimlanes_avo_sents(avo_sents, document)
+    assert avo_sents[0]["sw_lane_text"] == ["customer"]
+    assert len(parses) == 1
+
+
+def test_coreference_without_service(parses, monkeypatch):
+    """Test if the coreference falls back to the uncorrected words of the Document."""
+    monkeypatch.setattr(corefer.Coreference, "connect", lambda self, document: False)
+    document = Document("She pays . She leaves .", ["She pays .", "She leaves ."])
+    assert Pipeline().coreference_text(document) == [
+        [],
+        ["She", "pays", ".", "She", "leaves", "."],
+        [],
+        [3, 6],
+    ]
+    assert parses == []
@@ -0,0 +1,44 @@
+from configuration.indicators import conditional_matcher
+from tools.indicator_matcher import IndicatorMatcher
+
+
+def test_whole_words_only():
+    """Test if an indicator is not found inside another word."""
+    matcher = IndicatorMatcher(["if", "then"])
+    assert matcher.find("verify the specified order, thenceforth ship it") == []
+    assert matcher.find("if it is paid, then ship it") == ["if", "then"]
+
+
+def test_longest_indicator_wins():
+    """Test if a nested shorter indicator is not found as well, it is intended.
+
+    The condition extraction makes a condition per found indicator, "in case" inside
+    "in case of" would be a second condition for the same words.
+    """
+    text = "in case of a defect the crs repairs the hardware, in case the software fails"
+    assert conditional_matcher.find(text) == ["in case of", "in case"]
+    assert [match[1:] for match in conditional_matcher.matches(text)] == [
+        [0, 10],
+        [50, 57],
+    ]
+
+
+def test_matches_do_not_overlap():
+    """Test if overlapping indicators that start at different words match once."""
+    matcher = IndicatorMatcher(["in case", "case of"])
+    assert matcher.find("in case of a defect") == ["in case"]
+
+
+def test_find_each_once_in_order():
+    """Test if every indicator is returned once, in the order of the text."""
+    matcher = IndicatorMatcher(["if", "whether", "otherwise"])
+    text = "otherwise check whether it is paid, if it is not or if it is late"
+    assert matcher.find(text) == ["otherwise", "whether", "if"]
+
+
+def test_case_and_white_space():
+    """Test if indicators match in any case and with any white space between words."""
+    matcher = IndicatorMatcher(["In Case Of"])
+    assert matcher.matches("IN  case\nof rain") == [["in case of", 0, 11]]
+    assert matcher.search("Just in case of rain")
+    assert not IndicatorMatcher([]).search("in case of rain")
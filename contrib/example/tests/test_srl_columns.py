@@ -0,0 +1,152 @@
+import copy
+import random
+import pytest
+from allen_nlp.semantic_role_labelling import SemanticRoleLabelling, ranges_intersect
+from tools.srl_columns import SrlColumns
+
+TAGS = [
+    "O",
+    "B-ARG0",
+    "I-ARG0",
+    "B-ARG1",
+    "I-ARG1",
+    "B-V",
+    "I-V",
+    "B-ARGM-ADV",
+    "I-ARGM-ADV",
+    "B-ARGM-TMP",
+    "B-R-ARG0",
+    "B-C-ARG1",
+    "I-C-ARG1",
+]
+
+
+class ReferenceSrl(SemanticRoleLabelling):
+    """The AVO extraction as it was before SrlColumns, one frame and tag at a time."""
+
+    def get_agent_verb_object_data(self, srl_sentence_result):
+        spans = {key: [-1, -1] for key in ("tagged", "agent", "verb", "object", "ADV")}
+        for index, tag in enumerate(srl_sentence_result["tags"]):
+            keys = []
+            if tag != "O":
+                keys.append("tagged")
+                if "ARG0" in tag:
+                    keys.append("agent")
+                if "B-V" in tag or "I-V" in tag:
+                    keys.append("verb")
+                if "ARG1" in tag:
+                    keys.append("object")
+                if "ARGM-ADV" in tag:
+                    keys.append("ADV")
+            for key in keys:
+                if spans[key][0] == -1:
+                    spans[key][0] = index
+                spans[key][1] = index
+        return {
+            "agent": spans["agent"],
+            "verb": spans["verb"],
+            "object": spans["object"],
+            "begin_index": spans["tagged"][0],
+            "end_index": spans["tagged"][1],
+            "ADV": spans["ADV"],
+        }
+
+    def combine_agent_verb_objects_in_sentence(self, agent_verb_object_results):
+        found_ranges = []
+        for index, res in enumerate(agent_verb_object_results):
+            check_range = range(res["begin_index"], res["end_index"] + 1)
+            intersects = []
+            for range_index, found in enumerate(list(found_ranges)):
+                possible_range = found["range"]
+                if set(possible_range).intersection(check_range):
+                    if len(check_range) > len(possible_range):
+                        found_ranges[range_index]["range"] = check_range
+                        found_ranges[range_index]["longest"] = index
+                    found_ranges[range_index]["items"].append(index)
+                    intersects.append(possible_range)
+            if not intersects:
+                found_ranges.append(
+                    {"range": check_range, "longest": index, "items": [index]}
+                )
+        return found_ranges
+
+    def get_avo_for_sentences(self, srl_results):
+        avo_results = []
+        for sent_index, srl_result in enumerate(srl_results):
+            avo_res = self.get_avo_sentence(srl_result)
+            for avo_range in avo_res[1]:
+                begin, end = avo_range["range"][0], avo_range["range"][-1]
+                avo_results.append(
+                    {
+                        "action_text": srl_result["words"][begin : end + 1],
+                        "begin_index": begin,
+                        "end_index": end,
+                        "sent_index": sent_index,
+                        "avo_results": [
+                            result
+                            for index, result in enumerate(avo_res[0])
+                            if index in avo_range["items"]
+                        ],
+                        "condition": False,
+                        "action": False,
+                    }
+                )
+        return avo_results
+
+
+def random_srl_output(seed):
+    """SRL output with random tags, to cover combinations the recorded text has not."""
+    generator = random.Random(seed)
+    output = []
+    for _ in range(generator.randint(0, 6)):
+        words = [f"w{index}" for index in range(generator.randint(0, 20))]
+        verbs = [
+            {"tags": [generator.choice(TAGS) for _ in words], "description": ""}
+            for _ in range(generator.randint(0, 4))
+        ]
+        output.append({"words": words, "verbs": verbs})
+    return output
+
+
+def run(function, srl_output):
+    """Return the result of function, or the type of the error it raises."""
+    try:
+        return function(copy.deepcopy(srl_output))
+    except (ValueError, IndexError) as error:
+        return type(error)
+
+
+def test_frame_spans_match_reference(srl_output):
+    """Test if the spans per frame are those of the tag by tag extraction."""
+    reference = ReferenceSrl()
+    srl = SemanticRoleLabelling()
+    frames = [verb for sentence in srl_output for verb in sentence["verbs"]]
+    expected = [reference.get_agent_verb_object_data(verb) for verb in frames]
+    assert [srl.get_agent_verb_object_data(verb) for verb in frames] == expected
+    columns = SrlColumns(srl_output)
+    assert srl.get_agent_verb_object_data_for_columns(columns) == expected
+
+
+def test_avo_for_sentences_matches_reference(srl_output):
+    """Test if the AVO output is identical to the per sentence extraction."""
+    expected = ReferenceSrl().get_avo_for_sentences(copy.deepcopy(srl_output))
+    result = SemanticRoleLabelling().get_avo_for_sentences(copy.deepcopy(srl_output))
+    assert result == expected
+    # the sentence without verbs has no AVO, the sentences with verbs have one.
+    assert {avo["sent_index"] for avo in result} == {0, 1, 3, 4, 5, 6}
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_avo_for_random_tags_matches_reference(seed):
+    """Test if random tags give the same AVO output, or the same error."""
+    srl_output = random_srl_output(seed)
+    expected = run(ReferenceSrl().get_avo_for_sentences, srl_output)
+    assert run(SemanticRoleLabelling().get_avo_for_sentences, srl_output) == expected
+
+
+def test_ranges_intersect_like_sets():
+    """Test if the interval test agrees with the set intersection of the ranges."""
+    for first in [range(begin, end) for begin in range(-1, 5) for end in range(-1, 6)]:
+        for second in [range(begin, end) for begin in range(-1, 5) for end in range(6)]:
+            expected = bool(set(first).intersection(second))
+            assert ranges_intersect(first, second) == expected
@@ -0,0 +1,193 @@
+import pytest
+import condition_extraction as cond_extr
+from tools.srl_index import SrlTagIndex
+
+
+def reference_sentences_from_srl_tag(tag, output):
+    return [
+        verb["description"]
+        for sentence in output
+        for verb in sentence["verbs"]
+        if tag in verb["tags"]
+    ]
+
+
+def reference_sentences_from_srl_tags(tags, output):
+    result = []
+    for s_index, sentence in enumerate(output):
+        verbs = []
+        for verb in sentence["verbs"]:
+            found = [tag for tag in tags if tag in verb["tags"]]
+            if found:
+                verbs.append(
+                    {
+                        "description": verb["description"],
+                        "tags": verb["tags"],
+                        "foundTags": found,
+                        "s_index_text": s_index,
+                    }
+                )
+        if verbs:
+            result.append({"words": sentence["words"], "verbs": verbs})
+    return result
+
+
+def reference_adverbial(cond_index_list, sent_index, result):
+    cond_index = cond_index_list[1]
+    verbs = result[sent_index]["verbs"]
+    adverbials = [
+        i for i, verb in enumerate(verbs) if verb["tags"][cond_index] == "B-ARGM-ADV"
+    ]
+    if not adverbials:
+        return []
+    tags = [[t for t in verbs[i]["tags"] if t == "I-ARGM-ADV"] for i in adverbials]
+    best = max(tags)
+    return [
+        sent_index,
+        adverbials[tags.index(best)],
+        cond_index + 1,
+        cond_index + len(best),
+        cond_index_list[0],
+        cond_index_list[1],
+    ]
+
+
+def reference_condition_after_indicator(cond_index_list, sent_index, result):
+    cond_index = cond_index_list[1]
+    verbs = result[sent_index]["verbs"]
+    if cond_index + 1 <= len(verbs[0]["tags"]):
+        next_tags = [verb["tags"][cond_index + 1] for verb in verbs]
+        frames = [i for i, tag in enumerate(next_tags) if "B-ARG" in tag]
+        end_index = []
+        for frame in frames:
+            counter = 0
+            for index, tag in enumerate(verbs[frame]["tags"]):
+                if tag != "O":
+                    counter = index
+            end_index.append(counter)
+        longest = max(end_index)
+        return [
+            sent_index,
+            frames[end_index.index(longest)],
+            cond_index + 1,
+            longest,
+            cond_index_list[0],
+            cond_index_list[1],
+        ]
+    return []
+
+
+def reference_srl_within_range(srl_index, search_index, after, verbs):
+    first_index = -1
+    end_index = -1
+    if after:
+        search_item = verbs[srl_index]["tags"][search_index + 1 :]
+    else:
+        search_item = verbs[srl_index]["tags"][:search_index]
+    for index, item in enumerate(search_item):
+        if item != "O":
+            if first_index == -1:
+                first_index = index + search_index + 1 if after else index
+            end_index = index
+    if end_index != -1:
+        end_index = end_index + search_index + 1 if after else end_index
+    return [first_index, end_index]
+
+
+def run(function, *args):
+    """Return the result of function, or the type of the error it raises."""
+    try:
+        return function(*args)
+    except (ValueError, IndexError) as error:
+        return type(error)
+
+
+def positions(srl_output):
+    """Every (sentence, token) of the sentences with verb frames."""
+    return [
+        (sent_index, token)
+        for sent_index, sentence in enumerate(srl_output)
+        if sentence["verbs"]
+        for token in range(len(sentence["words"]))
+    ]
+
+
+@pytest.mark.parametrize("tag", ["B-ARGM-ADV", "B-V", "I-ARG0", "B-C-ARG1", "B-X"])
+def test_sentences_from_srl_tag(srl_output, tag):
+    """Test if the index finds the same frames as scanning the SRL output."""
+    extraction = cond_extr.ConditionExtraction()
+    assert extraction.get_sentences_from_srl_tag(tag, srl_output) == (
+        reference_sentences_from_srl_tag(tag, srl_output)
+    )
+    tags = [tag, "B-ARG1", "B-ARGM-ADV"]
+    assert extraction.get_sentences_from_srl_tags(tags, srl_output) == (
+        reference_sentences_from_srl_tags(tags, srl_output)
+    )
+
+
+def test_adverbial_and_condition(srl_output):
+    """Test if the adverbial and condition lookups match the scans for every token."""
+    srl_tags = SrlTagIndex(srl_output)
+    for sent_index, token in positions(srl_output):
+        cond_index_list = [max(token - 1, 0), token]
+        assert cond_extr.get_adverbial(cond_index_list, sent_index, srl_tags) == (
+            reference_adverbial(cond_index_list, sent_index, srl_output)
+        )
+        if token + 1 < len(srl_output[sent_index]["words"]):
+            expected = run(
+                reference_condition_after_indicator,
+                cond_index_list,
+                sent_index,
+                srl_output,
+            )
+            result = run(
+                cond_extr.get_condition_SRL_after_indicator,
+                cond_index_list,
+                sent_index,
+                srl_tags,
+            )
+            assert result == expected
+
+
+def test_condition_at_last_token(srl_output):
+    """Test if an indicator at the last token has no condition, the scan raised."""
+    last = len(srl_output[1]["words"]) - 1
+    with pytest.raises(IndexError):
+        reference_condition_after_indicator([last, last], 1, srl_output)
+    result = cond_extr.get_condition_SRL_after_indicator([last, last], 1, srl_output)
+    assert result == []
+
+
+def test_srl_within_range(srl_output):
+    """Test if the tagged range before or after a token matches the scan."""
+    srl_tags = SrlTagIndex(srl_output)
+    for sent_index, token in positions(srl_output):
+        verbs = srl_output[sent_index]["verbs"]
+        for frame in range(len(verbs)):
+            for after in (True, False):
+                assert cond_extr.get_srl_within_range(
+                    frame, token, after, srl_tags[sent_index]
+                ) == reference_srl_within_range(frame, token, after, verbs)
+
+
+def test_frames_with_argument_at(srl_output):
+    """Test if the frames with a B-ARG at a token match the scan of the columns."""
+    srl_tags = SrlTagIndex(srl_output)
+    for sent_index, token in positions(srl_output):
+        sentence = srl_tags[sent_index]
+        next_tags = [verb["tags"][token] for verb in srl_output[sent_index]["verbs"]]
+        expected = [[i, tag] for i, tag in enumerate(next_tags) if "B-ARG" in tag]
+        assert [
+            [i, sentence.tags_at(token)[i]]
+            for i in sentence.frames_containing_at(token, "B-ARG")
+        ] == expected
+
+
+def test_word_index(srl_output):
+    """Test if the first position of a word is that of list.index in lower case."""
+    srl_tags = SrlTagIndex(srl_output)
+    words = [word.lower() for word in srl_output[5]["words"]]
+    for word in set(words):
+        assert srl_tags[5].word_index(word.upper()) == words.index(word)
+    with pytest.raises(ValueError):
+        srl_tags[5].word_index("whether")
@@ -0,0 +1,87 @@
+import threading
+import pytest
+from tools.stage_graph import StageGraph
+
+
+@pytest.fixture
+def graph():
+    """A graph with text -> (srl, coref) -> result and a stage nobody uses."""
+    calls = []
+    graph = StageGraph()
+
+    def stage(name, function):
+        def run(*args):
+            calls.append(name)
+            return function(*args)
+
+        return run
+
+    graph.add("text", stage("text", lambda: "a text"))
+    graph.add("srl", stage("srl", lambda text: f"srl of {text}"), ("text",))
+    graph.add("coref", stage("coref", lambda text: f"coref of {text}"), ("text",))
+    graph.add(
+        "result", stage("result", lambda srl, coref: [srl, coref]), ("srl", "coref")
+    )
+    graph.add("unused", stage("unused", lambda text: None), ("text",))
+    graph.calls = calls
+    return graph
+
+
+def test_required_in_declaration_order(graph):
+    """Test if the stages of an output are returned with their inputs first."""
+    assert graph.required(["result"]) == ["text", "srl", "coref", "result"]
+    assert graph.required(["coref"]) == ["text", "coref"]
+
+
+def test_required_unknown_stage(graph):
+    """Test if asking for a stage that is not declared fails."""
+    with pytest.raises(ValueError):
+        graph.required(["constituency"])
+
+
+def test_add_duplicate_or_undeclared_input(graph):
+    """Test if a stage can not be declared twice or before its inputs."""
+    with pytest.raises(ValueError):
+        graph.add("srl", lambda text: None, ("text",))
+    with pytest.raises(ValueError):
+        graph.add("activity", lambda avo: None, ("avo",))
+
+
+def test_run_stage(graph):
+    """Test if a stage gets the outputs of its inputs in order and is timed."""
+    output = graph.run_stage("result", {"srl": "s", "coref": "c"})
+    assert output == ["s", "c"]
+    assert graph.durations["result"] >= 0
+
+
+def test_run_only_required(graph):
+    """Test if a run computes the requested outputs and skips the other stages."""
+    results = graph.run(["result"])
+    assert results["result"] == ["srl of a text", "coref of a text"]
+    assert "unused" not in results
+    assert sorted(graph.calls) == ["coref", "result", "srl", "text"]
+    assert graph.calls[0] == "text" and graph.calls[-1] == "result"
+    assert set(graph.durations) == {"text", "srl", "coref", "result"}
+
+
+def test_run_independent_stages_together():
+    """Test if stages that do not depend on each other run at the same time."""
+    barrier = threading.Barrier(2, timeout=5)
+    graph = StageGraph()
+    graph.add("srl", barrier.wait)
+    graph.add("coref", barrier.wait)
+    results = graph.run(["srl", "coref"])
+    assert set(results) == {"srl", "coref"}
+
+
+def test_run_raises_stage_error():
+    """Test if the error of a stage is raised by the run."""
+    graph = StageGraph()
+
+    def fail():
+        raise RuntimeError("The service is not available.")
+
+    graph.add("srl", fail)
+    graph.add("result", lambda srl: srl, ("srl",))
+    with pytest.raises(RuntimeError):
+        graph.run(["result"])
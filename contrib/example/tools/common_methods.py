@@ -1,7 +1,4 @@
-import spacy
-from nltk.tokenize import word_tokenize
-
-spacy_nlp = spacy.load('en_core_web_sm')
+from tools.document import get_document
 
 
 class CommonFunctions:
@@ -18,17 +15,8 @@ class CommonFunctions:
       pass
 
    def get_list_sent_lengths(self, text:str) -> list:
-      """Create list of lengths of words per sentence."""
-      doc = spacy_nlp(text)
-      sents = [str(sent) for sent in doc.sents]
-      sent_words = [word_tokenize(sen) for sen in sents]
-      last = 0
-      sen_lens = []
-      for words in sent_words:
-         length = last + len(words)
-         sen_lens.append(length)
-         last = length
-      return sen_lens
+      """Create list of lengths of words per sentence, from the Document of the text."""
+      return get_document(text).sentence_lengths
    
    def order_avo_on_sent_index(self,agent_verb_object_results:list) -> dict:
       """Order the agent_verb_object results per sentence index. To make it easy to access them."""
@@ -0,0 +1,131 @@
+"""A text that is split into sentences and tokens once and shared by all stages.
+
+The stages of the pipeline used to split the same text again and again, with nltk and
+with spaCy. A Document holds the sentences, tokens and offsets of a text, and one
+spaCy parse of the text that is made when it is first used. The POS tags, lemmas and
+the sentence lengths for the coreference are taken from this parse. get_document
+returns the same Document for a text that was annotated recently, such that callers
+that still pass the text as a string do not tokenize it again.
+"""
+import functools
+from nltk.tokenize import sent_tokenize, word_tokenize
+from tools.nlp_resources import PARSE_DISABLE, resources
+
+DOCUMENT_CACHE_SIZE = 32
+
+
+class Document:
+    """A text with its sentences, tokens and offsets.
+
+    Attributes:
+       - text (str): the text.
+       - sentences (list(str)): the sentences of the text.
+       - offsets (list(list(int))): [begin, end) character offsets of each sentence in text.
+       - tokens (list(list(str))): the words of each sentence.
+    """
+
+    def __init__(self, text: str, sentences: list = None) -> None:
+        resources.require_nltk("punkt")
+        self.text = text
+        self.sentences = sent_tokenize(text) if sentences is None else sentences
+        self.offsets = self.find_offsets()
+        self.tokens = [word_tokenize(sentence) for sentence in self.sentences]
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __len__(self) -> int:
+        return len(self.sentences)
+
+    def find_offsets(self) -> list:
+        """Find the [begin, end) character offsets of the sentences in the text."""
+        offsets = []
+        position = 0
+        for sentence in self.sentences:
+            begin = self.text.find(sentence, position)
+            if begin == -1:
+                # the sentences are not taken from the text as is.
+                begin = position
+            position = begin + len(sentence)
+            offsets.append([begin, position])
+        return offsets
+
+    @functools.cached_property
+    def lower_sentences(self) -> list:
+        """The sentences in lower case."""
+        return [sentence.lower() for sentence in self.sentences]
+
+    @functools.cached_property
+    def spacy_doc(self):
+        """The spaCy parse of the whole text, made once."""
+        return resources.spacy(PARSE_DISABLE)(self.text)
+
+    @functools.cached_property
+    def sentence_lengths(self) -> list:
+        """Number of words up to and including each sentence, for the coreference.
+
+        The sentences are those of spaCy and the words those of nltk, like the
+        coreference output the cluster spans are mapped on was always counted.
+        """
+        lengths = []
+        length = 0
+        for sentence in self.spacy_doc.sents:
+            length += len(word_tokenize(str(sentence)))
+            lengths.append(length)
+        return lengths
+
+    @functools.cached_property
+    def spacy_tokens(self) -> list:
+        """The spaCy tokens of each sentence, without the white space."""
+        tokens = [[] for _ in self.sentences]
+        index = 0
+        for token in self.spacy_doc:
+            while index < len(self.offsets) - 1 and token.idx >= self.offsets[index][1]:
+                index += 1
+            if not token.is_space:
+                tokens[index].append(token)
+        return tokens
+
+    @functools.cached_property
+    def pos_tags(self) -> list:
+        """The POS tag (Penn Treebank) of each spaCy token, per sentence."""
+        return [[token.tag_ for token in tokens] for tokens in self.spacy_tokens]
+
+    @functools.cached_property
+    def lemmas(self) -> list:
+        """The lemma of each spaCy token, per sentence."""
+        return [[token.lemma_ for token in tokens] for tokens in self.spacy_tokens]
+
+    def annotated_span(self, sentence: int, begin: int, end: int, words: list):
+        """Return the POS tags and lemmas of the words [begin, end] of a sentence.
+
+        The SRL service tokenizes the sentences with the same spaCy model, so the word
+        indexes of its results point at the spaCy tokens of the sentence. None if the
+        tokens there are not the given words.
+
+        Returns:
+           - annotations (list(tuple(str))): (word, POS tag, lemma) per word, or None.
+        """
+        if sentence >= len(self.sentences):
+            return None
+        tokens = self.spacy_tokens[sentence][begin : end + 1]
+        if [token.text for token in tokens] != list(words):
+            return None
+        return [(token.text, token.tag_, token.lemma_) for token in tokens]
+
+    def input_object(self) -> list:
+        """Return the sentences in the input format of the SRL endpoint."""
+        return [{"sentence": sentence} for sentence in self.sentences]
+
+
+@functools.lru_cache(maxsize=DOCUMENT_CACHE_SIZE)
+def annotate(text: str) -> Document:
+    """Create the Document of a text, cached for the last DOCUMENT_CACHE_SIZE texts."""
+    return Document(text)
+
+
+def get_document(text) -> Document:
+    """Return the Document of a text, the argument itself if it is a Document already."""
+    if isinstance(text, Document):
+        return text
+    return annotate(text)
@@ -0,0 +1,54 @@
+"""Find indicator words, such as "if" or "in case of", in a text in one pass.
+
+The indicators of a list are compiled once into a single regular expression. Only
+whole words match, "if" is not found in "verify", and the longest indicator wins
+when several start at the same word, "in case of" before "in case". Matches do not
+overlap, so the words of "in case of" are one indicator and not also "in case": the
+condition extraction makes a condition per indicator, and the substring scan this
+replaces gave two conditions for the same words.
+"""
+import re
+
+
+class IndicatorMatcher:
+    """Compiled matcher for a list of indicators."""
+
+    def __init__(self, indicators: list) -> None:
+        self.indicators = list(indicators)
+        ordered = sorted(
+            {indicator.lower() for indicator in self.indicators}, key=len, reverse=True
+        )
+        alternatives = [
+            r"\s+".join(re.escape(word) for word in indicator.split())
+            for indicator in ordered
+        ]
+        self.pattern = None
+        if alternatives:
+            self.pattern = re.compile(
+                r"\b(?:" + "|".join(alternatives) + r")\b", re.IGNORECASE
+            )
+
+    def matches(self, text: str) -> list:
+        """Return every indicator found in the text with its [begin, end) character offsets.
+
+        Returns:
+           - matches (list): e.g. [["in case of", 10, 20], ["if", 31, 33]]
+        """
+        if self.pattern is None:
+            return []
+        return [
+            [" ".join(match.group().lower().split()), match.start(), match.end()]
+            for match in self.pattern.finditer(text)
+        ]
+
+    def find(self, text: str) -> list:
+        """Return the indicators found in the text, each once, in the order they appear."""
+        found = []
+        for indicator, _, _ in self.matches(text):
+            if indicator not in found:
+                found.append(indicator)
+        return found
+
+    def search(self, text: str) -> bool:
+        """Check if the text contains an indicator."""
+        return self.pattern is not None and self.pattern.search(text) is not None
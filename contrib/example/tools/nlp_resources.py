@@ -0,0 +1,86 @@
+"""Process wide registry of the spaCy models and nltk data, loaded when first used.
+
+Importing the pipeline does not load spaCy or touch the network. A spaCy model is
+loaded once per set of disabled pipeline components, e.g. LEMMA_DISABLE for the
+lemmas only, and shared by all modules. The nltk data is looked up offline; it is
+installed in the image with `python -m nltk.downloader` (see contrib/Dockerfile.flask).
+The time spent loading every resource is kept in load_times.
+"""
+import threading
+import time
+import nltk
+
+SPACY_MODEL = "en_core_web_sm"
+# the components that are not needed for tokens, POS tags and lemmas.
+LEMMA_DISABLE = ("parser", "ner")
+# the components that are not needed for sentences, POS tags and lemmas.
+PARSE_DISABLE = ("ner",)
+# the nltk data per resource, newer versions of nltk use the first path.
+NLTK_DATA = {
+    "punkt": ("tokenizers/punkt_tab/english/", "tokenizers/punkt"),
+    "averaged_perceptron_tagger": (
+        "taggers/averaged_perceptron_tagger_eng/",
+        "taggers/averaged_perceptron_tagger",
+    ),
+}
+
+
+class NLPResourceError(Exception):
+    """A resource is not installed."""
+
+
+class NLPResources:
+    """Lazily loaded spaCy models and checked nltk data, shared by the whole process."""
+
+    def __init__(self, spacy_model: str = SPACY_MODEL) -> None:
+        self.spacy_model = spacy_model
+        self.load_times = {}
+        self._models = {}
+        self._nltk_checked = set()
+        self._lock = threading.Lock()
+
+    def spacy(self, disable: tuple = ()):
+        """Return the spaCy model with the components in disable turned off, loaded once."""
+        key = tuple(sorted(disable))
+        with self._lock:
+            if key not in self._models:
+                import spacy
+
+                start = time.time()
+                self._models[key] = spacy.load(self.spacy_model, disable=list(key))
+                self.record(f"spacy {self.spacy_model} disable={','.join(key)}", start)
+            return self._models[key]
+
+    def require_nltk(self, name: str) -> None:
+        """Check once, without network access, that the nltk data name is installed.
+
+        Raises:
+           - NLPResourceError: if the data is not installed.
+        """
+        if name in self._nltk_checked:
+            return
+        with self._lock:
+            if name in self._nltk_checked:
+                return
+            start = time.time()
+            for path in NLTK_DATA.get(name, (name,)):
+                try:
+                    nltk.data.find(path)
+                    break
+                except LookupError:
+                    continue
+            else:
+                raise NLPResourceError(
+                    f"The nltk data '{name}' is not installed, "
+                    + f"run: python -m nltk.downloader {name}"
+                )
+            self._nltk_checked.add(name)
+            self.record(f"nltk {name}", start)
+
+    def record(self, name: str, start: float) -> None:
+        """Keep and print the load time of a resource since start."""
+        self.load_times[name] = time.time() - start
+        print("loaded {} in {:.3f} (seconds)".format(name, self.load_times[name]))
+
+
+resources = NLPResources()
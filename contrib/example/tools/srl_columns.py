@@ -0,0 +1,87 @@
+"""Columnar form of SRL results with vectorized extraction of role spans.
+
+All verb frames of a text (or a corpus) are stored in one integer array: every tag is
+coded by its position in the tag vocabulary, and the frames are consecutive slices.
+A role, e.g. the agent, is a boolean table over the vocabulary, so the tokens of a role
+in all frames are found with one lookup, and the first and last token of the role per
+frame with one reduction. The roles test the tags the same way as
+SemanticRoleLabelling.get_agent_verb_object_data did, e.g. "ARG0" in tag.
+"""
+import functools
+import itertools
+import numpy as np
+
+ROLE_TESTS = {
+    "tagged": lambda tag: tag != "O",
+    "agent": lambda tag: "ARG0" in tag,
+    "verb": lambda tag: "B-V" in tag or "I-V" in tag,
+    "verb_begin": lambda tag: "B-V" in tag,
+    "object": lambda tag: "ARG1" in tag,
+    "ADV": lambda tag: "ARGM-ADV" in tag,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def roles_of(tag: str) -> frozenset:
+    """Return the roles of a tag, e.g. {"tagged", "agent"} for "B-ARG0"."""
+    return frozenset(role for role, test in ROLE_TESTS.items() if test(tag))
+
+
+class SrlColumns:
+    """The verb frames of SRL results as integer coded tag arrays.
+
+    Attributes:
+       - vocabulary (list(str)): the tag of every code.
+       - codes (np.ndarray): the tag codes of all frames after each other.
+       - starts (np.ndarray): the position in codes where every frame starts.
+       - lengths (np.ndarray): the number of tokens of every frame.
+       - frame_sentence (np.ndarray): the sentence index of every frame.
+       - words (list(list(str))): the token table, the words of every sentence.
+    """
+
+    def __init__(self, srl_results: list) -> None:
+        frames = []
+        frame_sentence = []
+        for sent_index, srl_result in enumerate(srl_results):
+            for verb in srl_result["verbs"]:
+                frames.append(verb["tags"])
+                frame_sentence.append(sent_index)
+        tags = list(itertools.chain.from_iterable(frames))
+        vocabulary = {tag: code for code, tag in enumerate(dict.fromkeys(tags))}
+        self.vocabulary = list(vocabulary)
+        self.codes = np.fromiter(
+            map(vocabulary.__getitem__, tags), dtype=np.int32, count=len(tags)
+        )
+        self.lengths = np.fromiter(map(len, frames), dtype=np.int64, count=len(frames))
+        self.starts = np.zeros(len(frames), dtype=np.int64)
+        if len(frames) > 1:
+            self.starts[1:] = np.cumsum(self.lengths)[:-1]
+        self.frame_sentence = np.array(frame_sentence, dtype=np.int64)
+        self.positions = np.arange(len(tags)) - np.repeat(self.starts, self.lengths)
+        self.words = [srl_result["words"] for srl_result in srl_results]
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def role_mask(self, role: str) -> np.ndarray:
+        """Return for every token of every frame if its tag has the role."""
+        table = np.array([role in roles_of(tag) for tag in self.vocabulary], dtype=bool)
+        if not len(table):
+            return np.zeros(0, dtype=bool)
+        return table[self.codes]
+
+    def spans(self, role: str) -> np.ndarray:
+        """Return the [first, last] token of the role in every frame, [-1, -1] if absent."""
+        result = np.full((len(self), 2), -1, dtype=np.int64)
+        filled = self.lengths > 0
+        if not filled.any():
+            return result
+        mask = self.role_mask(role)
+        missing = len(self.codes)
+        first = np.where(mask, self.positions, missing)
+        last = np.where(mask, self.positions, -1)
+        starts = self.starts[filled]
+        result[filled, 0] = np.minimum.reduceat(first, starts)
+        result[filled, 1] = np.maximum.reduceat(last, starts)
+        result[result[:, 0] == missing] = -1
+        return result
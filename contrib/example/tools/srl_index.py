@@ -0,0 +1,108 @@
+"""Index over the SRL result of a text, built once for the condition extraction.
+
+The SRL result has per sentence a list of verb frames, each with a tag per token. The
+index keeps, per sentence, the tags of every frame at a token (a column), the tagged
+tokens and tag counts per frame and the position of every word, and for the whole
+text the (sentence, verb, token) positions of every tag. The condition extraction
+looks the tags up instead of scanning the frames again for every indicator.
+"""
+import bisect
+from collections import Counter, defaultdict
+
+
+class SentenceTags:
+    """The tags of one sentence, per verb frame and per token."""
+
+    def __init__(self, sentence_result: dict) -> None:
+        self.words = sentence_result["words"]
+        self.frames = [verb["tags"] for verb in sentence_result["verbs"]]
+        self.descriptions = [verb["description"] for verb in sentence_result["verbs"]]
+        if self.frames:
+            self.columns = list(zip(*self.frames))
+        else:
+            self.columns = [() for _ in self.words]
+        self.tagged = [
+            [index for index, tag in enumerate(tags) if tag != "O"]
+            for tags in self.frames
+        ]
+        self.counts = [Counter(tags) for tags in self.frames]
+        self.word_indexes = {}
+        for index, word in enumerate(self.words):
+            self.word_indexes.setdefault(word.lower(), index)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def tags_at(self, token: int) -> tuple:
+        """Return the tag of every verb frame at the token."""
+        return self.columns[token]
+
+    def frames_at(self, token: int, tag: str) -> list:
+        """Return the verb frames that have exactly the tag at the token."""
+        return [verb for verb, found in enumerate(self.columns[token]) if found == tag]
+
+    def frames_containing_at(self, token: int, part: str) -> list:
+        """Return the verb frames whose tag at the token contains part, e.g. "B-ARG"."""
+        return [verb for verb, found in enumerate(self.columns[token]) if part in found]
+
+    def count(self, verb: int, tag: str) -> int:
+        """Return how often the tag occurs in the verb frame."""
+        return self.counts[verb][tag]
+
+    def last_tagged(self, verb: int) -> int:
+        """Return the last token of the verb frame that is not "O", 0 if there is none."""
+        tagged = self.tagged[verb]
+        return tagged[-1] if tagged else 0
+
+    def tagged_range(self, verb: int, tokens: range) -> list:
+        """Return the first and last token in tokens that is not "O", [-1, -1] if none."""
+        tagged = self.tagged[verb]
+        begin = bisect.bisect_left(tagged, tokens.start)
+        end = bisect.bisect_left(tagged, tokens.stop)
+        if begin >= end:
+            return [-1, -1]
+        return [tagged[begin], tagged[end - 1]]
+
+    def word_index(self, word: str) -> int:
+        """Return the first position of the word, in lower case.
+
+        Raises:
+           - ValueError: if the word is not in the sentence.
+        """
+        try:
+            return self.word_indexes[word.lower()]
+        except KeyError:
+            raise ValueError(f"'{word}' is not in the sentence.") from None
+
+
+class SrlTagIndex:
+    """The SentenceTags of every sentence and the positions of every tag in a text."""
+
+    def __init__(self, srl_result: list) -> None:
+        self.sentences = [SentenceTags(sentence) for sentence in srl_result]
+        self.positions = defaultdict(list)
+        for sentence_index, sentence in enumerate(self.sentences):
+            for verb, tags in enumerate(sentence.frames):
+                for token, tag in enumerate(tags):
+                    self.positions[tag].append((sentence_index, verb, token))
+
+    def __getitem__(self, sentence_index: int) -> SentenceTags:
+        return self.sentences[sentence_index]
+
+    def __len__(self) -> int:
+        return len(self.sentences)
+
+    def find(self, tag: str) -> list:
+        """Return the (sentence, verb, token) positions of the tag."""
+        return self.positions.get(tag, [])
+
+    def frames_with_tag(self, tag: str) -> list:
+        """Return the (sentence, verb) frames that contain the tag, in order."""
+        return list(dict.fromkeys((sentence, verb) for sentence, verb, _ in self.find(tag)))
+
+
+def get_srl_index(result) -> SrlTagIndex:
+    """Return the index of an SRL result, the argument itself if it is an index already."""
+    if isinstance(result, SrlTagIndex):
+        return result
+    return SrlTagIndex(result)
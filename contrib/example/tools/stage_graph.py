@@ -0,0 +1,88 @@
+"""Executor for the pipeline declared as a graph of stages.
+
+Every stage names the stages whose outputs it takes as input. Running the graph for
+some outputs only computes the stages these outputs depend on, and starts a stage as
+soon as its inputs are done. Independent stages, such as SRL and coreference, run at
+the same time, so a run takes about as long as its slowest chain of stages.
+"""
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+MAX_WORKERS = 4
+
+
+class StageGraph:
+    """Declared stages with their inputs, run lazily and concurrently."""
+
+    def __init__(self, max_workers: int = MAX_WORKERS) -> None:
+        self.max_workers = max_workers
+        self.stages = {}
+        self.durations = {}
+
+    def add(self, name: str, function, inputs: tuple = ()) -> None:
+        """Declare a stage, called with the outputs of its inputs in the given order.
+
+        The inputs must be declared before the stage, such that the graph has no cycles.
+        """
+        if name in self.stages:
+            raise ValueError(f"The stage '{name}' is already declared.")
+        for input_name in inputs:
+            if input_name not in self.stages:
+                raise ValueError(
+                    f"The stage '{name}' uses '{input_name}', which is not declared."
+                )
+        self.stages[name] = (function, tuple(inputs))
+
+    def required(self, outputs: list) -> list:
+        """Return the stages needed for the outputs, in the order of declaration."""
+        needed = set()
+        todo = list(outputs)
+        while todo:
+            name = todo.pop()
+            if name not in self.stages:
+                raise ValueError(f"The stage '{name}' is not declared.")
+            if name not in needed:
+                needed.add(name)
+                todo.extend(self.stages[name][1])
+        return [name for name in self.stages if name in needed]
+
+    def run(self, outputs: list) -> dict:
+        """Run the stages needed for the outputs and return the output per stage.
+
+        The stages run with a copy of the context of the caller, such that the
+        request id of the pipeline run is sent along. The first error of a stage
+        is raised after the running stages have finished.
+        """
+        pending = self.required(outputs)
+        results = {}
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                ready = [name for name in pending if self.is_ready(name, results)]
+                for name in ready:
+                    pending.remove(name)
+                    context = contextvars.copy_context()
+                    future = executor.submit(context.run, self.run_stage, name, results)
+                    running[future] = name
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+        return results
+
+    def is_ready(self, name: str, results: dict) -> bool:
+        """Check if the outputs of all the inputs of a stage are there."""
+        return all(input_name in results for input_name in self.stages[name][1])
+
+    def run_stage(self, name: str, results: dict):
+        """Run a single stage on the outputs of its inputs and record its duration."""
+        function, inputs = self.stages[name]
+        start = time.time()
+        output = function(*[results[input_name] for input_name in inputs])
+        self.durations[name] = time.time() - start
+        return output
+
+    def print_durations(self) -> None:
+        """Print the duration of every stage that has run."""
+        for name, duration in self.durations.items():
+            print("stage {} took {:.3f} (seconds)".format(name, duration))
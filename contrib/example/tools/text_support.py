@@ -1,6 +1,8 @@
 
 import os
 from nltk.tokenize import sent_tokenize
+from tools.document import Document
+from tools.nlp_resources import resources
 
 class TextSupport:
    """Class with several text related support functions.
@@ -18,11 +20,21 @@ class TextSupport:
       """Get activity text from a file """
       with open(path) as f:
          lines = f.read()
+      resources.require_nltk("punkt")
       sents = sent_tokenize(lines)
       return sents
 
    def get_all_texts_activity(self,folder):
-      """Get all texts and return a list of different texts that are concatenated."""
+      """Get all texts and return a list of different texts that are concatenated.
+
+      Args:
+         - folder (str): the folder with the .txt files.
+
+      Returns:
+         - texts (list(Document)): a Document per file, with the sentences of the file.
+            str(document) is the concatenated text, the functions that take a
+            text (str | Document) use the Document as it is.
+      """
       # Get all the text files
       all_txt_files = [os.path.join(folder, f) for f in os.listdir(folder) if os.path.isfile(os.path.join(folder, f)) and f[-3:] == 'txt']
 
@@ -31,7 +43,7 @@ class TextSupport:
 
       text_in = []
       for text in all_texts:
-         t = " ".join(text)
+         t = Document(" ".join(text), text)
          text_in.append(t)
       
       return text_in
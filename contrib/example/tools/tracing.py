@@ -0,0 +1,27 @@
+"""Request ids to follow one pipeline run through the logs of the services."""
+import contextvars
+import uuid
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+_run_id = contextvars.ContextVar("run_id", default=None)
+
+
+def start_run() -> str:
+    """Start a new pipeline run and return its request id."""
+    run_id = uuid.uuid4().hex
+    _run_id.set(run_id)
+    return run_id
+
+
+def get_run_id() -> str:
+    """Return the request id of the current pipeline run, None outside of a run."""
+    return _run_id.get()
+
+
+def trace_headers() -> dict:
+    """Return the headers that pass the request id of the current run to a service."""
+    run_id = get_run_id()
+    if run_id is None:
+        return {}
+    return {REQUEST_ID_HEADER: run_id}
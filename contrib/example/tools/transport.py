@@ -0,0 +1,145 @@
+"""Shared HTTP transport to the AllenNLP service.
+
+All interfaces use one requests.Session, such that connections are kept alive and
+reused instead of opening a new TCP connection per call. The health of a service
+is cached for HEALTH_TTL seconds. A circuit breaker per service opens after
+FAILURE_THRESHOLD failed calls in a row: while it is open, calls fail fast without
+contacting the service, after RESET_TIMEOUT seconds one call is let through to
+test if the service is back.
+"""
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from tools.tracing import trace_headers
+
+HEALTH_TTL = 10
+FAILURE_THRESHOLD = 3
+RESET_TIMEOUT = 30
+POOL_SIZE = 10
+
+
+class ServiceUnavailable(Exception):
+    """The service is known to be down, the call is not made."""
+
+
+class CircuitBreaker:
+    """Circuit breaker that opens after a number of consecutive failures."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Check if a call may be made, lets one call through after the reset timeout."""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # half open: the next failure opens the breaker again.
+                self.opened_at = None
+                self.failures = self.failure_threshold - 1
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful call."""
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        """Count a failed call, open the breaker at the failure threshold."""
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class Transport:
+    """Keep-alive session pool with cached health checks and circuit breakers."""
+
+    def __init__(
+        self,
+        pool_size: int = POOL_SIZE,
+        health_ttl: float = HEALTH_TTL,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        reset_timeout: float = RESET_TIMEOUT,
+    ) -> None:
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.health_ttl = health_ttl
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._health = {}
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get_breaker(self, url: str) -> CircuitBreaker:
+        """Return the circuit breaker of the service (scheme and host) of the url."""
+        parts = urlsplit(url)
+        service = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            if service not in self._breakers:
+                self._breakers[service] = CircuitBreaker(
+                    self.failure_threshold, self.reset_timeout
+                )
+            return self._breakers[service]
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Make a call through the circuit breaker of the service.
+
+        Raises:
+           - ServiceUnavailable: if the breaker of the service is open.
+           - requests.exceptions.RequestException: if the call fails.
+        """
+        breaker = self.get_breaker(url)
+        if not breaker.allow():
+            raise ServiceUnavailable(f"{url}: the service is down, not calling it.")
+        headers = {**trace_headers(), **kwargs.pop("headers", {})}
+        try:
+            response = self.session.request(method, url, headers=headers, **kwargs)
+        except requests.exceptions.RequestException:
+            breaker.record_failure()
+            self.set_health(url, False)
+            raise
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Make a GET call, see request."""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Make a POST call, see request."""
+        return self.request("POST", url, **kwargs)
+
+    def set_health(self, url: str, online: bool) -> None:
+        """Cache the health of the service on the url."""
+        with self._lock:
+            self._health[url] = (online, time.monotonic())
+
+    def is_online(self, url: str) -> bool:
+        """Check if the service on the url is online, cached for health_ttl seconds."""
+        with self._lock:
+            online, checked_at = self._health.get(url, (None, None))
+        if online is not None and time.monotonic() - checked_at < self.health_ttl:
+            return online
+        try:
+            online = self.get(url).status_code == 200
+        except (ServiceUnavailable, requests.exceptions.RequestException):
+            online = False
+        self.set_health(url, online)
+        return online
+
+
+transport = Transport()
@@ -3,7 +3,10 @@ import sys
 import os
 import nltk
 
-from flask import Flask
+from flask import Flask, jsonify
+
+from .metrics import metrics
+from .startup import startup
 
 nltk.data.path.append('/opt/nltk_data/')
 
@@ -12,11 +15,27 @@ def create_app(test_config=None):
     app = Flask(__name__, instance_relative_config=True)
     app.config.from_mapping(
         SECRET_KEY="dev",
+        PROFILING_ENABLED=False,
+        PROFILING_TOP_N=20,
+        PROFILING_DIR=None,
+        TRACEMALLOC_ENABLED=False,
+        TRACEMALLOC_TOP_N=10,
+        COMPRESSION_MIN_SIZE=4096,
+        COMPRESSION_LEVEL=5,
+        MAX_DECOMPRESSED_LENGTH=100 * 1024 * 1024,
+        MODEL_CONCURRENCY=1,
+        PRELOAD_MODELS=False,
+        SERVED_MODELS=None,
+        MODEL_STORE_DIR="/opt/allen_nlp/store",
+        COREF_TOKEN_BUDGET=2048,
+        SRL_BATCHED_DECODING=True,
     )
 
     if test_config is None:
         # load the instance config if it exists when not testing
         app.config.from_pyfile("config.py", silent=True)
+        # environment variables like NGUML_PROFILING_ENABLED=true override the config
+        app.config.from_prefixed_env("NGUML")
     else:
         # load the test config if passed in
         app.config.from_mapping(test_config)
@@ -26,9 +45,27 @@ def create_app(test_config=None):
         """Return hello world as example."""
         return "Hello, World!"
 
-    from . import allen_nlp
+    @app.route("/metrics")
+    def get_metrics():
+        """Return the metrics recorded per endpoint by this worker."""
+        return jsonify(metrics.snapshot())
+
+    @app.route("/startup")
+    def get_startup():
+        """Return the startup time per import and load phase of this worker."""
+        return jsonify(startup.snapshot())
+
+    with startup.phase("import endpoints"):
+        from . import allen_nlp, compression, deadline, memory, predictors, tracing
 
     app.register_blueprint(allen_nlp.bp)
+    with startup.phase("create predictor registry"):
+        predictors.init_app(app)
+    # registered first so its after request hook compresses the final response.
+    compression.init_app(app)
+    tracing.init_app(app)
+    deadline.init_app(app)
+    memory.init_app(app)
 
     return app
 
@@ -1,14 +1,34 @@
 import functools
+import math
 
 # check the _collections to see if dict can be used instead.
 from _collections_abc import Mapping
-from allennlp.predictors.predictor import Predictor
-from allennlp_models.pretrained import load_predictor
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
+
+from . import coref, srl
+from .deadline import check_deadline
+from .predictors import use_predictor
+from .profiling import profiled
 
 bp = Blueprint("allen_nlp", __name__, url_prefix="/predict")
 
+# the model each endpoint uses.
+ENDPOINT_MODELS = {
+    "allen_nlp.predict": "srl",
+    "allen_nlp.coreference": "coref",
+    "allen_nlp.predict_using_other": "entail",
+}
+
+
+@bp.before_request
+def check_model_served():
+    """Reject requests for a model that is not served by this worker pool."""
+    model = ENDPOINT_MODELS.get(request.endpoint)
+    if model is not None and model not in current_app.extensions["predictors"].models:
+        message = f"The model '{model}' is not served by this worker pool."
+        return jsonify(isError=True, message=message, status_code=404), 404
+
 
 def handle_get_request(service_name):
     """Handle get request to check if the service is running."""
@@ -17,6 +37,7 @@ def handle_get_request(service_name):
 
 
 @bp.route("/srl", methods=["GET", "POST"])
+@profiled
 def predict():
     """Predict semantic roles for a text."""
     if request.method == "GET":
@@ -37,35 +58,101 @@ def predict():
                 + "items that are dicts of sentences."
             )
             return jsonify(isError=True, message=message, status_code=400)
-    predictor = Predictor.from_path(
-        "/opt/allen_nlp/structured-prediction-srl-bert.2020.12.15.tar.gz"
-    )
-    result = predictor.predict_batch_json(data)
-    return jsonify(output=result)
+    with use_predictor("srl") as predictor:
+        result, skipped = srl.predict_sentences(
+            predictor,
+            [item["sentence"] for item in data],
+            current_app.config["SRL_BATCHED_DECODING"],
+            check_deadline,
+        )
+    return jsonify(output=result, skipped_sentences=skipped)
 
 
 @bp.route("/coref", methods=["GET", "POST"])
+@profiled
 def coreference():
-    """Detect coreference relations in a text."""
+    """Detect coreference relations in a text or a list of texts."""
     # Implement the coreference part of the AllenNLP library.
     if request.method == "GET":
         return handle_get_request("Coreference")
+    overrides, message = get_span_pruning_overrides()
+    if message is not None:
+        return jsonify(isError=True, message=message, status_code=400)
     data = request.get_json()
     # print(data, file=sys.stderr)
+    if isinstance(data, list):
+        return coreference_batch(data, overrides)
     if not isinstance(data, Mapping):
         message = (
             "Posted data is not correct - not a dictionary, provide a dictionary with a "
-            + "document."
+            + "document or a list of them."
         )
         return jsonify(isError=True, message=message, status_code=400)
     if "document" not in data:
         message = "The key 'document' is not found in the dictionary."
         return jsonify(isError=True, message=message, status_code=400)
-    predictor = Predictor.from_path(
-        "/opt/allen_nlp/coref-spanbert-large-2021.03.10.tar.gz"
-    )
-    result = predictor.predict(document=data["document"])
-    return jsonify(output=result)
+    with use_predictor("coref") as predictor:
+        span_pruning = coref.clamp_span_pruning(predictor, overrides)
+        result = coref.predict_documents(
+            predictor,
+            [data["document"]],
+            current_app.config["COREF_TOKEN_BUDGET"],
+            span_pruning,
+            check_deadline,
+        )
+    return jsonify(output=result[0], span_pruning=span_pruning)
+
+
+def get_span_pruning_overrides():
+    """Get the span pruning overrides of the coreference from the query parameters.
+
+    Returns:
+        - overrides (dict): the value per span pruning setting in the parameters.
+        - message (str): the error message if a value is not valid, otherwise None.
+    """
+    overrides = {}
+    for name, (value_type, _) in coref.SPAN_PRUNING_LIMITS.items():
+        if name not in request.args:
+            continue
+        try:
+            value = value_type(request.args[name])
+        except ValueError:
+            value = math.nan
+        if not math.isfinite(value):
+            message = f"The parameter '{name}' is not a valid {value_type.__name__}."
+            return overrides, message
+        overrides[name] = value
+    return overrides, None
+
+
+def coreference_batch(data, overrides):
+    """Detect coreference relations in a list of texts, results are in input order."""
+    if len(data) < 1:
+        message = (
+            "Posted data is not correct - the list is empty, provide a list with "
+            + "dictionary items with a document."
+        )
+        return jsonify(isError=True, message=message, status_code=400)
+    for index, item in enumerate(data):
+        if not isinstance(item, Mapping):
+            message = (
+                f"Posted data is not correct - the {index}th item is not a dict, provide "
+                + "a list with dictionary items with a document."
+            )
+            return jsonify(isError=True, message=message, status_code=400)
+        if "document" not in item:
+            message = f"In the {index}th item, the key 'document' is not found."
+            return jsonify(isError=True, message=message, status_code=400)
+    with use_predictor("coref") as predictor:
+        span_pruning = coref.clamp_span_pruning(predictor, overrides)
+        result = coref.predict_documents(
+            predictor,
+            [item["document"] for item in data],
+            current_app.config["COREF_TOKEN_BUDGET"],
+            span_pruning,
+            check_deadline,
+        )
+    return jsonify(output=result, span_pruning=span_pruning)
 
 
 # @bp.route("/const", methods=["GET", "POST"])
@@ -83,6 +170,7 @@ def coreference():
 
 
 @bp.route("/entail", methods=["GET", "POST"])
+@profiled
 def predict_using_other():
     """Try batch prediction."""
     if request.method == "GET":
@@ -104,6 +192,8 @@ def predict_using_other():
         if "hypothesis" not in hypo_prem_item or "premise" not in hypo_prem_item:
             message = f"In the {index}th item, the key 'hypothesis' or 'premise' is not found."
             return jsonify(isError=True, message=message, status_code=400)    
-    predictor = load_predictor("pair-classification-roberta-snli")
-    result = predictor.predict_batch_json(data)
+    with use_predictor("entail") as predictor:
+        # the time waiting for the predictor counts towards the deadline.
+        check_deadline()
+        result = predictor.predict_batch_json(data)
     return jsonify(output=result)
@@ -0,0 +1,31 @@
+"""Helpers to split the work of a request into sub-batches."""
+
+
+def group_by_token_budget(lengths: list, token_budget: int) -> list:
+    """Group items into batches whose padded size stays within a token budget.
+
+    Description:
+        The items are sorted on their length, so items of a similar length end up in
+        the same batch and little padding is needed. The padded size of a batch is
+        the length of its longest item times the number of items. An item that is
+        longer than the budget gets a batch of its own.
+
+    Args:
+        - lengths (list): the number of tokens of each item.
+        - token_budget (int): the maximum padded size of a batch.
+
+    Returns:
+        - batches (list): a list of batches, each a list of indices into lengths.
+    """
+    order = sorted(range(len(lengths)), key=lambda index: lengths[index])
+    batches = []
+    batch = []
+    for index in order:
+        # sorted ascending, so the current item is the longest of the batch.
+        if batch and lengths[index] * (len(batch) + 1) > token_budget:
+            batches.append(batch)
+            batch = []
+        batch.append(index)
+    if batch:
+        batches.append(batch)
+    return batches
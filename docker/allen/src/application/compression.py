@@ -0,0 +1,134 @@
+"""Compressed request and response bodies for large documents and outputs.
+
+Requests with a `Content-Encoding: gzip` or `Content-Encoding: zstd` header are
+decompressed before they reach the views. Responses larger than
+COMPRESSION_MIN_SIZE are compressed when the client accepts it, zstd is preferred
+over gzip when the zstandard package is installed.
+"""
+import gzip
+import io
+import json
+import zlib
+
+from flask import current_app, request
+from werkzeug.wsgi import get_input_stream
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class DecompressionError(Exception):
+    """The body of a request could not be decompressed."""
+
+
+def decompress_gzip(data: bytes, max_length: int) -> bytes:
+    """Decompress gzip data, raise DecompressionError if it is longer than max_length."""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        decompressed = decompressor.decompress(data, max_length + 1)
+    except zlib.error as error:
+        raise DecompressionError(f"The gzip body is not valid: {error}.") from error
+    if len(decompressed) > max_length:
+        raise DecompressionError("The decompressed body is too large.")
+    return decompressed
+
+
+def decompress_zstd(data: bytes, max_length: int) -> bytes:
+    """Decompress zstd data, raise DecompressionError if it is longer than max_length."""
+    try:
+        with zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data)) as reader:
+            decompressed = reader.read(max_length + 1)
+    except zstandard.ZstdError as error:
+        raise DecompressionError(f"The zstd body is not valid: {error}.") from error
+    if len(decompressed) > max_length:
+        raise DecompressionError("The decompressed body is too large.")
+    return decompressed
+
+
+def get_decompressors() -> dict:
+    """Return the decompress function per supported content encoding."""
+    decompressors = {"gzip": decompress_gzip}
+    if zstandard is not None:
+        decompressors["zstd"] = decompress_zstd
+    return decompressors
+
+
+def error_response(start_response, status: str, message: str):
+    """Return an error in the same format as the endpoints from the wsgi middleware."""
+    status_code = int(status.split(" ")[0])
+    body = json.dumps(
+        {"isError": True, "message": message, "status_code": status_code}
+    ).encode()
+    start_response(
+        status,
+        [("Content-Type", "application/json"), ("Content-Length", str(len(body)))],
+    )
+    return [body]
+
+
+class DecompressionMiddleware:
+    """Wsgi middleware that decompresses request bodies with a content encoding."""
+
+    def __init__(self, wsgi_app, max_length: int) -> None:
+        self.wsgi_app = wsgi_app
+        self.max_length = max_length
+        self.decompressors = get_decompressors()
+
+    def __call__(self, environ, start_response):
+        encoding = environ.get("HTTP_CONTENT_ENCODING", "").strip().lower()
+        if not encoding or encoding == "identity":
+            return self.wsgi_app(environ, start_response)
+        if encoding not in self.decompressors:
+            message = (
+                f"Content encoding '{encoding}' is not supported, use one of: "
+                + ", ".join(self.decompressors)
+                + "."
+            )
+            return error_response(start_response, "415 UNSUPPORTED MEDIA TYPE", message)
+        data = get_input_stream(environ).read()
+        try:
+            data = self.decompressors[encoding](data, self.max_length)
+        except DecompressionError as error:
+            return error_response(start_response, "400 BAD REQUEST", str(error))
+        environ["wsgi.input"] = io.BytesIO(data)
+        environ["CONTENT_LENGTH"] = str(len(data))
+        del environ["HTTP_CONTENT_ENCODING"]
+        return self.wsgi_app(environ, start_response)
+
+
+def compress_response(response):
+    """Compress the response if it is large enough and the client accepts it."""
+    if (
+        response.direct_passthrough
+        or response.status_code < 200
+        or response.status_code >= 300
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+    if response.content_length is None or (
+        response.content_length < current_app.config["COMPRESSION_MIN_SIZE"]
+    ):
+        return response
+    offered = ["zstd", "gzip"] if zstandard is not None else ["gzip"]
+    encoding = request.accept_encodings.best_match(offered)
+    if encoding is None:
+        return response
+    level = current_app.config["COMPRESSION_LEVEL"]
+    if encoding == "zstd":
+        data = zstandard.ZstdCompressor(level=level).compress(response.get_data())
+    else:
+        data = gzip.compress(response.get_data(), compresslevel=level)
+    response.set_data(data)
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def init_app(app) -> None:
+    """Register the request decompression and response compression on the app."""
+    app.wsgi_app = DecompressionMiddleware(
+        app.wsgi_app, app.config["MAX_DECOMPRESSED_LENGTH"]
+    )
+    app.after_request(compress_response)
@@ -0,0 +1,136 @@
+"""Coreference prediction for one or more documents.
+
+Next to the AllenNLP coreference output, every result contains the sentences of the
+document as [start, end] token indices (inclusive, like the spans of the clusters)
+and the [start, end) character offsets of each token. Clients can then map cluster
+spans to sentences without their own tokenization.
+
+The span pruning of the model can be reduced per request: a smaller maximum span
+width, fewer spans per word and fewer antecedents per span are faster, at the cost
+of missing some of the longer or more distant mentions.
+"""
+import copy
+
+from .batching import group_by_token_budget
+
+# the type and lower bound of each span pruning setting. The upper bound is the
+# value the model was trained with, larger values are not safe for the model.
+SPAN_PRUNING_LIMITS = {
+    "max_span_width": (int, 1),
+    "spans_per_word": (float, 0.05),
+    "max_antecedents": (int, 1),
+}
+
+
+def annotate_document(spacy_document) -> dict:
+    """Get the sentences, their token boundaries and the token offsets of a spacy document.
+
+    Returns:
+        - annotation (dict): with the keys
+            - tokens (list): a list per sentence with the text of each token, the
+                input of the coreference dataset reader.
+            - sentences (list): [start, end] token indices of each sentence.
+            - offsets (list): [start, end) character offsets of each token.
+    """
+    annotation = {"tokens": [], "sentences": [], "offsets": []}
+    for sentence in spacy_document.sents:
+        annotation["tokens"].append([token.text for token in sentence])
+        annotation["sentences"].append([sentence.start, sentence.end - 1])
+        annotation["offsets"].extend(
+            [token.idx, token.idx + len(token.text)] for token in sentence
+        )
+    return annotation
+
+
+def normalize_tokens(predictor, tokens: list) -> list:
+    """Normalize the tokens of each sentence like the predictor does for its input.
+
+    CorefPredictor._json_to_instance maps "/." and "/?" to "." and "?" before the
+    dataset reader sees them, the batches are made without that method.
+    """
+    return [
+        [predictor._normalize_word(word) for word in sentence] for sentence in tokens
+    ]
+
+
+def get_span_pruning(predictor) -> dict:
+    """Get the span pruning settings of the predictor."""
+    return {
+        "max_span_width": predictor._dataset_reader._max_span_width,
+        "spans_per_word": predictor._model._spans_per_word,
+        "max_antecedents": predictor._model._max_antecedents,
+    }
+
+
+def clamp_span_pruning(predictor, overrides: dict) -> dict:
+    """Get the span pruning settings with the overrides clamped to the safe ranges."""
+    span_pruning = get_span_pruning(predictor)
+    for name, value in overrides.items():
+        _, minimum = SPAN_PRUNING_LIMITS[name]
+        span_pruning[name] = min(max(value, minimum), span_pruning[name])
+    return span_pruning
+
+
+def with_span_pruning(predictor, span_pruning: dict):
+    """Return a copy of the predictor that uses the span pruning settings.
+
+    The copies are shallow, the model weights are shared with the predictor and
+    other requests keep using the settings of the predictor.
+    """
+    if span_pruning == get_span_pruning(predictor):
+        return predictor
+    dataset_reader = copy.copy(predictor._dataset_reader)
+    dataset_reader._max_span_width = span_pruning["max_span_width"]
+    model = copy.copy(predictor._model)
+    model._spans_per_word = span_pruning["spans_per_word"]
+    model._max_antecedents = span_pruning["max_antecedents"]
+    predictor = copy.copy(predictor)
+    predictor._dataset_reader = dataset_reader
+    predictor._model = model
+    return predictor
+
+
+def predict_documents(
+    predictor,
+    documents: list,
+    token_budget: int,
+    span_pruning: dict = None,
+    check=None,
+) -> list:
+    """Predict the coreference of documents in batches and return them in input order.
+
+    Args:
+        - predictor: the AllenNLP coreference predictor.
+        - documents (list): the documents (str) to predict.
+        - token_budget (int): the maximum padded number of tokens in a batch.
+        - span_pruning (dict): span pruning settings from clamp_span_pruning, the
+            settings of the predictor if None.
+        - check (callable): called before every batch, raises to abandon the work.
+
+    Returns:
+        - results (list): the coreference result of each document, with the sentence
+            boundaries and token offsets added.
+    """
+    if span_pruning is not None:
+        predictor = with_span_pruning(predictor, span_pruning)
+    # the same spacy pipeline as the predictor uses, run over all documents at once.
+    annotations = [
+        annotate_document(spacy_document)
+        for spacy_document in predictor._spacy.pipe(documents)
+    ]
+    lengths = [len(annotation["offsets"]) for annotation in annotations]
+    results = [None] * len(documents)
+    for batch in group_by_token_budget(lengths, token_budget):
+        if check is not None:
+            check()
+        instances = [
+            predictor._dataset_reader.text_to_instance(
+                normalize_tokens(predictor, annotations[index]["tokens"])
+            )
+            for index in batch
+        ]
+        for index, result in zip(batch, predictor.predict_batch_instance(instances)):
+            result["sentences"] = annotations[index]["sentences"]
+            result["offsets"] = annotations[index]["offsets"]
+            results[index] = result
+    return results
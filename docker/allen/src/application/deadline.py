@@ -0,0 +1,85 @@
+"""Request deadlines and cooperative cancellation of the model work.
+
+A client sets the time until which it waits for the answer in the
+X-Request-Deadline header, as seconds since the epoch (e.g. time.time() + 30).
+A request whose deadline has passed is rejected before any model work. During the
+prediction check_deadline is called between the sub-batches, and the remaining work
+is abandoned when the deadline has passed or the client has disconnected. Both
+give a 504 response in the error format of the endpoints.
+"""
+import select
+import socket
+import time
+
+from flask import current_app, g, jsonify, request
+
+DEADLINE_HEADER = "X-Request-Deadline"
+
+
+class DeadlineExceeded(Exception):
+    """The deadline of the request has passed or the client has disconnected."""
+
+
+def client_disconnected() -> bool:
+    """Check if the client of the request has closed its connection.
+
+    Only possible with the socket of gunicorn, False for other servers.
+    """
+    client_socket = request.environ.get("gunicorn.socket")
+    if client_socket is None:
+        return False
+    try:
+        readable, _, _ = select.select([client_socket], [], [], 0)
+        if not readable:
+            return False
+        # a closed connection is readable and has no data left.
+        return client_socket.recv(1, socket.MSG_PEEK) == b""
+    except (OSError, ValueError):
+        return True
+
+
+def check_deadline() -> None:
+    """Raise DeadlineExceeded if the request should not continue, call between sub-batches."""
+    deadline = g.get("deadline")
+    if deadline is not None and time.time() > deadline:
+        raise DeadlineExceeded("The deadline of the request has passed.")
+    if client_disconnected():
+        raise DeadlineExceeded("The client has disconnected.")
+
+
+def start_deadline():
+    """Read the deadline of a request and reject it if the deadline has passed."""
+    g.deadline = None
+    value = request.headers.get(DEADLINE_HEADER)
+    if value is None:
+        return None
+    try:
+        g.deadline = float(value)
+    except ValueError:
+        message = (
+            f"The {DEADLINE_HEADER} header is not valid, provide the deadline in "
+            + "seconds since the epoch."
+        )
+        return jsonify(isError=True, message=message, status_code=400), 400
+    try:
+        check_deadline()
+    except DeadlineExceeded as error:
+        return handle_deadline_exceeded(error)
+    return None
+
+
+def handle_deadline_exceeded(error):
+    """Return the error response of a request that is abandoned."""
+    current_app.logger.info(
+        "request abandoned request_id=%s path=%s reason=%s",
+        g.get("request_id"),
+        request.path,
+        error,
+    )
+    return jsonify(isError=True, message=str(error), status_code=504), 504
+
+
+def init_app(app) -> None:
+    """Register the deadline handling on the app."""
+    app.before_request(start_deadline)
+    app.register_error_handler(DeadlineExceeded, handle_deadline_exceeded)
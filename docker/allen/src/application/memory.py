@@ -0,0 +1,74 @@
+"""Per-request memory accounting of the AllenNLP service.
+
+For every request the change in resident set size (RSS) of the worker is logged and
+recorded in the metrics. When TRACEMALLOC_ENABLED is set, the change of the Python
+heap is recorded as well and the lines that allocated the most are logged.
+"""
+import resource
+import tracemalloc
+
+from flask import current_app, g, request
+
+from .metrics import metrics
+
+
+def get_rss() -> int:
+    """Return the current resident set size of this process in bytes."""
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except (OSError, IndexError, ValueError):
+        # no procfs, fall back on the peak resident set size (in kilobytes on linux).
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def start_request_accounting() -> None:
+    """Store the memory usage at the start of a request."""
+    g.memory_rss_start = get_rss()
+    if tracemalloc.is_tracing():
+        g.memory_heap_start = tracemalloc.get_traced_memory()[0]
+        if current_app.config["TRACEMALLOC_TOP_N"]:
+            g.memory_snapshot_start = tracemalloc.take_snapshot()
+
+
+def log_top_allocations(snapshot_start) -> None:
+    """Log the lines that allocated the most memory since snapshot_start."""
+    top_n = current_app.config["TRACEMALLOC_TOP_N"]
+    differences = tracemalloc.take_snapshot().compare_to(snapshot_start, "lineno")
+    for difference in differences[:top_n]:
+        current_app.logger.debug("memory %s %s", request.path, difference)
+
+
+def finish_request_accounting(response):
+    """Log and record the change in memory usage of a request."""
+    if "memory_rss_start" not in g:
+        return response
+    rss = get_rss()
+    rss_delta = rss - g.memory_rss_start
+    heap_delta = None
+    if tracemalloc.is_tracing() and "memory_heap_start" in g:
+        heap_delta = tracemalloc.get_traced_memory()[0] - g.memory_heap_start
+        if "memory_snapshot_start" in g:
+            log_top_allocations(g.memory_snapshot_start)
+    current_app.logger.info(
+        "memory %s rss=%d rss_delta=%d heap_delta=%s",
+        request.path,
+        rss,
+        rss_delta,
+        heap_delta,
+    )
+    metrics.record(
+        request.endpoint or request.path,
+        rss_bytes=rss,
+        rss_delta_bytes=rss_delta,
+        heap_delta_bytes=heap_delta,
+    )
+    return response
+
+
+def init_app(app) -> None:
+    """Register the memory accounting on the app."""
+    if app.config["TRACEMALLOC_ENABLED"] and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    app.before_request(start_request_accounting)
+    app.after_request(finish_request_accounting)
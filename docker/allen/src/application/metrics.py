@@ -0,0 +1,60 @@
+"""In-process metrics of the AllenNLP service, aggregated per endpoint."""
+import threading
+
+
+class Metrics:
+    """Thread safe store of aggregated request metrics per endpoint.
+
+    Only aggregates are kept (count, last, total and max per value), so the memory
+    used by the metrics does not grow with the number of requests.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def count_request(self, endpoint: str) -> None:
+        """Count a request for an endpoint."""
+        with self._lock:
+            endpoint_metrics = self._endpoints.setdefault(endpoint, {"requests": 0})
+            endpoint_metrics["requests"] += 1
+
+    def record(self, endpoint: str, **values) -> None:
+        """Record the values of one request for an endpoint."""
+        with self._lock:
+            endpoint_metrics = self._endpoints.setdefault(endpoint, {"requests": 0})
+            for name, value in values.items():
+                if value is None:
+                    continue
+                if name not in endpoint_metrics:
+                    endpoint_metrics[name] = {
+                        "count": 1,
+                        "last": value,
+                        "total": value,
+                        "max": value,
+                    }
+                    continue
+                value_metrics = endpoint_metrics[name]
+                value_metrics["count"] += 1
+                value_metrics["last"] = value
+                value_metrics["total"] += value
+                value_metrics["max"] = max(value_metrics["max"], value)
+
+    def snapshot(self) -> dict:
+        """Return a copy of the current metrics."""
+        with self._lock:
+            return {
+                endpoint: {
+                    name: dict(value) if isinstance(value, dict) else value
+                    for name, value in endpoint_metrics.items()
+                }
+                for endpoint, endpoint_metrics in self._endpoints.items()
+            }
+
+    def clear(self) -> None:
+        """Remove all recorded metrics."""
+        with self._lock:
+            self._endpoints = {}
+
+
+metrics = Metrics()
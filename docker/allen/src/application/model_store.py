@@ -0,0 +1,205 @@
+"""Store of extracted AllenNLP model archives with memory-mapped weights.
+
+Predictor.from_path extracts a .tar.gz archive into a temporary directory and reads
+the weights into the heap of every process that loads it. The store extracts each
+archive once into a versioned directory and converts the weights to one .npy file
+per tensor. The weights are then memory-mapped copy-on-write, so loading a model
+pages them in from the page cache, shared by all worker processes.
+
+The layout of a model in the store:
+    <store>/<archive name>-<version>/
+        config.json, vocabulary/, ...   the files of the archive
+        weights/index.json              the .npy file per state dict key
+        weights/<key>.npy
+        .complete                       written when the extraction is finished
+"""
+import fcntl
+import functools
+import hashlib
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+
+import numpy
+import torch
+from allennlp.common.params import Params
+from allennlp.data import Vocabulary
+from allennlp.models import Model
+from allennlp.models.archival import CONFIG_NAME, Archive, _load_dataset_readers
+from allennlp.models.model import remove_pretrained_embedding_params
+from allennlp.predictors.predictor import Predictor
+
+# change when the layout of the store changes, such that old extractions are not used.
+STORE_FORMAT = 1
+WEIGHTS_NAME = "weights.th"
+WEIGHTS_DIR = "weights"
+COMPLETE_MARKER = ".complete"
+
+
+def archive_name(archive_path: str) -> str:
+    """Return the file name of an archive without the .tar.gz extension."""
+    name = os.path.basename(archive_path)
+    for extension in (".tar.gz", ".tgz", ".tar"):
+        if name.endswith(extension):
+            return name[: -len(extension)]
+    return name
+
+
+def archive_version(archive_path: str) -> str:
+    """Return a version of an archive that changes when the archive file changes."""
+    stat = os.stat(archive_path)
+    key = f"{STORE_FORMAT}-{stat.st_size}-{stat.st_mtime_ns}"
+    return hashlib.sha256(key.encode()).hexdigest()[:12]
+
+
+def convert_weights(directory: str) -> None:
+    """Convert the weights.th of an extracted archive to a .npy file per tensor."""
+    state_dict = torch.load(os.path.join(directory, WEIGHTS_NAME), map_location="cpu")
+    weights_dir = os.path.join(directory, WEIGHTS_DIR)
+    os.makedirs(weights_dir)
+    index = {}
+    for key, tensor in state_dict.items():
+        index[key] = f"{key}.npy"
+        numpy.save(os.path.join(weights_dir, index[key]), tensor.cpu().numpy())
+    with open(os.path.join(weights_dir, "index.json"), "w") as index_file:
+        json.dump(index, index_file)
+    os.remove(os.path.join(directory, WEIGHTS_NAME))
+
+
+def load_weights(directory: str) -> dict:
+    """Memory-map the weights of a model in the store as tensors, per state dict key.
+
+    The arrays are mapped copy-on-write: the pages are shared between processes
+    until a process writes to them, which a model in eval mode does not do.
+    """
+    weights_dir = os.path.join(directory, WEIGHTS_DIR)
+    with open(os.path.join(weights_dir, "index.json")) as index_file:
+        index = json.load(index_file)
+    return {
+        key: torch.from_numpy(
+            numpy.load(os.path.join(weights_dir, file_name), mmap_mode="c")
+        )
+        for key, file_name in index.items()
+    }
+
+
+def assign_weights(model, weights: dict) -> None:
+    """Replace the parameters and buffers of the model by the given tensors.
+
+    Unlike load_state_dict, which copies the weights into the tensors of the model,
+    the model then uses the memory-mapped tensors themselves.
+    """
+    for key, tensor in weights.items():
+        module_path, _, name = key.rpartition(".")
+        module = functools.reduce(
+            getattr, module_path.split(".") if module_path else [], model
+        )
+        if name in module._parameters:
+            module._parameters[name] = torch.nn.Parameter(tensor, requires_grad=False)
+        elif name in module._buffers:
+            module._buffers[name] = tensor
+
+
+class ModelStore:
+    """Extracts model archives once and loads predictors from the extractions."""
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+
+    def path(self, archive_path: str) -> str:
+        """Return the directory of an archive in the store."""
+        name = archive_name(archive_path)
+        return os.path.join(self.root, f"{name}-{archive_version(archive_path)}")
+
+    def is_extracted(self, archive_path: str) -> bool:
+        """Check if an archive is completely extracted in the store."""
+        return os.path.exists(os.path.join(self.path(archive_path), COMPLETE_MARKER))
+
+    def extract(self, archive_path: str) -> str:
+        """Extract an archive into the store if it is not there yet, return its directory.
+
+        A lock file makes the processes that start at the same time wait for the
+        one that extracts the archive.
+        """
+        directory = self.path(archive_path)
+        if self.is_extracted(archive_path):
+            return directory
+        os.makedirs(self.root, exist_ok=True)
+        lock_path = os.path.join(self.root, f"{archive_name(archive_path)}.lock")
+        with open(lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            if self.is_extracted(archive_path):
+                return directory
+            shutil.rmtree(directory, ignore_errors=True)
+            # extract next to the final directory, such that the rename is atomic.
+            temporary = tempfile.mkdtemp(dir=self.root, prefix=".extract-")
+            try:
+                with tarfile.open(archive_path) as archive:
+                    archive.extractall(temporary)
+                convert_weights(temporary)
+                open(os.path.join(temporary, COMPLETE_MARKER), "w").close()
+                os.rename(temporary, directory)
+            except BaseException:
+                shutil.rmtree(temporary, ignore_errors=True)
+                raise
+            self.remove_old_versions(archive_path)
+        return directory
+
+    def remove_old_versions(self, archive_path: str) -> None:
+        """Remove the extractions of older versions of an archive.
+
+        Processes that still use an old version keep their memory-mapped weights,
+        the files are only removed when they are unmapped.
+        """
+        name = archive_name(archive_path)
+        current = os.path.basename(self.path(archive_path))
+        for entry in os.listdir(self.root):
+            version = entry[len(name) + 1 :]
+            if (
+                entry != current
+                and entry.startswith(f"{name}-")
+                and len(version) == 12
+                and all(character in "0123456789abcdef" for character in version)
+            ):
+                shutil.rmtree(os.path.join(self.root, entry), ignore_errors=True)
+
+    def load_predictor(self, archive_path: str, predictor_name: str = None):
+        """Load the predictor of an archive from the store, extract it first if needed.
+
+        Follows allennlp.models.archival.load_archive, except that the weights are
+        memory-mapped from the store instead of read from weights.th.
+        """
+        directory = self.extract(archive_path)
+        config = Params.from_file(os.path.join(directory, CONFIG_NAME))
+        dataset_reader, validation_dataset_reader = _load_dataset_readers(
+            config.duplicate(), directory
+        )
+        vocab_params = config.get("vocabulary", Params({}))
+        vocab_choice = vocab_params.pop_choice(
+            "type", Vocabulary.list_available(), True
+        )
+        vocab_class, _ = Vocabulary.resolve_class_name(vocab_choice)
+        vocab = vocab_class.from_files(
+            os.path.join(directory, "vocabulary"),
+            vocab_params.get("padding_token"),
+            vocab_params.get("oov_token"),
+        )
+        model_params = config.get("model").duplicate()
+        remove_pretrained_embedding_params(model_params)
+        model = Model.from_params(
+            vocab=vocab, params=model_params, serialization_dir=directory
+        )
+        model.extend_embedder_vocab()
+        assign_weights(model, load_weights(directory))
+        model.eval()
+        fields = {
+            "model": model,
+            "config": config,
+            "dataset_reader": dataset_reader,
+            "validation_dataset_reader": validation_dataset_reader,
+        }
+        if "meta" in Archive._fields:
+            fields["meta"] = None
+        return Predictor.from_archive(Archive(**fields), predictor_name)
@@ -0,0 +1,138 @@
+"""Registry of the AllenNLP predictors, shared by all requests of a worker process.
+
+The predictors are loaded once per process, on first use or with preload. Every
+model has its own semaphore, which limits the number of requests that use the
+model at the same time (MODEL_CONCURRENCY). In the threaded serving mode many
+requests share the predictors of one process instead of every process holding
+its own copies. With MODEL_STORE_DIR set, the predictors are loaded from the
+extracted archives with memory-mapped weights in the model store. SERVED_MODELS
+limits the models of a worker pool, see router.py.
+
+AllenNLP is only imported when a model is loaded, and then only the model family
+(the allennlp_models package) of that model. Predictor.from_path would otherwise
+import all families of allennlp_models, which takes tens of seconds.
+"""
+import contextlib
+import importlib
+import threading
+
+from flask import current_app
+
+from .startup import startup
+
+MODELS = {
+    "srl": {
+        "archive": "/opt/allen_nlp/structured-prediction-srl-bert.2020.12.15.tar.gz",
+        "family": "allennlp_models.structured_prediction",
+    },
+    "coref": {
+        "archive": "/opt/allen_nlp/coref-spanbert-large-2021.03.10.tar.gz",
+        "family": "allennlp_models.coref",
+    },
+    "entail": {
+        # the archive of the pretrained model pair-classification-roberta-snli.
+        "archive": "/opt/allen_nlp/snli-roberta.2021-03-11.tar.gz",
+        "predictor_name": "textual_entailment",
+        "family": "allennlp_models.pair_classification",
+    },
+}
+
+
+def load_model(model: dict, store_dir: str = None):
+    """Load the predictor of a model from its archive.
+
+    With a store_dir, the archive is loaded from its extraction in the model store.
+    """
+    with startup.phase(f"import {model['family']}"):
+        # registers the model, dataset reader and predictor of the family.
+        importlib.import_module(model["family"])
+        from allennlp.predictors.predictor import Predictor
+
+        from .model_store import ModelStore
+
+    archive, predictor_name = model["archive"], model.get("predictor_name")
+    if store_dir:
+        return ModelStore(store_dir).load_predictor(archive, predictor_name)
+    return Predictor.from_path(archive, predictor_name, import_plugins=False)
+
+
+class PredictorRegistry:
+    """Thread safe registry that loads each predictor once and limits its concurrency."""
+
+    def __init__(
+        self, models: dict, concurrency: int = 1, store_dir: str = None
+    ) -> None:
+        self.models = models
+        self.store_dir = store_dir
+        self._predictors = {}
+        self._load_locks = {name: threading.Lock() for name in models}
+        self._semaphores = {
+            name: threading.BoundedSemaphore(concurrency) for name in models
+        }
+
+    def get(self, name: str):
+        """Return the predictor of a model, load it if it is not loaded yet."""
+        predictor = self._predictors.get(name)
+        if predictor is not None:
+            return predictor
+        with self._load_locks[name]:
+            # another thread might have loaded it while we were waiting.
+            if name not in self._predictors:
+                with startup.phase(f"load {name}"):
+                    self._predictors[name] = load_model(
+                        self.models[name], self.store_dir
+                    )
+            return self._predictors[name]
+
+    @contextlib.contextmanager
+    def use(self, name: str):
+        """Use the predictor of a model, waiting while too many requests are using it."""
+        with self._semaphores[name]:
+            yield self.get(name)
+
+    def preload(self, names=None) -> None:
+        """Load the predictors of the given models, all models if names is None."""
+        for name in names if names is not None else self.models:
+            self.get(name)
+
+    def is_loaded(self, name: str) -> bool:
+        """Check if the predictor of a model is loaded."""
+        return name in self._predictors
+
+
+def use_predictor(name: str):
+    """Use the predictor of a model from the registry of the current app."""
+    return current_app.extensions["predictors"].use(name)
+
+
+def get_served_models(served) -> dict:
+    """Return the models to serve, all models if served is None.
+
+    Args:
+        - served (list | str | None): the names of the models, or a comma separated
+            string of them like in NGUML_SERVED_MODELS=srl,coref.
+    """
+    if served is None:
+        return MODELS
+    if isinstance(served, str):
+        served = [name.strip() for name in served.split(",") if name.strip()]
+    unknown = [name for name in served if name not in MODELS]
+    if unknown:
+        raise ValueError(
+            f"Unknown models in SERVED_MODELS: {', '.join(unknown)}, use one of: "
+            + ", ".join(MODELS)
+            + "."
+        )
+    return {name: MODELS[name] for name in served}
+
+
+def init_app(app) -> None:
+    """Create the predictor registry of the app with the served models."""
+    registry = PredictorRegistry(
+        get_served_models(app.config["SERVED_MODELS"]),
+        app.config["MODEL_CONCURRENCY"],
+        app.config["MODEL_STORE_DIR"],
+    )
+    app.extensions["predictors"] = registry
+    if app.config["PRELOAD_MODELS"]:
+        registry.preload()
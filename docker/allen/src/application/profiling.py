@@ -0,0 +1,171 @@
+"""Opt-in profiling of single requests on the prediction endpoints.
+
+A request is profiled when profiling is enabled in the config (PROFILING_ENABLED)
+and the request asks for it with the query parameter `?profile=1`. The view then
+runs under cProfile, and under the torch profiler when torch is available. A
+summary of the hotspots and the time per pipeline phase is added to the JSON
+output under the key `profile`.
+"""
+import contextlib
+import cProfile
+import functools
+import os
+import pstats
+import time
+
+from flask import current_app, jsonify, request
+
+# The frames, (end of the file path, function name), that mark a phase of the
+# prediction pipeline: the entry points of spaCy, the AllenNLP predictors and models
+# and this service. Function names alone also match unrelated code, like every
+# torch module's forward. The frames of a phase do not call each other and each
+# request passes only some of them, so the time of a phase is the sum of the
+# cumulative times of its frames.
+PHASE_FRAMES = {
+    "tokenization": (
+        ("spacy/language.py", "pipe"),
+        ("allennlp/predictors/predictor.py", "_batch_json_to_instances"),
+        (
+            "allennlp_models/structured_prediction/predictors/srl.py",
+            "tokens_to_instances",
+        ),
+        ("allennlp_models/coref/dataset_readers/conll.py", "text_to_instance"),
+    ),
+    "encoder": (
+        ("allennlp_models/structured_prediction/models/srl_bert.py", "forward"),
+        ("allennlp_models/coref/models/coref.py", "forward"),
+        ("allennlp/models/basic_classifier.py", "forward"),
+    ),
+    "decoding": (
+        (
+            "allennlp_models/structured_prediction/models/srl_bert.py",
+            "make_output_human_readable",
+        ),
+        ("application/viterbi.py", "batched_viterbi_decode"),
+        ("allennlp_models/coref/models/coref.py", "make_output_human_readable"),
+        ("allennlp/models/basic_classifier.py", "make_output_human_readable"),
+    ),
+    "serialization": (
+        ("allennlp/common/util.py", "sanitize"),
+        ("flask/json/__init__.py", "jsonify"),
+    ),
+}
+
+
+def get_phase(file_name: str, function_name: str) -> str:
+    """Get the phase a frame marks, None if it marks none."""
+    path = file_name.replace(os.sep, "/")
+    for phase, frames in PHASE_FRAMES.items():
+        for suffix, name in frames:
+            if function_name == name and path.endswith("/" + suffix):
+                return phase
+    return None
+
+
+def profiling_requested() -> bool:
+    """Check if the current request should be profiled."""
+    if not current_app.config.get("PROFILING_ENABLED", False):
+        return False
+    return request.args.get("profile", "").lower() in ("1", "true", "yes")
+
+
+def torch_profiler():
+    """Return the torch profiler as context manager, or an empty one without torch."""
+    try:
+        from torch import profiler
+    except ImportError:
+        return contextlib.nullcontext(None)
+    return profiler.profile(activities=[profiler.ProfilerActivity.CPU])
+
+
+def get_phase_times(stats: pstats.Stats) -> dict:
+    """Get the time in milliseconds spent per pipeline phase from the cProfile stats."""
+    phases = {phase: 0.0 for phase in PHASE_FRAMES}
+    for (file_name, _, function_name), (_, _, _, cumulative, _) in stats.stats.items():
+        phase = get_phase(file_name, function_name)
+        if phase is not None:
+            phases[phase] += cumulative * 1000
+    return {phase: round(duration, 3) for phase, duration in phases.items()}
+
+
+def get_hotspots(stats: pstats.Stats, top_n: int) -> list:
+    """Get the top_n functions with the most time spent in the function itself."""
+    items = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+    hotspots = []
+    for (file_name, line, function_name), (_, calls, own, cumulative, _) in items[:top_n]:
+        hotspots.append(
+            {
+                "function": f"{function_name} ({file_name}:{line})",
+                "calls": calls,
+                "self_ms": round(own * 1000, 3),
+                "cumulative_ms": round(cumulative * 1000, 3),
+            }
+        )
+    return hotspots
+
+
+def get_torch_operators(torch_profile, top_n: int) -> list:
+    """Get the top_n torch operators with the most cpu time spent in the operator itself."""
+    if torch_profile is None:
+        return []
+    events = sorted(
+        torch_profile.key_averages(),
+        key=lambda event: event.self_cpu_time_total,
+        reverse=True,
+    )
+    return [
+        {
+            "operator": event.key,
+            "calls": event.count,
+            "self_cpu_ms": round(event.self_cpu_time_total / 1000, 3),
+            "cpu_ms": round(event.cpu_time_total / 1000, 3),
+        }
+        for event in events[:top_n]
+    ]
+
+
+def store_profile(profile: cProfile.Profile) -> str:
+    """Store the raw cProfile stats in PROFILING_DIR if it is set and return the path."""
+    profiling_dir = current_app.config.get("PROFILING_DIR")
+    if not profiling_dir:
+        return ""
+    os.makedirs(profiling_dir, exist_ok=True)
+    file_name = f"{request.endpoint}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.prof"
+    path = os.path.join(profiling_dir, file_name)
+    profile.dump_stats(path)
+    return path
+
+
+def profiled(view):
+    """Decorate a view to profile it when the request asks for it."""
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not profiling_requested():
+            return view(*args, **kwargs)
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        with torch_profiler() as torch_profile:
+            profile.enable()
+            try:
+                response = view(*args, **kwargs)
+            finally:
+                profile.disable()
+        total = time.perf_counter() - start
+        data = response.get_json(silent=True)
+        if not isinstance(data, dict):
+            return response
+        top_n = current_app.config.get("PROFILING_TOP_N", 20)
+        stats = pstats.Stats(profile)
+        data["profile"] = {
+            "total_ms": round(total * 1000, 3),
+            "phases": get_phase_times(stats),
+            "hotspots": get_hotspots(stats, top_n),
+            "torch_operators": get_torch_operators(torch_profile, top_n),
+            "stored": store_profile(profile),
+        }
+        profiled_response = jsonify(data)
+        profiled_response.status_code = response.status_code
+        return profiled_response
+
+    return wrapper
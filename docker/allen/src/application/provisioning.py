@@ -0,0 +1,203 @@
+"""Download the model archives and prepare them in the model store.
+
+Run by the entrypoint of the container when NGUML_DOWNLOAD_MODELS_STARTUP is true:
+
+    python3 -m application.provisioning
+
+Archives that are present with a valid checksum are skipped without contacting the
+source, the missing ones are downloaded in parallel from NGUML_MODEL_SOURCE. An
+interrupted download is kept as <archive>.part and resumed with a range request on
+the next start. An archive is verified against the sha256 pinned in ARCHIVES, or
+against <url>.sha256 when the source provides it and no digest is pinned. Only a
+verified archive gets its checksum stored next to it as <archive>.sha256; an archive
+without any digest to verify it against is never trusted and is downloaded again.
+Finally the archives of the served models are extracted into the model store
+(NGUML_MODEL_STORE_DIR), see model_store.py.
+"""
+import hashlib
+import os
+import shutil
+import sys
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from .predictors import MODELS
+
+# the archives of the served models with their pinned sha256, None if not pinned yet
+# (sha256sum of the archive as published in DEFAULT_SOURCE).
+ARCHIVES = {
+    "coref-spanbert-large-2021.03.10.tar.gz": None,
+    "structured-prediction-srl-bert.2020.12.15.tar.gz": None,
+    "snli-roberta.2021-03-11.tar.gz": None,
+}
+DEFAULT_SOURCE = "https://storage.googleapis.com/allennlp-public-models"
+DEFAULT_DIRECTORY = "/opt/allen_nlp"
+CHUNK_SIZE = 1024 * 1024
+
+
+class ProvisioningError(Exception):
+    """A model archive could not be provisioned."""
+
+
+def sha256_file(path: str) -> str:
+    """Return the sha256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_checksum(path: str):
+    """Read the digest of a checksum file in the format of sha256sum, None if absent."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        content = file.read().split()
+    return content[0].lower() if content else None
+
+
+def write_checksum(path: str, digest: str) -> None:
+    """Write the checksum file of an archive, in the format of sha256sum."""
+    with open(f"{path}.sha256", "w") as file:
+        file.write(f"{digest}  {os.path.basename(path)}\n")
+
+
+def fetch_checksum(url: str):
+    """Fetch the published checksum of an archive, None if the source has none."""
+    try:
+        with urllib.request.urlopen(f"{url}.sha256") as response:
+            content = response.read().decode().split()
+    except urllib.error.HTTPError as error:
+        if error.code == 404:
+            return None
+        raise
+    return content[0].lower() if content else None
+
+
+def download(url: str, path: str) -> None:
+    """Download url to path, resuming a partial download in <path>.part."""
+    partial = f"{path}.part"
+    offset = os.path.getsize(partial) if os.path.exists(partial) else 0
+    request = urllib.request.Request(url)
+    if offset:
+        request.add_header("Range", f"bytes={offset}-")
+    try:
+        response = urllib.request.urlopen(request)
+    except urllib.error.HTTPError as error:
+        if error.code != 416:
+            raise
+        # the partial file already has all bytes.
+        os.rename(partial, path)
+        return
+    with response:
+        # a server without range support sends the whole file again.
+        mode = "ab" if response.status == 206 else "wb"
+        with open(partial, mode) as file:
+            shutil.copyfileobj(response, file, CHUNK_SIZE)
+    os.rename(partial, path)
+
+
+def provision_archive(name: str, source: str, directory: str) -> str:
+    """Make sure a valid archive is in the directory, return what was done.
+
+    A present archive is checked against the pinned digest, else against the
+    digest recorded after its verified download, so the source is only contacted
+    when there is neither or the archive does not match. A present archive that
+    can not be verified at all is downloaded again.
+    """
+    path = os.path.join(directory, name)
+    url = f"{source.rstrip('/')}/{name}"
+    pinned = ARCHIVES.get(name)
+    if os.path.exists(path):
+        expected = pinned or read_checksum(f"{path}.sha256") or fetch_checksum(url)
+        if expected is not None and sha256_file(path) == expected:
+            write_checksum(path, expected)
+            return "present"
+        if expected is None:
+            print(f"{name}: no checksum to verify it, downloading it again.", flush=True)
+        else:
+            print(f"{name}: checksum does not match, downloading it again.", flush=True)
+        os.remove(path)
+        if os.path.exists(f"{path}.sha256"):
+            os.remove(f"{path}.sha256")
+    expected = pinned or fetch_checksum(url)
+    download(url, path)
+    if expected is None:
+        print(
+            f"{name}: no checksum is pinned or published, pin its sha256 in ARCHIVES.",
+            flush=True,
+        )
+        return "downloaded"
+    digest = sha256_file(path)
+    if digest != expected:
+        os.remove(path)
+        raise ProvisioningError(
+            f"{name}: the checksum {digest} does not match the expected {expected}."
+        )
+    write_checksum(path, digest)
+    return "downloaded"
+
+
+def served_archives(directory: str) -> list:
+    """Return the archives in the directory that are used by the served models."""
+    return [
+        os.path.join(directory, os.path.basename(model["archive"]))
+        for model in MODELS.values()
+        if "archive" in model
+    ]
+
+
+def provision(
+    names: list, source: str, directory: str, store_dir: str = None, workers: int = 4
+) -> dict:
+    """Provision the archives in parallel and extract the served ones into the store.
+
+    Returns:
+        - results (dict): per archive name "present", "downloaded" or "extracted".
+    """
+    os.makedirs(directory, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = dict(
+            zip(
+                names,
+                executor.map(
+                    lambda name: provision_archive(name, source, directory), names
+                ),
+            )
+        )
+        if store_dir:
+            # imports torch and allennlp, which downloading alone does not need.
+            from .model_store import ModelStore
+
+            store = ModelStore(store_dir)
+            archives = [
+                path
+                for path in served_archives(directory)
+                if os.path.basename(path) in results and not store.is_extracted(path)
+            ]
+            for path, _ in zip(archives, executor.map(store.extract, archives)):
+                results[os.path.basename(path)] = "extracted"
+    return results
+
+
+def main() -> int:
+    """Provision the model archives with the settings of the environment."""
+    source = os.environ.get("NGUML_MODEL_SOURCE") or DEFAULT_SOURCE
+    directory = os.environ.get("NGUML_MODEL_DIR") or DEFAULT_DIRECTORY
+    store_dir = os.environ.get("NGUML_MODEL_STORE_DIR", f"{DEFAULT_DIRECTORY}/store")
+    workers = int(os.environ.get("NGUML_PROVISION_WORKERS", "4"))
+    print(f"Provisioning NLP models from {source} into {directory}.", flush=True)
+    try:
+        results = provision(list(ARCHIVES), source, directory, store_dir, workers)
+    except (ProvisioningError, OSError) as error:
+        print(f"Provisioning failed: {error}", file=sys.stderr, flush=True)
+        return 1
+    for name, result in results.items():
+        print(f"{name}: {result}", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
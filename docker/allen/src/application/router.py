@@ -0,0 +1,132 @@
+"""Router that forwards the requests of each model to its own worker pool.
+
+In the pools deployment (compose/docker-compose.pools.yml) every model is served
+by its own pool of workers, started with NGUML_SERVED_MODELS=<model>, such that a
+pool only loads its own model and is sized on its own. The router is a thin wsgi
+app in front of them: /predict/<model> is forwarded to the url of the pool of the
+model, set with NGUML_ROUTE_<MODEL> (e.g. NGUML_ROUTE_SRL=http://allen_srl:5000).
+Headers like X-Request-ID and Content-Encoding are passed on unchanged.
+"""
+import http.client
+import os
+import threading
+import urllib.parse
+
+from werkzeug.wsgi import get_input_stream
+
+from .compression import error_response
+
+ROUTE_PREFIX = "/predict/"
+ROUTE_ENVIRONMENT_PREFIX = "NGUML_ROUTE_"
+# headers that apply to a single connection and are not forwarded.
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "host",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailers",
+    "transfer-encoding",
+    "upgrade",
+}
+
+
+def get_request_headers(environ) -> dict:
+    """Get the headers of a wsgi request that are forwarded to a pool."""
+    headers = {}
+    for key, value in environ.items():
+        if key.startswith("HTTP_"):
+            name = key[len("HTTP_") :].replace("_", "-").title()
+        elif key in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            name = key.replace("_", "-").title()
+        else:
+            continue
+        if value and name.lower() not in HOP_BY_HOP_HEADERS:
+            headers[name] = value
+    return headers
+
+
+class Router:
+    """Wsgi app that forwards /predict/<model> requests to the pool of the model."""
+
+    def __init__(self, routes: dict, timeout: float = 600) -> None:
+        self.routes = {
+            model: urllib.parse.urlsplit(url) for model, url in routes.items()
+        }
+        self.timeout = timeout
+        # a connection per pool per thread, kept open when the pool allows it.
+        self._local = threading.local()
+
+    def get_connection(self, model: str) -> http.client.HTTPConnection:
+        """Return the connection of this thread to the pool of a model."""
+        if not hasattr(self._local, "connections"):
+            self._local.connections = {}
+        if model not in self._local.connections:
+            url = self.routes[model]
+            self._local.connections[model] = http.client.HTTPConnection(
+                url.hostname, url.port or 80, timeout=self.timeout
+            )
+        return self._local.connections[model]
+
+    def forward(self, model: str, method: str, target: str, body: bytes, headers):
+        """Send a request to the pool of a model and return the response."""
+        connection = self.get_connection(model)
+        try:
+            connection.request(method, target, body, headers)
+            return connection.getresponse()
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+            # the pool closed a kept open connection, the predictions have no side
+            # effects so the request is sent again on a new connection.
+            connection.close()
+            connection.request(method, target, body, headers)
+            return connection.getresponse()
+
+    def __call__(self, environ, start_response):
+        path = environ.get("PATH_INFO", "")
+        model = None
+        if path.startswith(ROUTE_PREFIX):
+            model = path[len(ROUTE_PREFIX) :].split("/")[0]
+        if model not in self.routes:
+            message = f"No worker pool for '{path}', the router serves: " + ", ".join(
+                ROUTE_PREFIX + model for model in self.routes
+            )
+            return error_response(start_response, "404 NOT FOUND", message + ".")
+        target = urllib.parse.quote(path)
+        if environ.get("QUERY_STRING"):
+            target += "?" + environ["QUERY_STRING"]
+        body = get_input_stream(environ).read()
+        try:
+            response = self.forward(
+                model,
+                environ["REQUEST_METHOD"],
+                target,
+                body,
+                get_request_headers(environ),
+            )
+            data = response.read()
+        except (OSError, http.client.HTTPException) as error:
+            self.get_connection(model).close()
+            message = f"The worker pool of '{model}' is not reachable: {error}."
+            return error_response(start_response, "502 BAD GATEWAY", message)
+        start_response(
+            f"{response.status} {response.reason}",
+            [
+                (name, value)
+                for name, value in response.getheaders()
+                if name.lower() not in HOP_BY_HOP_HEADERS
+            ],
+        )
+        return [data]
+
+
+def create_router(routes: dict = None) -> Router:
+    """Create the router, with the routes of the NGUML_ROUTE_<MODEL> variables if None."""
+    if routes is None:
+        routes = {
+            key[len(ROUTE_ENVIRONMENT_PREFIX) :].lower(): url
+            for key, url in os.environ.items()
+            if key.startswith(ROUTE_ENVIRONMENT_PREFIX) and url
+        }
+    timeout = float(os.environ.get("NGUML_ROUTER_TIMEOUT", "600"))
+    return Router(routes, timeout)
@@ -0,0 +1,86 @@
+"""Semantic role labelling of the sentences of a request.
+
+All sentences are tokenized and POS tagged in one spacy batch. Sentences without
+a verb candidate, such as headings and list items, skip the instance creation and
+the model and get an empty result in the same format as the AllenNLP predictor.
+With batched decoding the tags of a batch are decoded at once, see viterbi.py.
+"""
+# the POS tags the AllenNLP SRL predictor creates an instance for.
+VERB_TAGS = ("VERB", "AUX")
+
+
+def has_verb_candidate(tokens: list) -> bool:
+    """Check if any of the tokens is tagged as a verb."""
+    return any(token.pos_ in VERB_TAGS for token in tokens)
+
+
+def forward_on_instances(model, instances: list, batched_decoding: bool) -> list:
+    """Run the model on a batch of instances and decode their tags."""
+    if not batched_decoding:
+        return model.forward_on_instances(instances)
+    # imported here, such that torch is only imported when the model is used.
+    from . import viterbi
+
+    return viterbi.forward_on_instances(model, instances)
+
+
+def predict_sentences(
+    predictor, sentences: list, batched_decoding: bool = False, check=None
+) -> tuple:
+    """Predict the semantic roles of sentences, skipping the sentences without verbs.
+
+    Args:
+        - predictor: the AllenNLP SRL predictor.
+        - sentences (list): the sentences (str) to predict.
+        - batched_decoding (bool): decode the tags of a batch at once instead of the
+            viterbi decoding of the model per instance.
+        - check (callable): called before every batch, raises to abandon the work.
+
+    Returns:
+        - results (list): per sentence a dict with the words and the verbs, like
+            the output of the predictor.
+        - skipped (int): the number of sentences that did not go through the model.
+    """
+    tokenizer = predictor._tokenizer
+    # like SpacyTokenizer.batch_tokenize, but in this process: batch_tokenize runs
+    # spacy with n_process=-1, which starts a pool of processes for every request.
+    tokens_per_sentence = [
+        tokenizer._sanitize([token for token in doc if not token.is_space])
+        for doc in tokenizer.spacy.pipe(sentences)
+    ]
+    results = []
+    instances = []
+    instance_sentences = []
+    for index, tokens in enumerate(tokens_per_sentence):
+        results.append({"verbs": [], "words": [token.text for token in tokens]})
+        if not has_verb_candidate(tokens):
+            continue
+        sentence_instances = predictor.tokens_to_instances(tokens)
+        instances.extend(sentence_instances)
+        instance_sentences.extend([index] * len(sentence_instances))
+    skipped = len(sentences) - len(set(instance_sentences))
+    # the predictor uses the number of sentences as batch size, so do we.
+    batch_size = len(sentences)
+    outputs = []
+    for start in range(0, len(instances), batch_size):
+        if check is not None:
+            check()
+        outputs.extend(
+            forward_on_instances(
+                predictor._model,
+                instances[start : start + batch_size],
+                batched_decoding,
+            )
+        )
+    for index, output in zip(instance_sentences, outputs):
+        results[index]["words"] = output["words"]
+        results[index]["verbs"].append(
+            {
+                "verb": output["verb"],
+                "description": predictor.make_srl_string(
+                    output["words"], output["tags"]
+                ),
+                "tags": output["tags"],
+            }
+        )
+    return results, skipped
@@ -0,0 +1,64 @@
+"""Startup timings of a worker: the imports and the loading of the models.
+
+Every phase records its own time, without the time of the phases that run inside
+it. The time of "load coref" therefore excludes "import allennlp_models.coref",
+and the phases add up to the total startup time. The report is logged when a
+threaded worker has preloaded its models and returned by GET /startup.
+"""
+import contextlib
+import threading
+import time
+
+
+class StartupReport:
+    """Thread safe record of the time spent per startup phase."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._phases = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """Record the time of the block as the phase name, minus its inner phases."""
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            inner = stack.pop()
+            if stack:
+                stack[-1] += duration
+            self.record(name, duration - inner)
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add seconds to the time of a phase."""
+        with self._lock:
+            self._phases[name] = self._phases.get(name, 0.0) + seconds
+
+    def snapshot(self) -> dict:
+        """Return the time per phase and the total in milliseconds."""
+        with self._lock:
+            phases = {
+                name: round(seconds * 1000, 3) for name, seconds in self._phases.items()
+            }
+        return {"phases": phases, "total_ms": round(sum(phases.values()), 3)}
+
+    def log(self, logger) -> None:
+        """Log the time per phase, the slowest first."""
+        report = self.snapshot()
+        for name, duration in sorted(
+            report["phases"].items(), key=lambda item: item[1], reverse=True
+        ):
+            logger.info("startup phase=%s duration_ms=%.3f", name, duration)
+        logger.info("startup total_ms=%.3f", report["total_ms"])
+
+    def clear(self) -> None:
+        """Remove all recorded phases."""
+        with self._lock:
+            self._phases = {}
+
+
+startup = StartupReport()
@@ -0,0 +1,49 @@
+"""Request ids and timings, to follow one pipeline run through the logs.
+
+The client sends the id of a pipeline run in the X-Request-ID header. The service
+logs it with the start time and duration of every request, so a latency waterfall
+of a run can be reconstructed from the logs. Requests without the header get a
+new id. The id is returned in the X-Request-ID header of the response.
+"""
+import time
+import uuid
+
+from flask import current_app, g, request
+
+from .metrics import metrics
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+
+def start_request_trace() -> None:
+    """Store the request id and start time of a request."""
+    g.request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+    g.request_start_time = time.time()
+    g.request_start = time.perf_counter()
+
+
+def finish_request_trace(response):
+    """Log the request id and timing of a request."""
+    if "request_start" not in g:
+        return response
+    duration_ms = (time.perf_counter() - g.request_start) * 1000
+    current_app.logger.info(
+        "request request_id=%s method=%s path=%s status=%s start=%.6f duration_ms=%.3f",
+        g.request_id,
+        request.method,
+        request.path,
+        response.status_code,
+        g.request_start_time,
+        duration_ms,
+    )
+    endpoint = request.endpoint or request.path
+    metrics.count_request(endpoint)
+    metrics.record(endpoint, duration_ms=duration_ms)
+    response.headers[REQUEST_ID_HEADER] = g.request_id
+    return response
+
+
+def init_app(app) -> None:
+    """Register the request tracing on the app."""
+    app.before_request(start_request_trace)
+    app.after_request(finish_request_trace)
@@ -0,0 +1,126 @@
+"""Batched constrained Viterbi decoding of the BIO tags of the SRL model.
+
+The SRL model decodes its tags with allennlp.nn.util.viterbi_decode, a Python loop
+over the timesteps that runs once per instance. Here all instances of a batch are
+decoded at once, with one tensor operation per timestep. The arithmetic is the same
+as viterbi_decode with allowed start transitions (extra start and end tags that are
+forced with a score of 100000), so the tag sequences are identical.
+"""
+import math
+
+import torch
+from allennlp.data import Batch
+from allennlp.nn import util
+
+# the score viterbi_decode gives to an observed (forced) tag.
+OBSERVATION_SCORE = 100000.0
+
+
+def augment_transitions(
+    transition_matrix: torch.Tensor, allowed_start_transitions: torch.Tensor
+) -> torch.Tensor:
+    """Add the start and end tags to the transition matrix, like viterbi_decode."""
+    num_tags = transition_matrix.size(0)
+    blocked = torch.tensor([-math.inf, -math.inf])
+    transitions = torch.zeros(num_tags + 2, num_tags + 2)
+    transitions[:-2, :-2] = transition_matrix
+    transitions[-2, :] = torch.cat([allowed_start_transitions, blocked])
+    transitions[-1, :] = -math.inf
+    transitions[:, -1] = torch.cat([torch.zeros(num_tags), blocked])
+    transitions[:, -2] = -math.inf
+    return transitions
+
+
+def batched_viterbi_decode(
+    predictions: torch.Tensor,
+    lengths: list,
+    transition_matrix: torch.Tensor,
+    allowed_start_transitions: torch.Tensor,
+) -> list:
+    """Decode the most likely tag sequence of every instance of a batch.
+
+    Args:
+        - predictions (torch.Tensor): (batch_size, max_length, num_tags) tag scores.
+        - lengths (list): the number of timesteps of each instance.
+        - transition_matrix (torch.Tensor): (num_tags, num_tags) transition scores.
+        - allowed_start_transitions (torch.Tensor): (num_tags,) start scores.
+
+    Returns:
+        - paths (list): per instance the list of tag indices, of its length.
+    """
+    batch_size, max_length, num_tags = predictions.size()
+    transitions = augment_transitions(transition_matrix, allowed_start_transitions)
+    start_tag, end_tag = num_tags, num_tags + 1
+    blocked = predictions.new_full((batch_size, 2), -math.inf)
+    start_scores = predictions.new_zeros(batch_size, num_tags + 2)
+    start_scores[:, start_tag] = OBSERVATION_SCORE
+    end_scores = predictions.new_zeros(batch_size, num_tags + 2)
+    end_scores[:, end_tag] = OBSERVATION_SCORE
+    identity = torch.arange(num_tags + 2).expand(batch_size, -1)
+    lengths_tensor = torch.tensor(lengths).unsqueeze(1)
+
+    path_scores = start_scores
+    backpointers = []
+    # timestep 0 is the start tag, timestep length + 1 the end tag. Instances that
+    # are shorter than the batch keep their end scores and point to themselves.
+    for timestep in range(1, max_length + 2):
+        summed = path_scores.unsqueeze(2) + transitions
+        scores, pointers = torch.topk(summed, k=1, dim=1)
+        scores, pointers = scores.squeeze(1), pointers.squeeze(1)
+        emission = torch.cat(
+            [predictions[:, min(timestep, max_length) - 1, :], blocked], -1
+        )
+        is_tag = timestep <= lengths_tensor
+        is_end = timestep == lengths_tensor + 1
+        path_scores = torch.where(
+            is_tag,
+            emission + scores,
+            torch.where(is_end, end_scores, path_scores),
+        )
+        backpointers.append(torch.where(is_tag | is_end, pointers, identity))
+
+    tags = torch.full((batch_size,), end_tag, dtype=torch.long)
+    path = [tags]
+    for pointers in reversed(backpointers):
+        tags = pointers.gather(1, tags.unsqueeze(1)).squeeze(1)
+        path.append(tags)
+    path.reverse()
+    path = torch.stack(path, 1).tolist()
+    return [path[index][1 : length + 1] for index, length in enumerate(lengths)]
+
+
+def forward_on_instances(model, instances: list) -> list:
+    """Run the SRL model on instances and decode the tags of the batch at once.
+
+    Returns the words, verb and tags of every instance, the same values as
+    model.forward_on_instances gives for them.
+    """
+    with torch.no_grad():
+        dataset = Batch(instances)
+        dataset.index_instances(model.vocab)
+        model_input = util.move_to_device(
+            dataset.as_tensor_dict(), model._get_prediction_device()
+        )
+        output_dict = model(**model_input)
+    lengths = util.get_lengths_from_binary_sequence_mask(output_dict["mask"]).tolist()
+    paths = batched_viterbi_decode(
+        output_dict["class_probabilities"].detach().cpu(),
+        lengths,
+        model.get_viterbi_pairwise_potentials(),
+        model.get_start_transitions(),
+    )
+    outputs = []
+    for path, words, verb, offsets in zip(
+        paths,
+        output_dict["words"],
+        output_dict["verb"],
+        output_dict["wordpiece_offsets"],
+    ):
+        tags = [
+            model.vocab.get_token_from_index(index, namespace=model._label_namespace)
+            for index in path
+        ]
+        outputs.append(
+            {"words": words, "verb": verb, "tags": [tags[i] for i in offsets]}
+        )
+    return outputs
@@ -0,0 +1,43 @@
+"""Gunicorn settings of the AllenNLP service.
+
+The serving mode is chosen with NGUML_SERVING_MODE:
+    - sync (default): one sync worker per concurrent request, every worker is
+      restarted after a request to free the memory of the models.
+    - threaded: gthread workers, where the threads of a worker share one set of
+      predictors. Concurrency then scales with NGUML_THREADS instead of with
+      processes that each hold all models.
+    - router: gthread workers for the router of the worker pools, which only
+      forwards requests (gunicorn router:app -c gunicorn.conf.py).
+"""
+import os
+
+serving_mode = os.environ.get("NGUML_SERVING_MODE", "sync")
+
+bind = os.environ.get("NGUML_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("NGUML_WORKERS", "1"))
+timeout = 300000
+loglevel = "debug"
+
+if serving_mode == "threaded":
+    worker_class = "gthread"
+    threads = int(os.environ.get("NGUML_THREADS", "4"))
+elif serving_mode == "router":
+    worker_class = "gthread"
+    threads = int(os.environ.get("NGUML_THREADS", "32"))
+elif serving_mode == "sync":
+    worker_class = "sync"
+    max_requests = 1
+else:
+    raise ValueError(
+        f"Unknown NGUML_SERVING_MODE '{serving_mode}', use 'sync', 'threaded' "
+        + "or 'router'."
+    )
+
+
+def post_worker_init(worker):
+    """Load the predictors before a threaded worker accepts requests."""
+    if serving_mode == "threaded":
+        worker.wsgi.extensions["predictors"].preload()
+        from application.startup import startup
+
+        startup.log(worker.log)
@@ -0,0 +1,4 @@
+"""wsgi entrypoint for the router of the worker pools."""
+from application.router import create_router
+
+app = create_router()
@@ -1,7 +1,141 @@
+import re
+
 import pytest
 from application import create_app
 
 
+# the words the stub tokenizer tags as a verb.
+STUB_VERBS = ("brings", "checks", "hands", "pays", "jumps")
+
+
+class StubToken:
+    def __init__(self, text, idx=0):
+        self.text = text
+        self.idx = idx
+        self.pos_ = "VERB" if text in STUB_VERBS else "NOUN"
+        self.is_space = False
+
+
+class StubSentence(list):
+    def __init__(self, tokens, start):
+        super().__init__(tokens)
+        self.start = start
+        self.end = start + len(tokens)
+
+
+class StubSpacy:
+    """Splits documents on whitespace and sentences after a full stop, like spacy.Doc.sents."""
+
+    def pipe(self, documents):
+        for document in documents:
+            sentences, tokens = [], []
+            for match in re.finditer(r"\S+", document):
+                tokens.append(StubToken(match.group(), match.start()))
+                if match.group().endswith("."):
+                    start = sentences[-1].end if sentences else 0
+                    sentences.append(StubSentence(tokens, start))
+                    tokens = []
+            if tokens:
+                start = sentences[-1].end if sentences else 0
+                sentences.append(StubSentence(tokens, start))
+            yield type("StubDoc", (), {"sents": sentences})
+
+
+class StubTokenizerSpacy:
+    def pipe(self, sentences):
+        for sentence in sentences:
+            yield [StubToken(word) for word in sentence.split()]
+
+
+class StubTokenizer:
+    spacy = StubTokenizerSpacy()
+
+    def _sanitize(self, tokens):
+        return tokens
+
+
+class StubSrlModel:
+    def forward_on_instances(self, instances):
+        return [
+            {
+                "verb": words[verb_index],
+                "words": words,
+                "tags": [
+                    "B-V" if index == verb_index else "O" for index in range(len(words))
+                ],
+            }
+            for words, verb_index in instances
+        ]
+
+
+class StubSrlPredictor:
+    """Stands in for SemanticRoleLabelerPredictor, an instance per verb candidate."""
+
+    _tokenizer = StubTokenizer()
+    _model = StubSrlModel()
+
+    def tokens_to_instances(self, tokens):
+        words = [token.text for token in tokens]
+        return [
+            (words, index) for index, token in enumerate(tokens) if token.pos_ == "VERB"
+        ]
+
+    def make_srl_string(self, words, tags):
+        return " ".join(
+            f"[V: {word}]" if tag == "B-V" else word for word, tag in zip(words, tags)
+        )
+
+
+class StubCorefModel:
+    _spans_per_word = 0.4
+    _max_antecedents = 50
+
+
+class StubDatasetReader:
+    _max_span_width = 30
+
+    def text_to_instance(self, sentences):
+        return [token for sentence in sentences for token in sentence]
+
+
+class StubCorefPredictor:
+    """Stands in for CorefPredictor, a result without clusters for every document."""
+
+    _spacy = StubSpacy()
+    _dataset_reader = StubDatasetReader()
+    _model = StubCorefModel()
+
+    @staticmethod
+    def _normalize_word(word):
+        return word[1:] if word in ("/.", "/?") else word
+
+    def predict_batch_instance(self, instances):
+        return [self.predict(" ".join(instance)) for instance in instances]
+
+    def predict(self, document):
+        return {
+            "document": document.split(),
+            "clusters": [],
+            "top_spans": [],
+            "predicted_antecedents": [],
+        }
+
+
+class StubEntailPredictor:
+    """Stands in for TextualEntailmentPredictor, every pair is neutral."""
+
+    def predict_batch_json(self, inputs):
+        return [{"label": "neutral", "probs": [0.0, 0.0, 1.0]} for _ in inputs]
+
+
+# the stub of each model, by the name of the model in predictors.MODELS.
+STUB_PREDICTORS = {
+    "srl": StubSrlPredictor,
+    "coref": StubCorefPredictor,
+    "entail": StubEntailPredictor,
+}
+
+
 @pytest.fixture
 def app():
     app = create_app(
@@ -21,3 +155,26 @@ def client(app):
 @pytest.fixture
 def runner(app):
     return app.test_cli_runner()
+
+
+@pytest.fixture
+def stub_predictors(app, monkeypatch):
+    """Replace the AllenNLP predictors of the endpoints by stub predictors.
+
+    Returns the stubs that were loaded, by model name, in the order of loading.
+    """
+    from application import predictors
+
+    # the stub model has no tag scores to decode.
+    app.config["SRL_BATCHED_DECODING"] = False
+    loaded = {}
+
+    def load_model(model, store_dir=None):
+        name = next(
+            name for name, served in predictors.MODELS.items() if served == model
+        )
+        loaded[name] = STUB_PREDICTORS[name]()
+        return loaded[name]
+
+    monkeypatch.setattr(predictors, "load_model", load_model)
+    return loaded
@@ -0,0 +1,77 @@
+import gzip
+import json
+import pytest
+from application import create_app
+
+zstandard = pytest.importorskip("zstandard")
+
+
+@pytest.fixture
+def compression_client():
+    app = create_app(
+        {"TESTING": True, "COMPRESSION_MIN_SIZE": 256, "SRL_BATCHED_DECODING": False}
+    )
+    return app.test_client()
+
+
+@pytest.mark.parametrize(
+    "encoding, compress",
+    (
+        ("gzip", gzip.compress),
+        ("zstd", lambda data: zstandard.ZstdCompressor().compress(data)),
+    ),
+)
+def test_compressed_request(client, encoding, compress):
+    """Test if a compressed request body is decompressed before validation."""
+    response = client.post(
+        "/predict/srl",
+        data=compress(json.dumps({}).encode()),
+        headers={"Content-Type": "application/json", "Content-Encoding": encoding},
+    )
+    json_result = json.loads(response.data)
+    assert "Posted data is not a list" in json_result["message"]
+
+
+@pytest.mark.parametrize(
+    ("encoding", "status_code"),
+    (("gzip", 400), ("zstd", 400), ("br", 415)),
+)
+def test_compressed_request_error(client, encoding, status_code):
+    """Test if an invalid or unsupported content encoding gives an error."""
+    response = client.post(
+        "/predict/srl",
+        data=b"not compressed",
+        headers={"Content-Type": "application/json", "Content-Encoding": encoding},
+    )
+    json_result = json.loads(response.data)
+    assert response.status_code == status_code
+    assert json_result["status_code"] == status_code
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "decompress"),
+    (
+        ("gzip", gzip.decompress),
+        ("zstd, gzip", lambda data: zstandard.ZstdDecompressor().decompress(data)),
+    ),
+)
+def test_compressed_response(
+    compression_client, stub_predictors, accept_encoding, decompress
+):
+    """Test if a large response is compressed when the client accepts it."""
+    sentences = [{"sentence": "The quick brown fox jumps."} for _ in range(50)]
+    response = compression_client.post(
+        "/predict/srl", json=sentences, headers={"Accept-Encoding": accept_encoding}
+    )
+    assert response.headers["Content-Encoding"] == accept_encoding.split(",")[0]
+    json_result = json.loads(decompress(response.data))
+    assert len(json_result["output"]) == 50
+
+
+def test_small_response_not_compressed(compression_client):
+    """Test that a response below the size threshold is not compressed."""
+    response = compression_client.get(
+        "/predict/srl", headers={"Accept-Encoding": "gzip"}
+    )
+    assert "Content-Encoding" not in response.headers
+    assert json.loads(response.data)["status_code"] == 200
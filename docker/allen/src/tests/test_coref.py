@@ -0,0 +1,100 @@
+import json
+import pytest
+from application import coref
+from application.batching import group_by_token_budget
+
+
+@pytest.mark.parametrize(
+    ("lengths", "token_budget", "batches"),
+    (
+        ([3, 1, 2], 100, [[1, 2, 0]]),
+        ([5, 5, 5, 5], 10, [[0, 1], [2, 3]]),
+        ([1, 20, 2], 10, [[0, 2], [1]]),
+        ([], 10, []),
+    ),
+)
+def test_group_by_token_budget(lengths, token_budget, batches):
+    """Test if the items are grouped on length within the token budget."""
+    assert group_by_token_budget(lengths, token_budget) == batches
+
+
+def test_coref_batch_in_input_order(app, stub_predictors):
+    """Test if a list of documents returns the results in input order."""
+    app.config["COREF_TOKEN_BUDGET"] = 8
+    documents = [
+        "A customer brings in a defective computer and pays.",
+        "She pays.",
+        "The CRS checks the defect.",
+    ]
+    response = app.test_client().post(
+        "/predict/coref", json=[{"document": document} for document in documents]
+    )
+    json_result = json.loads(response.data)
+    assert [result["document"] for result in json_result["output"]] == [
+        document.split() for document in documents
+    ]
+
+
+def test_coref_single_document(client, stub_predictors):
+    """Test if a single document still returns a single result."""
+    response = client.post("/predict/coref", json={"document": "She pays."})
+    json_result = json.loads(response.data)
+    assert json_result["output"]["document"] == ["She", "pays."]
+
+
+def test_coref_sentences_and_offsets(client, stub_predictors):
+    """Test if the sentence boundaries and token offsets are returned."""
+    document = "A customer pays.  She  leaves the shop."
+    response = client.post("/predict/coref", json={"document": document})
+    output = json.loads(response.data)["output"]
+    assert output["sentences"] == [[0, 2], [3, 6]]
+    assert [document[start:end] for start, end in output["offsets"]] == output[
+        "document"
+    ]
+
+
+def test_coref_normalizes_words(client, stub_predictors):
+    """Test if "/." and "/?" reach the model as "." and "?", like in the predictor."""
+    document = "Does she pay /? She pays /."
+    response = client.post("/predict/coref", json={"document": document})
+    output = json.loads(response.data)["output"]
+    assert output["document"] == ["Does", "she", "pay", "?", "She", "pays", "."]
+    assert [document[start:end] for start, end in output["offsets"]][3] == "/?"
+
+
+@pytest.mark.parametrize(
+    ("query", "span_pruning"),
+    (
+        ("", {"max_span_width": 30, "spans_per_word": 0.4, "max_antecedents": 50}),
+        (
+            "?max_span_width=5&spans_per_word=0.2&max_antecedents=10",
+            {"max_span_width": 5, "spans_per_word": 0.2, "max_antecedents": 10},
+        ),
+        (
+            "?max_span_width=100&spans_per_word=0&max_antecedents=-3",
+            {"max_span_width": 30, "spans_per_word": 0.05, "max_antecedents": 1},
+        ),
+    ),
+)
+def test_coref_span_pruning(client, stub_predictors, query, span_pruning):
+    """Test if the span pruning overrides are clamped and echoed."""
+    response = client.post("/predict/coref" + query, json={"document": "She pays."})
+    assert json.loads(response.data)["span_pruning"] == span_pruning
+
+
+@pytest.mark.parametrize("query", ("?max_span_width=wide", "?spans_per_word=nan"))
+def test_coref_span_pruning_invalid(client, stub_predictors, query):
+    """Test if a span pruning override that is not a number is rejected."""
+    response = client.post("/predict/coref" + query, json={"document": "She pays."})
+    json_result = json.loads(response.data)
+    assert json_result["isError"]
+    assert "is not a valid" in json_result["message"]
+
+
+def test_with_span_pruning_leaves_predictor(app, stub_predictors):
+    """Test if the span pruning of a request does not change the shared predictor."""
+    predictor = app.extensions["predictors"].get("coref")
+    span_pruning = {"max_span_width": 5, "spans_per_word": 0.2, "max_antecedents": 10}
+    copied = coref.with_span_pruning(predictor, span_pruning)
+    assert coref.get_span_pruning(copied) == span_pruning
+    assert coref.get_span_pruning(predictor)["max_span_width"] == 30
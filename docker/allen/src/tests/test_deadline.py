@@ -0,0 +1,68 @@
+import json
+import socket
+import time
+from application import deadline
+
+
+def test_expired_deadline_rejected(app, client, stub_predictors):
+    """Test if a request with a passed deadline is rejected before model work."""
+    response = client.post(
+        "/predict/coref",
+        json={"document": "She pays."},
+        headers={"X-Request-Deadline": str(time.time() - 1)},
+    )
+    assert response.status_code == 504
+    assert json.loads(response.data)["isError"]
+    assert not app.extensions["predictors"].is_loaded("coref")
+
+
+def test_invalid_deadline(client, stub_predictors):
+    """Test if a deadline that is not a number is rejected."""
+    response = client.post(
+        "/predict/coref",
+        json={"document": "She pays."},
+        headers={"X-Request-Deadline": "soon"},
+    )
+    assert response.status_code == 400
+
+
+def test_future_deadline(client, stub_predictors):
+    """Test if a request within its deadline is answered."""
+    response = client.post(
+        "/predict/coref",
+        json={"document": "She pays."},
+        headers={"X-Request-Deadline": str(time.time() + 60)},
+    )
+    assert response.status_code == 200
+    assert json.loads(response.data)["output"]["document"] == ["She", "pays."]
+
+
+def test_deadline_between_batches(app, client, stub_predictors, monkeypatch):
+    """Test if the remaining batches are abandoned when the deadline passes."""
+    app.config["COREF_TOKEN_BUDGET"] = 2
+    predictor = app.extensions["predictors"].get("coref")
+    batches = []
+
+    def predict_batch_instance(instances):
+        batches.append(instances)
+        time.sleep(0.2)
+        return [predictor.predict(" ".join(instance)) for instance in instances]
+
+    monkeypatch.setattr(predictor, "predict_batch_instance", predict_batch_instance)
+    response = client.post(
+        "/predict/coref",
+        json=[{"document": "She pays."}, {"document": "He leaves."}],
+        headers={"X-Request-Deadline": str(time.time() + 0.1)},
+    )
+    assert response.status_code == 504
+    assert len(batches) == 1
+
+
+def test_client_disconnected(app):
+    """Test if a closed client connection is detected on the gunicorn socket."""
+    server_side, client_side = socket.socketpair()
+    with app.test_request_context(environ_base={"gunicorn.socket": server_side}):
+        assert not deadline.client_disconnected()
+        client_side.close()
+        assert deadline.client_disconnected()
+    server_side.close()
@@ -21,6 +21,17 @@ def test_online(client, path):
         ("/predict/srl", [], "List is empty"),
         ("/predict/srl", [[]], "Posted data is not correct"),
         ("/predict/coref", [], "Posted data is not correct"),
+        ("/predict/coref", "document", "Posted data is not correct - not a dictionary"),
+        (
+            "/predict/coref",
+            [{"document": "The fox jumps."}, []],
+            "Posted data is not correct - the 1th item is not a dict",
+        ),
+        (
+            "/predict/coref",
+            [{"doc": "The fox jumps."}],
+            "In the 0th item, the key 'document' is not found",
+        ),
         (
             "/predict/coref",
             {"something": "something"},
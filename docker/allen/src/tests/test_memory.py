@@ -0,0 +1,56 @@
+import gc
+import json
+import tracemalloc
+from application.metrics import metrics
+
+WARMUP_REQUESTS = 60
+LEAK_TEST_REQUESTS = 300
+# allowed growth of the python heap over all requests after the warmup
+MAX_HEAP_GROWTH = 64 * 1024
+
+REQUESTS = (
+    ("/predict/srl", [{"sentence": "The quick brown fox jumps over the lazy dog."}]),
+    ("/predict/coref", {"document": "The fox jumps. Then it runs off."}),
+    (
+        "/predict/entail",
+        [{"hypothesis": "the part is reserved.", "premise": "the part is not reserved."}],
+    ),
+)
+
+
+def send_requests(client, amount):
+    """Send amount requests, cycling through the endpoints."""
+    for index in range(amount):
+        path, input_data = REQUESTS[index % len(REQUESTS)]
+        response = client.post(path, json=input_data)
+        assert response.status_code == 200
+
+
+def test_memory_metrics(client, stub_predictors):
+    """Test if the memory usage of a request is recorded in the metrics."""
+    metrics.clear()
+    send_requests(client, len(REQUESTS))
+    json_result = json.loads(client.get("/metrics").data)
+    for endpoint in ("predict", "coreference", "predict_using_other"):
+        endpoint_metrics = json_result["allen_nlp." + endpoint]
+        assert endpoint_metrics["requests"] == 1
+        assert endpoint_metrics["rss_bytes"]["last"] > 0
+        assert "rss_delta_bytes" in endpoint_metrics
+
+
+def test_memory_does_not_grow(client, stub_predictors):
+    """Test that the memory does not keep growing over hundreds of requests."""
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    try:
+        send_requests(client, WARMUP_REQUESTS)
+        gc.collect()
+        heap_before = tracemalloc.get_traced_memory()[0]
+        send_requests(client, LEAK_TEST_REQUESTS)
+        gc.collect()
+        heap_after = tracemalloc.get_traced_memory()[0]
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+    assert heap_after - heap_before < MAX_HEAP_GROWTH
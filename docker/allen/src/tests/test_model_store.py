@@ -0,0 +1,70 @@
+import io
+import json
+import os
+import tarfile
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("allennlp.models.archival")
+from application import model_store
+from application.model_store import ModelStore
+
+
+def create_archive(path, module):
+    """Create a model archive with a config and the weights of the module."""
+    weights = io.BytesIO()
+    torch.save(module.state_dict(), weights)
+    config = json.dumps({"model": {"type": "test"}}).encode()
+    with tarfile.open(path, "w:gz") as archive:
+        for name, data in (("config.json", config), ("weights.th", weights.getvalue())):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+
+def test_extract_once(tmp_path, monkeypatch):
+    """Test if an archive is extracted and converted only the first time."""
+    archive = tmp_path / "model-2021.03.10.tar.gz"
+    module = torch.nn.Linear(4, 3)
+    create_archive(archive, module)
+    store = ModelStore(str(tmp_path / "store"))
+    directory = store.extract(str(archive))
+    assert os.path.basename(directory).startswith("model-2021.03.10-")
+    assert not os.path.exists(os.path.join(directory, "weights.th"))
+    weights = model_store.load_weights(directory)
+    assert torch.equal(weights["weight"], module.weight.detach())
+
+    def fail(directory):
+        raise AssertionError("The archive is converted again.")
+
+    monkeypatch.setattr(model_store, "convert_weights", fail)
+    assert store.extract(str(archive)) == directory
+
+
+def test_new_archive_version(tmp_path):
+    """Test if a changed archive gets a new directory and the old one is removed."""
+    archive = tmp_path / "model.tar.gz"
+    create_archive(archive, torch.nn.Linear(4, 3))
+    store = ModelStore(str(tmp_path / "store"))
+    old_directory = store.extract(str(archive))
+    create_archive(archive, torch.nn.Linear(4, 5))
+    os.utime(archive, ns=(0, os.stat(archive).st_mtime_ns + 1))
+    new_directory = store.extract(str(archive))
+    assert new_directory != old_directory
+    assert not os.path.exists(old_directory)
+    assert model_store.load_weights(new_directory)["weight"].shape == (5, 4)
+
+
+def test_assign_weights_uses_mapped_tensors(tmp_path):
+    """Test if the model uses the memory-mapped tensors instead of copies."""
+    archive = tmp_path / "model.tar.gz"
+    module = torch.nn.Sequential(torch.nn.Linear(4, 3), torch.nn.BatchNorm1d(3))
+    create_archive(archive, module)
+    directory = ModelStore(str(tmp_path / "store")).extract(str(archive))
+    weights = model_store.load_weights(directory)
+    model = torch.nn.Sequential(torch.nn.Linear(4, 3), torch.nn.BatchNorm1d(3))
+    model_store.assign_weights(model, weights)
+    assert model[0].weight.data_ptr() == weights["0.weight"].data_ptr()
+    assert model[1].running_mean.data_ptr() == weights["1.running_mean"].data_ptr()
+    inputs = torch.rand(2, 4)
+    assert torch.equal(model.eval()(inputs), module.eval()(inputs))
@@ -0,0 +1,93 @@
+import json
+import threading
+import time
+import pytest
+from application import predictors
+from application.predictors import PredictorRegistry
+
+MODELS = {"srl": {"archive": "srl.tar.gz"}, "coref": {"archive": "coref.tar.gz"}}
+
+
+class SlowPredictor:
+    """Predictor that keeps track of the number of requests using it at the same time."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def predict(self, document):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.02)
+        with self.lock:
+            self.active -= 1
+        return {}
+
+
+def run_threads(target, amount=8):
+    """Run the target in amount threads and wait until they are finished."""
+    threads = [threading.Thread(target=target) for _ in range(amount)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_predictor_loaded_once(monkeypatch):
+    """Test if concurrent requests load a predictor only once."""
+    loaded = []
+
+    def load_model(model, store=None):
+        time.sleep(0.02)
+        loaded.append(model["archive"])
+        return SlowPredictor()
+
+    monkeypatch.setattr(predictors, "load_model", load_model)
+    registry = PredictorRegistry(MODELS)
+    run_threads(lambda: registry.get("srl"))
+    assert loaded == ["srl.tar.gz"]
+    assert registry.is_loaded("srl")
+    assert not registry.is_loaded("coref")
+
+
+def test_predictor_concurrency(monkeypatch):
+    """Test if the number of requests that use a model at the same time is limited."""
+    monkeypatch.setattr(predictors, "load_model", lambda model, store=None: SlowPredictor())
+    registry = PredictorRegistry(MODELS, concurrency=2)
+
+    def predict():
+        with registry.use("coref") as predictor:
+            predictor.predict(document="")
+
+    run_threads(predict)
+    assert registry.get("coref").max_active == 2
+
+
+def test_preload(monkeypatch):
+    """Test if preload loads the predictors of all models."""
+    monkeypatch.setattr(predictors, "load_model", lambda model, store=None: SlowPredictor())
+    registry = PredictorRegistry(MODELS)
+    registry.preload()
+    assert registry.is_loaded("srl")
+    assert registry.is_loaded("coref")
+
+
+@pytest.mark.parametrize(
+    ("path", "input_data", "model"),
+    (
+        ("/predict/srl", [{"sentence": "She pays."}], "srl"),
+        ("/predict/coref", {"document": "She pays."}, "coref"),
+        (
+            "/predict/entail",
+            [{"hypothesis": "She pays.", "premise": "She pays."}],
+            "entail",
+        ),
+    ),
+)
+def test_endpoint_uses_its_predictor(client, stub_predictors, path, input_data, model):
+    """Test if an endpoint loads and uses the predictor of its own model only."""
+    response = client.post(path, json=input_data)
+    assert not json.loads(response.data).get("isError")
+    assert list(stub_predictors) == [model]
@@ -0,0 +1,83 @@
+import json
+import pytest
+from application import create_app, profiling
+
+
+@pytest.fixture
+def profiling_client():
+    app = create_app({"TESTING": True, "PROFILING_ENABLED": True})
+    return app.test_client()
+
+
+def test_profiling_disabled_by_default(client):
+    """Test that the profile parameter is ignored when profiling is not enabled."""
+    response = client.post("/predict/srl?profile=1", json={})
+    json_result = json.loads(response.data)
+    assert "profile" not in json_result
+
+
+def test_profiling_not_requested(profiling_client):
+    """Test that a request is only profiled when it asks for it."""
+    response = profiling_client.post("/predict/srl", json={})
+    json_result = json.loads(response.data)
+    assert "profile" not in json_result
+
+
+@pytest.mark.parametrize(
+    "path",
+    ("/predict/srl", "/predict/coref", "/predict/entail"),
+)
+def test_profiling_summary(profiling_client, path):
+    """Test if a profiled request returns the normal output and a profile summary."""
+    response = profiling_client.post(path + "?profile=1", json={})
+    json_result = json.loads(response.data)
+    assert json_result["status_code"] == 400
+    profile = json_result["profile"]
+    assert profile["total_ms"] >= 0
+    assert set(profile["phases"]) == {
+        "tokenization",
+        "encoder",
+        "decoding",
+        "serialization",
+    }
+    assert len(profile["hotspots"]) > 0
+    assert "self_ms" in profile["hotspots"][0]
+
+
+class FakeStats:
+    """cProfile stats with a cumulative time in seconds per frame."""
+
+    def __init__(self, frames):
+        self.stats = {
+            (file_name, 1, function_name): (1, 1, 0.0, cumulative, {})
+            for (file_name, function_name), cumulative in frames.items()
+        }
+
+
+def test_phase_times_from_entry_frames():
+    """Test if only the entry frames count, summed per phase."""
+    site = "/usr/lib/python3.8/site-packages/"
+    stats = FakeStats(
+        {
+            (site + "spacy/language.py", "pipe"): 0.002,
+            (site + "allennlp/data/token_indexers/spacy_indexer.py", "pipe"): 1.0,
+            (
+                site + "allennlp_models/structured_prediction/predictors/srl.py",
+                "tokens_to_instances",
+            ): 0.001,
+            (
+                site + "allennlp_models/structured_prediction/models/srl_bert.py",
+                "forward",
+            ): 0.5,
+            (site + "torch/nn/modules/linear.py", "forward"): 2.0,
+            ("/app/application/viterbi.py", "batched_viterbi_decode"): 0.01,
+            (site + "allennlp/common/util.py", "sanitize"): 0.003,
+            ("/app/application/allen_nlp.py", "sanitize"): 3.0,
+        }
+    )
+    assert profiling.get_phase_times(stats) == {
+        "tokenization": 3.0,
+        "encoder": 500.0,
+        "decoding": 10.0,
+        "serialization": 3.0,
+    }
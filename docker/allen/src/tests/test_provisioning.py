@@ -0,0 +1,155 @@
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from application import provisioning
+
+ARCHIVES = {
+    "srl.tar.gz": os.urandom(300 * 1024),
+    "coref.tar.gz": os.urandom(200 * 1024),
+    "entail.tar.gz": os.urandom(100 * 1024),
+}
+# the archives the source publishes no checksum for.
+UNPUBLISHED = ("entail.tar.gz",)
+
+
+class ModelSourceHandler(BaseHTTPRequestHandler):
+    """Serves the archives and their checksums, with support for range requests."""
+
+    requests = []
+
+    def do_GET(self):
+        name = self.path.lstrip("/")
+        self.requests.append((name, self.headers.get("Range")))
+        archive = name[: -len(".sha256")]
+        published = archive in ARCHIVES and archive not in UNPUBLISHED
+        if name.endswith(".sha256") and published:
+            data = hashlib.sha256(ARCHIVES[archive]).hexdigest().encode()
+        elif name in ARCHIVES:
+            data = ARCHIVES[name]
+        else:
+            self.send_error(404)
+            return
+        status = 200
+        if self.headers.get("Range"):
+            start = int(self.headers["Range"].split("=")[1].rstrip("-"))
+            data = data[start:]
+            status = 206
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def source():
+    ModelSourceHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ModelSourceHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+PUBLISHED = [name for name in ARCHIVES if name not in UNPUBLISHED]
+
+
+def test_provision_downloads_missing(source, tmp_path):
+    """Test if missing archives are downloaded and their checksums stored."""
+    results = provisioning.provision(PUBLISHED, source, str(tmp_path))
+    assert results == {name: "downloaded" for name in PUBLISHED}
+    for name in PUBLISHED:
+        data = ARCHIVES[name]
+        assert (tmp_path / name).read_bytes() == data
+        assert provisioning.read_checksum(str(tmp_path / f"{name}.sha256")) == (
+            hashlib.sha256(data).hexdigest()
+        )
+
+
+def test_provision_skips_valid(source, tmp_path):
+    """Test if archives with a valid checksum are not downloaded again."""
+    provisioning.provision(PUBLISHED, source, str(tmp_path))
+    ModelSourceHandler.requests = []
+    results = provisioning.provision(PUBLISHED, source, str(tmp_path))
+    assert results == {name: "present" for name in PUBLISHED}
+    assert ModelSourceHandler.requests == []
+
+
+def test_provision_resumes_partial(source, tmp_path):
+    """Test if a partial download is resumed with a range request."""
+    (tmp_path / "srl.tar.gz.part").write_bytes(ARCHIVES["srl.tar.gz"][:1000])
+    provisioning.provision(["srl.tar.gz"], source, str(tmp_path))
+    assert ("srl.tar.gz", "bytes=1000-") in ModelSourceHandler.requests
+    assert (tmp_path / "srl.tar.gz").read_bytes() == ARCHIVES["srl.tar.gz"]
+    assert not (tmp_path / "srl.tar.gz.part").exists()
+
+
+def test_provision_replaces_corrupt(source, tmp_path):
+    """Test if an archive that does not match the checksum is downloaded again."""
+    (tmp_path / "coref.tar.gz").write_bytes(b"corrupt")
+    results = provisioning.provision(["coref.tar.gz"], source, str(tmp_path))
+    assert results == {"coref.tar.gz": "downloaded"}
+    assert (tmp_path / "coref.tar.gz").read_bytes() == ARCHIVES["coref.tar.gz"]
+
+
+def test_provision_never_trusts_unverified(source, tmp_path):
+    """Test if an archive without any checksum is downloaded again and not recorded."""
+    data = ARCHIVES["entail.tar.gz"]
+    (tmp_path / "entail.tar.gz").write_bytes(data[:1000])
+    results = provisioning.provision(["entail.tar.gz"], source, str(tmp_path))
+    assert results == {"entail.tar.gz": "downloaded"}
+    assert (tmp_path / "entail.tar.gz").read_bytes() == data
+    assert not (tmp_path / "entail.tar.gz.sha256").exists()
+    results = provisioning.provision(["entail.tar.gz"], source, str(tmp_path))
+    assert results == {"entail.tar.gz": "downloaded"}
+
+
+def test_provision_rejects_bad_download(source, tmp_path, monkeypatch):
+    """Test if a download that does not match the published checksum fails."""
+    monkeypatch.setattr(provisioning, "fetch_checksum", lambda url: "0" * 64)
+    with pytest.raises(provisioning.ProvisioningError):
+        provisioning.provision(["srl.tar.gz"], source, str(tmp_path))
+    assert not (tmp_path / "srl.tar.gz").exists()
+
+
+def test_provision_verifies_pinned(source, tmp_path, monkeypatch):
+    """Test if the pinned digest is used instead of the published checksum."""
+    digest = hashlib.sha256(ARCHIVES["srl.tar.gz"]).hexdigest()
+    monkeypatch.setattr(provisioning, "ARCHIVES", {"srl.tar.gz": digest})
+    results = provisioning.provision(["srl.tar.gz"], source, str(tmp_path))
+    assert results == {"srl.tar.gz": "downloaded"}
+    assert ModelSourceHandler.requests == [("srl.tar.gz", None)]
+    (tmp_path / "srl.tar.gz.sha256").unlink()
+    ModelSourceHandler.requests = []
+    results = provisioning.provision(["srl.tar.gz"], source, str(tmp_path))
+    assert results == {"srl.tar.gz": "present"}
+    assert ModelSourceHandler.requests == []
+
+
+def test_provision_rejects_pinned_mismatch(source, tmp_path, monkeypatch):
+    """Test if a download that does not match the pinned digest fails."""
+    monkeypatch.setattr(provisioning, "ARCHIVES", {"srl.tar.gz": "0" * 64})
+    with pytest.raises(provisioning.ProvisioningError):
+        provisioning.provision(["srl.tar.gz"], source, str(tmp_path))
+    assert not (tmp_path / "srl.tar.gz").exists()
+
+
+def test_provision_extracts_served(source, tmp_path, monkeypatch):
+    """Test if the archives of the served models are extracted into the store."""
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("allennlp.models.archival")
+    from tests.test_model_store import create_archive
+
+    name = os.path.basename(provisioning.MODELS["srl"]["archive"])
+    create_archive(tmp_path / "model.tar.gz", torch.nn.Linear(4, 3))
+    monkeypatch.setitem(ARCHIVES, name, (tmp_path / "model.tar.gz").read_bytes())
+    results = provisioning.provision(
+        [name], source, str(tmp_path / "models"), str(tmp_path / "store")
+    )
+    assert results == {name: "extracted"}
+    assert os.listdir(tmp_path / "store")
@@ -0,0 +1,65 @@
+import json
+import threading
+import pytest
+from werkzeug.serving import make_server
+from werkzeug.test import Client
+from application import create_app
+from application.router import Router
+
+
+@pytest.fixture
+def coref_pool(stub_predictors):
+    """Run a worker pool that only serves the coref model."""
+    app = create_app({"TESTING": True, "SERVED_MODELS": ["coref"]})
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_router_forwards_to_pool(coref_pool):
+    """Test if a request is forwarded to the pool of its model with its headers."""
+    client = Client(Router({"coref": coref_pool}))
+    response = client.post(
+        "/predict/coref?max_span_width=5",
+        json={"document": "She pays."},
+        headers={"X-Request-ID": "run-1234"},
+    )
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"] == "run-1234"
+    json_result = json.loads(response.get_data())
+    assert json_result["output"]["document"] == ["She", "pays."]
+    assert json_result["span_pruning"]["max_span_width"] == 5
+
+
+def test_router_unknown_model(coref_pool):
+    """Test if a model without a pool is rejected by the router."""
+    client = Client(Router({"coref": coref_pool}))
+    response = client.post("/predict/srl", json=[{"sentence": "She pays."}])
+    assert response.status_code == 404
+    assert json.loads(response.get_data())["isError"]
+
+
+def test_router_pool_unreachable():
+    """Test if an unreachable pool gives a bad gateway error."""
+    client = Client(Router({"coref": "http://127.0.0.1:9"}))
+    response = client.post("/predict/coref", json={"document": "She pays."})
+    assert response.status_code == 502
+    assert "not reachable" in json.loads(response.get_data())["message"]
+
+
+def test_pool_rejects_model_not_served(stub_predictors):
+    """Test if a pool rejects the requests of models it does not serve."""
+    app = create_app({"TESTING": True, "SERVED_MODELS": "coref"})
+    response = app.test_client().post("/predict/srl", json=[{"sentence": "Pay."}])
+    assert response.status_code == 404
+    assert "not served" in json.loads(response.data)["message"]
+    assert not app.extensions["predictors"].is_loaded("srl")
+
+
+def test_served_models_unknown():
+    """Test if an unknown model in SERVED_MODELS is rejected at startup."""
+    with pytest.raises(ValueError):
+        create_app({"TESTING": True, "SERVED_MODELS": ["srl", "parser"]})
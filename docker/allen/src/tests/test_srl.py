@@ -0,0 +1,30 @@
+import json
+
+
+def test_srl_skips_sentences_without_verbs(client, stub_predictors):
+    """Test if sentences without a verb skip the model and get an empty result."""
+    sentences = ["Repair process", "The customer pays the bill.", "1. Hardware"]
+    response = client.post(
+        "/predict/srl", json=[{"sentence": sentence} for sentence in sentences]
+    )
+    json_result = json.loads(response.data)
+    assert json_result["skipped_sentences"] == 2
+    assert [result["words"] for result in json_result["output"]] == [
+        sentence.split() for sentence in sentences
+    ]
+    assert json_result["output"][0]["verbs"] == []
+    assert json_result["output"][2]["verbs"] == []
+    assert [verb["verb"] for verb in json_result["output"][1]["verbs"]] == ["pays"]
+
+
+def test_srl_verb_per_instance(client, stub_predictors):
+    """Test if a sentence with several verbs gets a result per verb in order."""
+    response = client.post(
+        "/predict/srl",
+        json=[{"sentence": "The CRS checks the defect and hands out a calculation."}],
+    )
+    json_result = json.loads(response.data)
+    assert json_result["skipped_sentences"] == 0
+    verbs = json_result["output"][0]["verbs"]
+    assert [verb["verb"] for verb in verbs] == ["checks", "hands"]
+    assert verbs[0]["description"].startswith("The CRS [V: checks]")
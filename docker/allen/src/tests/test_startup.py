@@ -0,0 +1,40 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from application.startup import StartupReport
+
+
+def test_blueprint_import_without_allennlp():
+    """Test if importing the endpoints does not import AllenNLP or torch."""
+    code = (
+        "import sys, application.allen_nlp; "
+        + "print(sorted({name.split('.')[0] for name in sys.modules} "
+        + "& {'allennlp', 'allennlp_models', 'torch'}))"
+    )
+    src = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=src, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_phases_exclude_inner_phases():
+    """Test if a phase records its time without the time of its inner phases."""
+    report = StartupReport()
+    with report.phase("load"):
+        time.sleep(0.02)
+        with report.phase("import"):
+            time.sleep(0.05)
+    phases = report.snapshot()["phases"]
+    assert phases["import"] >= 45
+    assert 15 <= phases["load"] < phases["import"]
+
+
+def test_startup_report(client, stub_predictors):
+    """Test if the load of a model is in the startup report."""
+    client.post("/predict/coref", json={"document": "She pays."})
+    report = json.loads(client.get("/startup").data)
+    assert "load coref" in report["phases"]
+    assert report["total_ms"] >= report["phases"]["load coref"]
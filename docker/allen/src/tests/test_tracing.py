@@ -0,0 +1,25 @@
+import json
+from application.metrics import metrics
+
+
+def test_request_id_is_returned(client):
+    """Test if the request id of the client is returned in the response."""
+    response = client.get("/predict/srl", headers={"X-Request-ID": "run-1234"})
+    assert response.headers["X-Request-ID"] == "run-1234"
+
+
+def test_request_id_is_generated(client):
+    """Test if a request without request id gets a new one."""
+    first = client.get("/predict/srl").headers["X-Request-ID"]
+    second = client.get("/predict/srl").headers["X-Request-ID"]
+    assert len(first) == 32
+    assert first != second
+
+
+def test_request_duration_is_recorded(client):
+    """Test if the duration of a request is recorded in the metrics."""
+    metrics.clear()
+    client.get("/predict/coref")
+    json_result = json.loads(client.get("/metrics").data)
+    assert json_result["allen_nlp.coreference"]["requests"] == 1
+    assert json_result["allen_nlp.coreference"]["duration_ms"]["last"] >= 0
@@ -0,0 +1,46 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+util = pytest.importorskip("allennlp.nn.util")
+from application.viterbi import batched_viterbi_decode
+
+LABELS = ["O", "B-ARG0", "I-ARG0", "B-ARG1", "I-ARG1", "B-V", "I-V"]
+
+
+def bio_constraints():
+    """Create the transitions and start transitions of the SRL model for LABELS."""
+    transition_matrix = torch.zeros(len(LABELS), len(LABELS))
+    start_transitions = torch.zeros(len(LABELS))
+    for i, previous in enumerate(LABELS):
+        for j, label in enumerate(LABELS):
+            if label.startswith("I-") and previous[1:] != label[1:]:
+                transition_matrix[i, j] = float("-inf")
+    for j, label in enumerate(LABELS):
+        if label.startswith("I-"):
+            start_transitions[j] = float("-inf")
+    return transition_matrix, start_transitions
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batched_viterbi_parity(seed):
+    """Test if the batched decoding gives the same tags as viterbi_decode."""
+    generator = torch.Generator().manual_seed(seed)
+    lengths = [1, 3, 17, 40, 9, 40, 2]
+    predictions = torch.rand(
+        len(lengths), max(lengths), len(LABELS), generator=generator
+    ).softmax(-1)
+    transition_matrix, start_transitions = bio_constraints()
+    expected = [
+        util.viterbi_decode(
+            predictions[index, :length],
+            transition_matrix,
+            allowed_start_transitions=start_transitions,
+        )[0]
+        for index, length in enumerate(lengths)
+    ]
+    assert (
+        batched_viterbi_decode(
+            predictions, lengths, transition_matrix, start_transitions
+        )
+        == expected
+    )
@@ -1,4 +1,9 @@
 """wsgi entrypoint for the gunicorn workers."""
-from application import create_app
+import time
 
+import_start = time.perf_counter()
+from application import create_app  # noqa: E402
+from application.startup import startup  # noqa: E402
+
+startup.record("import application", time.perf_counter() - import_start)
 app = create_app()